@@ -7,5 +7,5 @@ y = Variable("y")
 
 m = Model(x * y, [x >= 1, y >= 2, x * y >= 0.5, x * y <= 1.5])
 
-# raises UnknownInfeasible on cvxopt, PrimalInfeasible on mosek
+# raises PrimalInfeasible, whose .conflicts rank the constraints involved
 # m.solve()
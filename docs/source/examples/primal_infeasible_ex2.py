@@ -10,5 +10,5 @@ constraints = [x >= 1, 0.5 <= x * y, x * y <= 1.5]
 objective = x * y
 m = Model(objective, constraints)
 
-# raises UnknownInfeasible on cvxopt and PrimalInfeasible on mosek
+# raises PrimalInfeasible, whose .conflicts rank the constraints involved
 # m.solve()
@@ -2,6 +2,9 @@
 
 __version__ = "0.1.2"
 
+import sys
+from importlib import import_module
+
 from .build import build
 from .constraints.gp import GeometricProgram
 from .constraints.model import Model
@@ -20,19 +23,17 @@ from .varkey import VarKey
 GPCOLORS = ["#59ade4", "#FA3333"]
 GPBLU, GPRED = GPCOLORS
 
-if "just built!" in settings:  # pragma: no cover
-    print(
-        f"""
-GPkit is now installed with solver(s) {settings['installed_solvers']}
-To incorporate new solvers at a later date, run `gpkit.build()`.
+# imported on first access, since they're slow to import and rarely needed
+LAZY_SUBMODULES = ("breakdowns", "interactive", "solution_ensemble", "solvers")
+
 
-If you encounter any bugs or issues using GPkit, please open a new issue at
-https://github.com/beautifulmachines/gpkit-core/issues/new.
+def __getattr__(name):
+    "Imports the submodules in LAZY_SUBMODULES when they're first accessed."
+    if name not in LAZY_SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return import_module(f".{name}", __name__)
 
-Finally, we hope you find our documentation (https://gpkit.readthedocs.io/) and
-engineering-design models (https://github.com/beautifulmachines/gpkit-models/)
-useful for your own applications.
 
-Enjoy!
-"""
-    )
+def __dir__():
+    "Lists the lazy submodules too, so they tab-complete before being imported."
+    return sorted(set(sys.modules[__name__].__dict__) | set(LAZY_SUBMODULES))
@@ -18,6 +18,8 @@ from gpkit.small_scripts import mag, try_str_without
 from gpkit.units import DimensionalityError
 from gpkit.varkey import VarKey
 
+MIN_CRAWLED = 0.05  # share of the total below which keys aren't broken down
+
 Tree = namedtuple("Tree", ["key", "value", "branches"])
 Transform = namedtuple("Transform", ["factor", "power", "origkey"])
 
@@ -101,126 +103,166 @@ def crawl_modelbd(bd, lookup, name="Model"):
     return tree
 
 
-def divide_out_vk(vk, pow, lt, gt):
-    hmap = NomialMap({HashVector({vk: 1}): 1.0})
-    hmap.units = vk.units
-    var = Monomial(hmap) ** pow
+def divide_out(exp, lt, gt):
+    "Divides both lt and gt by the monomial of exp, in a single division"
+    if not exp:
+        return lt, gt
+    hmap = NomialMap({exp: 1.0})
+    units = 1
+    for vk, pow in exp.items():
+        if vk.units:
+            units *= vk.units**pow
+    hmap.units = None if units == 1 else units
+    var = Monomial(hmap)
     lt, gt = lt / var, gt / var
     lt.ast = gt.ast = None
     return lt, gt
 
 
-# @profile
-def get_breakdowns(basically_fixed_variables, solution):
+def split_sides(constraint, senss, solution):
+    "Returns the lt and gt sides of a constraint that sensitivity senss is of"
+    while getattr(constraint, "child", None):
+        constraint = constraint.child
+    while getattr(constraint, "generated", None):
+        constraint = constraint.generated
+    if constraint.oper == ">=":
+        gt, lt = (constraint.left, constraint.right)
+    elif constraint.oper == "<=":
+        lt, gt = (constraint.left, constraint.right)
+    elif constraint.oper == "=":
+        if senss > 0:  # l_over_r is more sensitive - see nomials/math.py
+            lt, gt = (constraint.left, constraint.right)
+        else:  # r_over_l is more sensitive - see nomials/math.py
+            gt, lt = (constraint.left, constraint.right)
+    for gtvk in gt.vks:  # remove RelaxPCCP.C
+        if (
+            gtvk.name == "C"
+            and gtvk.lineage[0][0] == "RelaxPCCP"
+            and gtvk not in solution["variables"]
+        ):
+            lt, gt = lt.sub({gtvk: 1}), gt.sub({gtvk: 1})
+    return lt, gt
+
+
+def root_constraint(constraint):
+    "Returns the constraint that generated constraint"
+    while getattr(constraint, "parent", None):
+        constraint = constraint.parent
+    while getattr(constraint, "generated_by", None):
+        constraint = constraint.generated_by
+    return constraint
+
+
+def analyze_sides(constraint, senss, solution):
+    """Returns (str(constraint), (lt, gt, vk, divisor, gtexp)) for a constraint
+
+    The second item (None if the constraint can't be a breakdown) holds the
+    constraint's sides and either the one free variable it breaks down (vk),
+    or the exponent to divide its sides by (divisor) before choosing one of
+    the variables left in its gt (gtexp). None of this depends on values.
+    """
+    lt, gt = split_sides(constraint, senss, solution)
+    if len(gt.hmap) > 1:
+        return str(constraint), None
+    pos_gtvks = {vk for vk, pow in gt.exp.items() if pow > 0}
+    if len(pos_gtvks) > 1:
+        pos_gtvks &= get_free_vks(gt, solution)  # remove constants
+    if len(pos_gtvks) == 1:
+        (chosenvk,) = pos_gtvks
+        return str(constraint), (lt, gt, chosenvk, None, None)
+    # we'll choose our favorite vk, tracking the monomial to divide out
+    divisor = HashVector({vk: pow for vk, pow in gt.exp.items() if pow < 0})
+    # bring over common factors from lt...
+    lt_pows = defaultdict(set)
+    for exp in lt.hmap:
+        for vk, pow in (exp + -divisor).items():
+            lt_pows[vk].add(pow)
+    for vk, pows in lt_pows.items():
+        if len(pows) == 1:
+            (pow,) = pows
+            if pow < 0:  # ...but only if they're positive
+                divisor += HashVector({vk: pow})
+    return str(constraint), (lt, gt, None, divisor, gt.exp + -divisor)
+
+
+def breakdown_choices(solution, senss, risk, cache=None):
+    """Returns which constraints break down which variables of solution
+
+    Arguments
+    ---------
+    solution : SolutionArray
+        Solution whose constants and variables to use
+    senss : dict
+        {constraint: sensitivity}
+    risk : function
+        Returns the variable risk of a VarKey
+    cache : dict (optional)
+        Stores the analysis of each constraint, for reuse in later calls
+
+    Returns
+    -------
+    list of (chosen VarKey, constraint, analysis, divisor), in the order in
+    which get_breakdowns adds them; analysis is from `analyze_sides`, and
+    divisor the exponent (if any) to divide out of its sides.
+    """
+    if cache is None:
+        cache = {}
+    tight = []
+    for constraint, sens in senss.items():
+        if abs(sens) > 1e-5:  # only tight-ish ones
+            ckey = (constraint, sens > 0)
+            if ckey not in cache:
+                cache[ckey] = analyze_sides(constraint, sens, solution)
+            cstr, analysis = cache[ckey]
+            if analysis is not None:
+                tight.append((-abs(float("%.2g" % sens)), cstr, constraint, analysis))
+    tight.sort(key=lambda t: t[:2])
+    choices, chosen = [], set()
+    for _, _, constraint, analysis in tight:
+        if analysis[2] is not None:
+            choices.append((analysis[2], constraint, analysis, None))
+            chosen.add(analysis[2])
+    for _, _, constraint, analysis in tight:
+        _, _, vk, divisor, gtexp = analysis
+        if vk is not None:
+            continue
+        # don't choose something that's already been broken down
+        candidatevks = {vk for vk in gtexp if vk not in chosen}
+        if candidatevks:
+            chosenvk, *_ = sorted(
+                candidatevks,
+                key=lambda vk: (-float("%.2g" % (gtexp[vk] * risk(vk))), str(vk)),
+            )
+            divisor += HashVector(
+                {vk: pow for vk, pow in gtexp.items() if vk is not chosenvk}
+            )
+            choices.append((chosenvk, constraint, analysis, divisor))
+            chosen.add(chosenvk)
+    return choices
+
+
+def get_breakdowns(basically_fixed_variables, solution, choices=None):
     """Returns {key: (lt, gt, constraint)} for breakdown constrain in solution.
 
     A breakdown constraint is any whose "gt" contains a single free variable.
 
     (At present, monomial constraints check both sides as "gt")
+
+    If given, choices (from `breakdown_choices`) are used instead of finding
+    which constraints break down which variables anew.
     """
+    if choices is None:
+        vrisk = solution["sensitivities"]["variablerisk"]
+        choices = breakdown_choices(
+            solution,
+            solution["sensitivities"]["constraints"],
+            lambda vk: vrisk.get(vk, 0),
+        )
     breakdowns = defaultdict(list)
-    for constraint, senss in sorted(
-        solution["sensitivities"]["constraints"].items(),
-        key=lambda kv: (-abs(float("%.2g" % kv[1])), str(kv[0])),
-    ):
-        while getattr(constraint, "child", None):
-            constraint = constraint.child
-        while getattr(constraint, "generated", None):
-            constraint = constraint.generated
-        if abs(senss) <= 1e-5:  # only tight-ish ones
-            continue
-        if constraint.oper == ">=":
-            gt, lt = (constraint.left, constraint.right)
-        elif constraint.oper == "<=":
-            lt, gt = (constraint.left, constraint.right)
-        elif constraint.oper == "=":
-            if senss > 0:  # l_over_r is more sensitive - see nomials/math.py
-                lt, gt = (constraint.left, constraint.right)
-            else:  # r_over_l is more sensitive - see nomials/math.py
-                gt, lt = (constraint.left, constraint.right)
-        for gtvk in gt.vks:  # remove RelaxPCCP.C
-            if (
-                gtvk.name == "C"
-                and gtvk.lineage[0][0] == "RelaxPCCP"
-                and gtvk not in solution["variables"]
-            ):
-                lt, gt = lt.sub({gtvk: 1}), gt.sub({gtvk: 1})
-        if len(gt.hmap) > 1:
-            continue
-        pos_gtvks = {vk for vk, pow in gt.exp.items() if pow > 0}
-        if len(pos_gtvks) > 1:
-            pos_gtvks &= get_free_vks(gt, solution)  # remove constants
-        if len(pos_gtvks) == 1:
-            (chosenvk,) = pos_gtvks
-            while getattr(constraint, "parent", None):
-                constraint = constraint.parent
-            while getattr(constraint, "generated_by", None):
-                constraint = constraint.generated_by
-            breakdowns[chosenvk].append((lt, gt, constraint))
-    for constraint, senss in sorted(
-        solution["sensitivities"]["constraints"].items(),
-        key=lambda kv: (-abs(float("%.2g" % kv[1])), str(kv[0])),
-    ):
-        if abs(senss) <= 1e-5:  # only tight-ish ones
-            continue
-        while getattr(constraint, "child", None):
-            constraint = constraint.child
-        while getattr(constraint, "generated", None):
-            constraint = constraint.generated
-        if constraint.oper == ">=":
-            gt, lt = (constraint.left, constraint.right)
-        elif constraint.oper == "<=":
-            lt, gt = (constraint.left, constraint.right)
-        elif constraint.oper == "=":
-            if senss > 0:  # l_over_r is more sensitive - see nomials/math.py
-                lt, gt = (constraint.left, constraint.right)
-            else:  # r_over_l is more sensitive - see nomials/math.py
-                gt, lt = (constraint.left, constraint.right)
-        for gtvk in gt.vks:
-            if (
-                gtvk.name == "C"
-                and gtvk.lineage[0][0] == "RelaxPCCP"
-                and gtvk not in solution["variables"]
-            ):
-                lt, gt = lt.sub({gtvk: 1}), gt.sub({gtvk: 1})
-        if len(gt.hmap) > 1:
-            continue
-        pos_gtvks = {vk for vk, pow in gt.exp.items() if pow > 0}
-        if len(pos_gtvks) > 1:
-            pos_gtvks &= get_free_vks(gt, solution)  # remove constants
-        if len(pos_gtvks) != 1:  # we'll choose our favorite vk
-            for vk, pow in gt.exp.items():
-                if pow < 0:  # remove all non-positive
-                    lt, gt = divide_out_vk(vk, pow, lt, gt)
-            # bring over common factors from lt
-            lt_pows = defaultdict(set)
-            for exp in lt.hmap:
-                for vk, pow in exp.items():
-                    lt_pows[vk].add(pow)
-            for vk, pows in lt_pows.items():
-                if len(pows) == 1:
-                    (pow,) = pows
-                    if pow < 0:  # ...but only if they're positive
-                        lt, gt = divide_out_vk(vk, pow, lt, gt)
-            # don't choose something that's already been broken down
-            candidatevks = {vk for vk in gt.vks if vk not in breakdowns}
-            if candidatevks:
-                vrisk = solution["sensitivities"]["variablerisk"]
-                chosenvk, *_ = sorted(
-                    candidatevks,
-                    key=lambda vk: (
-                        -float("%.2g" % (gt.exp[vk] * vrisk.get(vk, 0))),
-                        str(vk),
-                    ),
-                )
-                for vk, pow in gt.exp.items():
-                    if vk is not chosenvk:
-                        lt, gt = divide_out_vk(vk, pow, lt, gt)
-                while getattr(constraint, "parent", None):
-                    constraint = constraint.parent
-                while getattr(constraint, "generated_by", None):
-                    constraint = constraint.generated_by
-                breakdowns[chosenvk].append((lt, gt, constraint))
+    for chosenvk, constraint, (lt, gt, *_), divisor in choices:
+        if divisor is not None:
+            lt, gt = divide_out(divisor, lt, gt)
+        breakdowns[chosenvk].append((lt, gt, root_constraint(constraint)))
     breakdowns = dict(breakdowns)  # remove the defaultdict-ness
 
     prevlen = None
@@ -262,10 +304,27 @@ def crawl(
     visited_bdkeys=None,
     gone_negative=False,
     all_visited_bdkeys=None,
+    memo=None,
+    sources=None,
 ):
-    "Returns the tree of breakdowns of key in bd, sorting by solution's values"
+    """Returns the tree of breakdowns of key in bd, sorting by solution's values
+
+    Trees crawled without verbosity are stored in and reused from memo, if given.
+
+    If given a sources dict, it is filled with {id(node): (mon, denom, crawled)}
+    for each node whose value is the value of mon over that of denom, times the
+    value of the closest (non-Transform) ancestor whose value was found that
+    way, or 1. If whether that node was crawled further depended only on its
+    value exceeding MIN_CRAWLED, crawled says whether it was (else it's None).
+    """
     if key != solution["cost function"] and hasattr(key, "key"):
         key = key.key  # clear up Variables
+    if memo is not None and not verbosity and sources is None:
+        memokey = (key, permissivity, basescale, frozenset(visited_bdkeys or ()))
+        if memokey in memo:
+            return memo[memokey]
+    else:
+        memokey = None
     if key in bd:
         # TODO: do multiple if sensitivities are quite close?
         composition, keymon, constraint = bd[key][0]
@@ -356,6 +415,7 @@ def crawl(
                 orig_subtree.append(Tree(transform, basescale, subsubtree))
                 orig_subtree = subsubtree
 
+    denom = key if keymon is None else keymon  # what the monomials divide
     # TODO: use ast_parsing instead of chop?
     mons = composition.chop()
     monsols = [solution(mon) for mon in mons]  # ~20% of total last check # TODO: remove
@@ -378,6 +438,7 @@ def crawl(
     for i, (_, _, scaledmonval, mon) in enumerate(sortedmonvals):
         if not scaledmonval:
             continue
+        origmon = mon
         subtree = orig_subtree  # return to the original subtree
         # time for some filtering
         interesting_vks = mon.vks
@@ -485,12 +546,8 @@ def crawl(
                 mon = mon ** (1 / power)
                 mon.ast = None
         # TODO: make minscale an argument - currently an arbitrary 0.01
-        if (
-            subkey is not None
-            and subkey not in visited_bdkeys
-            and subkey in bd
-            and scaledmonval > 0.05
-        ):
+        crawlable = subkey is not None and subkey not in visited_bdkeys and subkey in bd
+        if crawlable and scaledmonval > MIN_CRAWLED:
             subverbosity = indent + 1 if verbosity else 0  # slight hack
             subsubtree = crawl(
                 basically_fixed_variables,
@@ -503,6 +560,8 @@ def crawl(
                 set(visited_bdkeys),
                 gone_negative,
                 all_visited_bdkeys,
+                memo,
+                sources,
             )
             subtree.append(subsubtree)
         else:
@@ -513,12 +572,42 @@ def crawl(
                 )
                 print("  " * indent + keyvalstr)
             subtree.append(Tree(mon, scaledmonval, []))
+        if sources is not None:  # the chain of nodes just added for origmon
+            node = orig_subtree[-1]
+            sources[id(node)] = (origmon, denom, None)
+            while isinstance(node.key, Transform):
+                node = node.branches[-1]
+                sources[id(node)] = (origmon, denom, None)
+            if crawlable:
+                sources[id(node)] = (origmon, denom, scaledmonval > MIN_CRAWLED)
     if verbosity == 1:
         if not already_set:
             solution.set_necessarylineage(clear=True)
+    if memokey is not None:
+        memo[memokey] = tree
     return tree
 
 
+def revalue(tree, sources, evaluate, base=1):
+    """Returns a copy of tree with values found anew from `crawl`'s sources
+
+    evaluate returns the value of a monomial; if it returns arrays (say, of
+    each point of a sweep) the copy's values will be arrays too.
+    """
+    key, value, branches = tree
+    if id(tree) in sources:
+        mon, denom, _ = sources[id(tree)]
+        value = evaluate(mon) / evaluate(denom)
+        if hasattr(value, "to"):
+            value = value.to("dimensionless").magnitude
+        value = base * np.asarray(value, dtype=float)
+        if not isinstance(key, Transform):
+            base = value
+    else:
+        value = base
+    return Tree(key, value, [revalue(b, sources, evaluate, base) for b in branches])
+
+
 SYMBOLS = string.ascii_uppercase + string.ascii_lowercase
 for ambiguous_symbol in "lILT":
     SYMBOLS = SYMBOLS.replace(ambiguous_symbol, "")
@@ -1056,18 +1145,46 @@ def icicle(ids, labels, parents, values):
 
 
 class Breakdowns(object):
-    def __init__(self, sol):
+    """Breakdowns of a solution, found once and then crawled as needed
+
+    Crawled (sub)trees are memoized, so repeated plots of the same key (or of
+    keys whose breakdowns overlap) reuse each other's work.
+
+    bd and basically_fixed_variables may be given if already found, as they
+    are by `SweepBreakdowns` for points of a sweep with the same breakdowns.
+    """
+
+    _mtree = _mlookup = None
+
+    def __init__(self, sol, *, bd=None, basically_fixed_variables=None):
         self.sol = sol
-        self.mlookup = {}
-        self.mtree = crawl_modelbd(get_model_breakdown(sol), self.mlookup)
-        self.basically_fixed_variables = set()
-        self.bd = get_breakdowns(self.basically_fixed_variables, self.sol)
+        if bd is None:
+            basically_fixed_variables = set()
+            bd = get_breakdowns(basically_fixed_variables, self.sol)
+        self.basically_fixed_variables = basically_fixed_variables
+        self.bd = bd
+        self.memo = {}
+
+    @property
+    def mtree(self):
+        "Tree of the sensitivities of each model"
+        if self._mtree is None:
+            self._mlookup = {}
+            self._mtree = crawl_modelbd(get_model_breakdown(self.sol), self._mlookup)
+        return self._mtree
+
+    @property
+    def mlookup(self):
+        "Trees of the sensitivities of each model, by name"
+        if self._mlookup is None:
+            _ = self.mtree
+        return self._mlookup
 
     def trace(self, key, *, permissivity=2):
         print("")  # a little padding to start
         self.get_tree(key, permissivity=permissivity, verbosity=1)
 
-    def get_tree(self, key, *, permissivity=2, verbosity=0):
+    def get_tree(self, key, *, permissivity=2, verbosity=0, sources=None):
         tree = None
         kind = "variable"
         if isinstance(key, str):
@@ -1099,6 +1216,8 @@ class Breakdowns(object):
                 self.sol,
                 permissivity=permissivity,
                 verbosity=verbosity,
+                memo=self.memo,
+                sources=sources,
             )
         return tree, kind
 
@@ -1116,7 +1235,7 @@ class Breakdowns(object):
         )
 
     def treemap(self, key, *, permissivity=2, returnfig=False, filename=None):
-        tree, _ = self.get_tree(key)
+        tree, _ = self.get_tree(key, permissivity=permissivity)
         fig = treemap(*plotlyify(tree, self.sol))
         if returnfig:
             return fig
@@ -1144,3 +1263,109 @@ class Breakdowns(object):
         import plotly
 
         plotly.offline.plot(fig, filename=filename)
+
+
+def _at(value, idx):
+    "Indexes value at idx, unless it's the same for every point of a sweep"
+    return value[idx] if np.ndim(value) else value
+
+
+class SweepBreakdowns(object):
+    """Breakdowns of each point of a sweep, found once per distinct structure
+
+    Points whose constraints break down the same variables in the same ways
+    are grouped, and share breakdowns found once for the whole group. Trees
+    can then be crawled at any one point (`get_tree`, or `point(i).plot`),
+    or be evaluated at every point of a group at once (`contributions`).
+    """
+
+    def __init__(self, sol):
+        self.sol = sol
+        senss = sol["sensitivities"]["constraints"]
+        vrisk = sol["sensitivities"]["variablerisk"]
+        cache, groups = {}, {}
+        for i in range(len(sol)):
+            choices = breakdown_choices(
+                sol,
+                {constraint: _at(sens, i) for constraint, sens in senss.items()},
+                lambda vk: _at(vrisk.get(vk, 0), i),
+                cache,
+            )
+            signature = tuple((vk, c, id(a), d) for vk, c, a, d in choices)
+            groups.setdefault(signature, (choices, []))[1].append(i)
+        self.groups = list(groups.values())  # [(choices, point indexes)]
+        self.group_of = np.empty(len(sol), dtype=int)
+        for group, (_, idxs) in enumerate(self.groups):
+            self.group_of[idxs] = group
+        self._found = {}  # {group: (bd, basically_fixed_variables)}
+        self._points = {}  # {point index: Breakdowns}
+        self._values = {}  # {id(nomial): (nomial, value at each point)}
+
+    def point(self, i):
+        "Returns the Breakdowns of the i-th point of the sweep"
+        if i not in self._points:
+            pointsol = self.sol.atindex(i)
+            group = self.group_of[i]
+            if group not in self._found:
+                fixed = set()
+                bd = get_breakdowns(fixed, pointsol, self.groups[group][0])
+                self._found[group] = (bd, fixed)
+            bd, fixed = self._found[group]
+            self._points[i] = Breakdowns(
+                pointsol, bd=bd, basically_fixed_variables=fixed
+            )
+        return self._points[i]
+
+    def get_tree(self, key, i, *, permissivity=2):
+        "Returns the tree of breakdowns of key at the i-th point of the sweep"
+        return self.point(i).get_tree(key, permissivity=permissivity)
+
+    def _evaluate(self, nomial):
+        "Value of nomial at each point of the sweep"
+        if id(nomial) not in self._values:
+            self._values[id(nomial)] = (nomial, self.sol(nomial))
+        return self._values[id(nomial)][1]
+
+    def contributions(self, key, *, permissivity=2):
+        """Returns {node key: its share of key's value, at each point}
+
+        Points whose trees of key have the same nodes are grouped further, and
+        each such group's tree is crawled at its first point, then evaluated
+        at all its points at once. (Which of several variables to break down
+        is also chosen at that first point.) A key in several nodes of a tree
+        is summed, and is nan at points whose tree lacks it.
+        """
+        shares = {}
+        for _, pending in self.groups:
+            while pending:
+                sources = {}
+                tree, kind = self.point(pending[0]).get_tree(
+                    key, permissivity=permissivity, sources=sources
+                )
+                if kind != "variable":
+                    raise ValueError("contributions are only found for variables.")
+                valued = revalue(
+                    tree, sources, lambda mon: _at(self._evaluate(mon), pending)
+                )
+                same = np.ones(len(pending), dtype=bool)
+                groupshares = defaultdict(float)
+                trees = [(tree, valued)]
+                while trees:
+                    tree, (nodekey, value, branches) = trees.pop()
+                    crawled = sources.get(id(tree), (None, None, None))[2]
+                    if crawled is not None:  # did others cross MIN_CRAWLED?
+                        same &= (value > MIN_CRAWLED) == crawled
+                    if not isinstance(nodekey, Transform):
+                        groupshares[nodekey] = groupshares[nodekey] + value
+                    trees.extend(zip(tree.branches, branches))
+                # the first point's own tree is exact, even where re-evaluating
+                # a node at MIN_CRAWLED flips its comparison; keeping it here
+                # also ensures every pass shrinks `pending`
+                same[0] = True
+                idxs = [i for i, s in zip(pending, same) if s]
+                for nodekey, value in groupshares.items():
+                    if nodekey not in shares:
+                        shares[nodekey] = np.full(len(self.sol), np.nan)
+                    shares[nodekey][idxs] = np.broadcast_to(value, same.shape)[same]
+                pending = [i for i, s in zip(pending, same) if not s]
+        return shares
@@ -86,27 +86,59 @@ class Bounded(ConstraintSet):
 
     def check_boundaries(self, result):
         "Creates (and potentially prints) a dictionary of unbounded variables."
-        out = defaultdict(set)
-        initsolwarning(result, "Arbitrarily Bounded Variables")
+        bound_senss = {}
         for i, varkey in enumerate(self.bound_varkeys):
-            value = result["variables"][varkey]
             c_senss = [
                 result["sensitivities"]["constraints"].get(c, 0)
                 for c in self["variable bounds"][i]
             ]
-            if self.lowerbound:
-                bound = f"lower bound of {self.lowerbound:.2g}"
-                if c_senss[0] >= self.sens_threshold:
-                    out["sensitive to " + bound].add(varkey)
-                if np.log(value / self.lowerbound) <= self.logtol_threshold:
-                    out["value near " + bound].add(varkey)
-            if self.upperbound:
-                bound = f"upper bound of {self.upperbound:.2g}"
-                if c_senss[-1] >= self.sens_threshold:
-                    out["sensitive to " + bound].add(varkey)
-                if np.log(self.upperbound / value) <= self.logtol_threshold:
-                    out["value near " + bound].add(varkey)
-        for bound, vks in out.items():
-            msg = f"{bound:>34}: {', '.join(str(v) for v in vks)}"
-            appendsolwarning(msg, out, result, "Arbitrarily Bounded Variables")
-        return out
+            bound_senss[varkey] = (c_senss[0], c_senss[-1])
+        return check_boundaries(
+            result,
+            bound_senss,
+            self.lowerbound,
+            self.upperbound,
+            sens_threshold=self.sens_threshold,
+            logtol_threshold=self.logtol_threshold,
+        )
+
+
+def check_boundaries(
+    result,
+    bound_senss,
+    lowerbound,
+    upperbound,
+    *,
+    sens_threshold=Bounded.sens_threshold,
+    logtol_threshold=Bounded.logtol_threshold,
+):
+    """Adds warnings to result about variables arbitrarily bounded
+
+    Arguments
+    ---------
+    bound_senss : dict
+        {varkey: (sensitivity to its lower bound, to its upper bound)}
+
+    lowerbound, upperbound : float or None
+        the bounds, if any
+    """
+    out = defaultdict(set)
+    initsolwarning(result, "Arbitrarily Bounded Variables")
+    for varkey, (lower_sens, upper_sens) in bound_senss.items():
+        value = result["variables"][varkey]
+        if lowerbound:
+            bound = f"lower bound of {lowerbound:.2g}"
+            if lower_sens >= sens_threshold:
+                out["sensitive to " + bound].add(varkey)
+            if np.log(value / lowerbound) <= logtol_threshold:
+                out["value near " + bound].add(varkey)
+        if upperbound:
+            bound = f"upper bound of {upperbound:.2g}"
+            if upper_sens >= sens_threshold:
+                out["sensitive to " + bound].add(varkey)
+            if np.log(upperbound / value) <= logtol_threshold:
+                out["value near " + bound].add(varkey)
+    for bound, vks in out.items():
+        msg = f"{bound:>34}: {', '.join(str(v) for v in vks)}"
+        appendsolwarning(msg, out, result, "Arbitrarily Bounded Variables")
+    return out
@@ -19,6 +19,16 @@ class CostedConstraintSet(ConstraintSet):
 
     lineage = None
 
+    @property
+    def cost(self):
+        "The cost this set minimizes"
+        return self.__dict__.get("cost")
+
+    @cost.setter
+    def cost(self, cost):
+        self._changed()  # kept in __dict__, as it was before being a property
+        self.__dict__["cost"] = cost
+
     def __init__(self, cost, constraints, substitutions=None):
         self.cost = maybe_flatten(cost)
         if isinstance(self.cost, np.ndarray):  # if it's still a vector
@@ -3,7 +3,7 @@
 
 import sys
 import warnings as pywarnings
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from time import time
 
 import numpy as np
@@ -17,16 +17,22 @@ from ..exceptions import (
     UnboundedGP,
     UnknownInfeasible,
 )
-from ..keydict import KeyDict
+from ..keydict import KeyDict, SlotKeyDict
 from ..nomials.map import NomialMap
 from ..repr_conventions import lineagestr
 from ..small_classes import CootMatrix, FixedScalar, Numbers, SolverLog
 from ..small_scripts import appendsolwarning, initsolwarning
 from ..solution_array import SolutionArray
-from .set import ConstraintSet
+from ..units import magnitude_in
+from .kkt import KKTSystem
+from .set import ConstraintSet, propagate_bounds, unmet_conditions
 
 DEFAULT_SOLVER_KWARGS = {"cvxopt": {"kktsolver": "ldl"}}
 SOLUTION_TOL = {"cvxopt": 1e-3, "mosek_cli": 1e-4, "mosek_conif": 1e-3}
+# {(exps, meq_idxs): missingbounds} of recently checked GPs, shared by all of
+# them so that a sweep's programs, which have one structure, are checked once
+BOUNDS_CACHE = OrderedDict()
+BOUNDS_CACHE_SIZE = 8
 
 
 # pylint: disable=too-few-public-methods
@@ -65,6 +71,30 @@ def _get_solver(solver, kwargs):
     return solver, optimize
 
 
+def clean_substitutions(substitutions):
+    "Replaces FixedScalars in substitutions with their magnitudes, in-place"
+    for key, sub in substitutions.items():
+        if isinstance(sub, FixedScalar):
+            sub = sub.value
+            if hasattr(sub, "units"):
+                sub = magnitude_in(sub, key.units)
+            substitutions[key] = sub
+        if not isinstance(sub, (Numbers, np.ndarray)):
+            raise TypeError(
+                f"substitution {{{key}: {sub}}} has invalid value type {type(sub)}."
+            )
+
+
+def source_constraint(hmap):
+    "Returns the constraint a GP's posynomial came from, as a user would see it"
+    constraint = hmap
+    while getattr(constraint, "parent", None) is not None:
+        constraint = constraint.parent
+    while getattr(constraint, "generated_by", None):
+        constraint = constraint.generated_by
+    return constraint
+
+
 class GeometricProgram:
     # pylint: disable=too-many-instance-attributes
     """Standard mathematical representation of a GP.
@@ -73,6 +103,7 @@ class GeometricProgram:
     ----------------------------
     `solver_out` and `solve_log` are set during a solve
     `result` is set at the end of a solve if solution status is optimal
+    `kkt`, the KKTSystem of the solution, is set when a result is compiled
 
     Examples
     --------
@@ -84,21 +115,12 @@ class GeometricProgram:
                         ], {})
     >>> gp.solve()
     """
-    _result = solve_log = solver_out = model = v_ss = nu_by_posy = None
+    _result = solve_log = solver_out = model = v_ss = nu_by_posy = kkt = None
     choicevaridxs = integersolve = None
 
     def __init__(self, cost, constraints, substitutions, *, checkbounds=True, **_):
         self.cost, self.substitutions = cost, substitutions
-        for key, sub in self.substitutions.items():
-            if isinstance(sub, FixedScalar):
-                sub = sub.value
-                if hasattr(sub, "units"):
-                    sub = sub.to(key.units or "dimensionless").magnitude
-                self.substitutions[key] = sub
-            if not isinstance(sub, (Numbers, np.ndarray)):
-                raise TypeError(
-                    f"substitution {{{key}: {sub}}} has invalid value type {type(sub)}."
-                )
+        clean_substitutions(self.substitutions)
         cost_hmap = cost.hmap.sub(self.substitutions, cost.vks)
         if any(c <= 0 for c in cost_hmap.values()):
             raise InvalidPosynomial("a GP's cost must be Posynomial")
@@ -110,33 +132,45 @@ class GeometricProgram:
 
     def check_bounds(self, *, err_on_missing_bounds=False):
         "Checks if any variables are unbounded, through equality constraints."
-        missingbounds = {}
-        for var, locs in self.varlocs.items():
-            upperbound, lowerbound = False, False
-            for i in locs:
-                if i not in self.meq_idxs.all:
-                    if (
-                        self.exps[i][var] > 0
-                    ):  # pylint:disable=simplifiable-if-statement
-                        upperbound = True
-                    else:
-                        lowerbound = True
-                if upperbound and lowerbound:
-                    break
-            if not upperbound:
-                missingbounds[(var, "upper")] = "."
-            if not lowerbound:
-                missingbounds[(var, "lower")] = "."
-        if not missingbounds:
-            return {}  # all bounds found in inequalities
-        meq_bounds = gen_meq_bounds(missingbounds, self.exps, self.meq_idxs)
-        fulfill_meq_bounds(missingbounds, meq_bounds)
+        structure = (tuple(self.exps), frozenset(self.meq_idxs.all))
+        missingbounds = BOUNDS_CACHE.get(structure)
+        if missingbounds is None:
+            missingbounds = self._find_missingbounds()
+            BOUNDS_CACHE[structure] = missingbounds
+            if len(BOUNDS_CACHE) > BOUNDS_CACHE_SIZE:
+                BOUNDS_CACHE.popitem(last=False)  # the least recently used
+        else:
+            BOUNDS_CACHE.move_to_end(structure)
         if missingbounds and err_on_missing_bounds:
             raise UnboundedGP(
                 "\n\n".join(
                     f"{v} has no {b} bound{x}" for (v, b), x in missingbounds.items()
                 )
             )
+        return dict(missingbounds)
+
+    def _find_missingbounds(self):
+        "Returns {bound: explanation} of bounds that no constraint provides"
+        bounded = set()
+        for var, locs in self.varlocs.items():
+            for i in locs:
+                if i not in self.meq_idxs.all:
+                    bounded.add((var, "upper" if self.exps[i][var] > 0 else "lower"))
+        missingbounds = {}
+        for var in self.varlocs:
+            for direction in ("upper", "lower"):
+                if (var, direction) not in bounded:
+                    missingbounds[(var, direction)] = "."
+        if not missingbounds:
+            return {}  # all bounds found in inequalities
+        meq_bounds = gen_meq_bounds(bounded, self.exps, self.meq_idxs)
+        propagate_bounds(bounded, meq_bounds)
+        for bound in [b for b in missingbounds if b in bounded]:
+            del missingbounds[bound]
+        for bound, conditions in unmet_conditions(bounded, meq_bounds).items():
+            missingbounds[bound] = ", but would gain it from any of these sets: " + (
+                " or ".join(str(list(condition)) for condition in conditions)
+            )
         return missingbounds
 
     def gen(self):
@@ -276,12 +310,18 @@ class GeometricProgram:
                 " Running `.debug()` or increasing verbosity may pinpoint"
                 " the trouble."
             )
-            raise infeasibility.__class__(msg) from infeasibility
+            err = infeasibility.__class__(msg)
+            err.la, err.nu = infeasibility.la, infeasibility.nu
+            if err.la is not None:
+                err.conflicts = conflicts = self.conflicts(err.la, err.nu)
+                err.args = (msg + conflicts_msg(conflicts),)
+            raise err from infeasibility
 
         if not gen_result:
             return solver_out
         # else, generate a human-readable SolutionArray
         self._result = self.generate_result(solver_out, verbosity=verbosity - 2)
+        self._result.kkt = self.kkt
         return self.result
 
     @property
@@ -336,7 +376,7 @@ class GeometricProgram:
             solver_out["la"] = la = np.array([sum(nup) for nup in nu_by_posy])
         elif "la" in solver_out:
             la = np.ravel(solver_out["la"])
-            if len(la) == len(self.hmaps) - 1:
+            if len(la) == len(self.k) - 1:
                 # assume solver dropped the cost's sensitivity (always 1.0)
                 la = np.hstack(([1.0], la))
             # solver gave us posynomial sensitivities, generate monomial ones
@@ -380,18 +420,86 @@ class GeometricProgram:
                 c.generated_by.generated = c
                 c = c.generated_by  # ...while generated_bys are just labels
             result["sensitivities"]["constraints"][c] = c_senss
-            m_senss[lineagestr(c)] += abs(c_senss)
+            m_senss[tuple(getattr(c, "lineage", None) or ())] += abs(c_senss)
 
         return cost_senss, gpv_ss, absv_ss, m_senss
 
+    def conflicts(self, la, nu=None):
+        """Ranks the constraints and constants in a certificate of infeasibility
+
+        Arguments
+        ---------
+        la : array
+            Posynomial duals proving this GP infeasible, with or without the
+            cost's (which is ignored), e.g. an Infeasible exception's `.la`
+        nu : array (optional)
+            The corresponding monomial duals; if not given, each posynomial's
+            dual is split among its monomials in proportion to their
+            coefficients.
+
+        Returns
+        -------
+        dict with the following keys, each a list of (weight, item) tuples
+        sorted from most to least conflicting:
+            "constraints": constraints, weighted by their share of la
+            "constants": the varkeys of constants, weighted by the
+                sensitivity of the certificate to their logarithms; lowering
+                those with positive weights (or raising those with negative
+                weights) works towards feasibility.
+        """
+        la = np.array(np.ravel(la), dtype=float)
+        if len(la) == len(self.k) - 1:
+            la = np.hstack(([0.0], la))
+        la[0] = 0  # the cost takes no part in a certificate
+        la[~(la > 0)] = 0
+        scale = la.sum() or 1.0
+        la /= scale
+        if nu is None:
+            cs = np.array(self.cs)
+            nu_by_posy = [
+                la[i] * cs[mi] / cs[mi].sum() for i, mi in enumerate(self.m_idxs)
+            ]
+        else:
+            nu = np.array(np.ravel(nu), dtype=float) / scale
+            nu_by_posy = [nu[mi] for mi in self.m_idxs]
+        constraints, meq_halves = {}, {}  # {id: [weight, constraint]}, {id: la}
+        v_ss = defaultdict(float)
+        for las, nus, hmap in zip(la[1:], nu_by_posy[1:], self.hmaps[1:]):
+            c = source_constraint(hmap)
+            constraints.setdefault(id(c), [0.0, c])[0] += las
+            parent = getattr(hmap, "parent", None)
+            if not hasattr(parent, "presub_v"):
+                continue  # constants it has were already substituted in
+            if getattr(hmap, "from_meq", False):
+                if id(parent) not in meq_halves:
+                    meq_halves[id(parent)] = las
+                    continue
+                las = meq_halves.pop(id(parent)) - las
+            for vk, x in parent.presub_v(las, nus).items():
+                v_ss[vk] += x
+        return {
+            "constraints": sorted(
+                (tuple(wc) for wc in constraints.values() if wc[0] > 1e-8),
+                key=lambda wc: -wc[0],
+            ),
+            "constants": sorted(
+                (
+                    (x, vk)
+                    for vk, x in v_ss.items()
+                    if vk in self.substitutions and abs(x) > 1e-8
+                ),
+                key=lambda xvk: -abs(xvk[0]),
+            ),
+        }
+
     def _compile_result(self, solver_out):
         result = {"cost": float(solver_out["objective"]), "cost function": self.cost}
         primal = solver_out["primal"]
         if len(self.varlocs) != len(primal):
             raise RuntimeWarning("The primal solution was not returned.")
-        result["freevariables"] = KeyDict(zip(self.varlocs, np.exp(primal)))
+        result["freevariables"] = SlotKeyDict(zip(self.varlocs, np.exp(primal)))
         result["constants"] = KeyDict(self.substitutions)
-        result["variables"] = KeyDict(result["freevariables"])
+        result["variables"] = SlotKeyDict(result["freevariables"])
         result["variables"].update(result["constants"])
         result["soltime"] = solver_out["soltime"]
 
@@ -433,6 +541,7 @@ class GeometricProgram:
 
         result["sensitivities"] = {"constraints": {}}
         la, self.nu_by_posy = self._generate_nula(solver_out)
+        self.kkt = KKTSystem(self, solver_out["primal"], la)  # before senss
         cost_senss, gpv_ss, absv_ss, m_senss = self._calculate_sensitivities(
             result, la, self.nu_by_posy
         )
@@ -458,15 +567,18 @@ class GeometricProgram:
 
         # Add fixed variable sensitivities to models
         for vk, senss in gpv_ss.items():
-            m_senss[lineagestr(vk)] += abs(senss)
+            m_senss[tuple(vk.lineage or ())] += abs(senss)
 
         result["sensitivities"]["cost"] = cost_senss
-        result["sensitivities"]["variables"] = KeyDict(gpv_ss)
-        result["sensitivities"]["variablerisk"] = KeyDict(absv_ss)
+        result["sensitivities"]["variables"] = SlotKeyDict(gpv_ss)
+        result["sensitivities"]["variablerisk"] = SlotKeyDict(absv_ss)
         result["sensitivities"]["constants"] = result["sensitivities"][
             "variables"
         ]  # NOTE: backwards compat.
-        result["sensitivities"]["models"] = dict(m_senss)
+        models = defaultdict(float)
+        for lineage, senss in m_senss.items():  # one string per model, not per key
+            models[lineagestr(lineage)] += senss
+        result["sensitivities"]["models"] = dict(models)
         return SolutionArray(result)
 
     def check_solution(self, cost, primal, nu, la, tol, abstol=1e-20):
@@ -542,72 +654,41 @@ class GeometricProgram:
             )
 
 
-def gen_meq_bounds(
-    missingbounds, exps, meq_idxs
-):  # pylint: disable=too-many-locals,too-many-branches
-    "Generate conditional monomial equality bounds"
+def gen_meq_bounds(bounded, exps, meq_idxs):
+    "Generate the conditions under which monomial equalities bound variables"
     meq_bounds = defaultdict(set)
     for i in meq_idxs.first_half:
-        p_upper, p_lower, n_upper, n_lower = set(), set(), set(), set()
-        for key, x in exps[i].items():
-            if (key, "upper") in missingbounds:
-                if x > 0:
-                    p_upper.add((key, "upper"))
-                else:
-                    n_upper.add((key, "upper"))
-            if (key, "lower") in missingbounds:
-                if x > 0:
-                    p_lower.add((key, "lower"))
-                else:
-                    n_lower.add((key, "lower"))
         # (consider x*y/z == 1)
         # for a var (e.g. x) to be upper bounded by this monomial equality,
         #   - vars of the same sign (y) must be lower bounded
         #   - AND vars of the opposite sign (z) must be upper bounded
-        p_ub = n_lb = frozenset(n_upper).union(p_lower)
-        n_ub = p_lb = frozenset(p_upper).union(n_lower)
-        for keys, ub in ((p_upper, p_ub), (n_upper, n_ub)):
-            for key, _ in keys:
-                needed = ub.difference([(key, "lower")])
-                if needed:
-                    meq_bounds[(key, "upper")].add(needed)
-                else:
-                    del missingbounds[(key, "upper")]
-        for keys, lb in ((p_lower, p_lb), (n_lower, n_lb)):
-            for key, _ in keys:
-                needed = lb.difference([(key, "upper")])
-                if needed:
-                    meq_bounds[(key, "lower")].add(needed)
-                else:
-                    del missingbounds[(key, "lower")]
+        p_ub = n_lb = frozenset(
+            (key, "upper" if x < 0 else "lower") for key, x in exps[i].items()
+        ).difference(bounded)
+        n_ub = p_lb = frozenset(
+            (key, "upper" if x > 0 else "lower") for key, x in exps[i].items()
+        ).difference(bounded)
+        for key, x in exps[i].items():
+            if (key, "upper") not in bounded:
+                needed = p_ub if x > 0 else n_ub
+                meq_bounds[(key, "upper")].add(needed.difference([(key, "lower")]))
+            if (key, "lower") not in bounded:
+                needed = p_lb if x > 0 else n_lb
+                meq_bounds[(key, "lower")].add(needed.difference([(key, "upper")]))
     return meq_bounds
 
 
-def fulfill_meq_bounds(missingbounds, meq_bounds):
-    "Bounds variables with monomial equalities"
-    still_alive = True
-    while still_alive:
-        still_alive = False  # if no changes are made, the loop exits
-        for bound in set(meq_bounds):
-            if bound not in missingbounds:
-                del meq_bounds[bound]
-                continue
-            for condition in meq_bounds[bound]:
-                if not any(bound in missingbounds for bound in condition):
-                    del meq_bounds[bound]
-                    del missingbounds[bound]
-                    still_alive = True
-                    break
-    for var, bound in meq_bounds:
-        boundstr = ", but would gain it from any of these sets: "
-        for condition in list(meq_bounds[(var, bound)]):
-            meq_bounds[(var, bound)].remove(condition)
-            newcond = condition.intersection(missingbounds)
-            if newcond and not any(
-                c.issubset(newcond) for c in meq_bounds[(var, bound)]
-            ):
-                meq_bounds[(var, bound)].add(newcond)
-        boundstr += " or ".join(
-            str(list(condition)) for condition in meq_bounds[(var, bound)]
-        )
-        missingbounds[(var, bound)] = boundstr
+def conflicts_msg(conflicts, n=3):
+    "Describes the first few entries of GeometricProgram.conflicts' output"
+    msg = ""
+    if conflicts["constraints"]:
+        msg += "\nThe constraints most involved in the conflict are:"
+        for weight, constraint in conflicts["constraints"][:n]:
+            if hasattr(constraint, "str_without"):
+                constraint = constraint.str_without(["units", "lineage"])
+            msg += f"\n  {weight:.2g}: {constraint}"
+    if conflicts["constants"]:
+        msg += "\nThe constants most involved, with their sensitivities, are:"
+        for weight, vk in conflicts["constants"][:n]:
+            msg += f"\n  {weight:+.2g}: {vk}"
+    return msg
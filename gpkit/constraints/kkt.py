@@ -0,0 +1,278 @@
+"Implicit differentiation of a solved GP's optimality conditions"
+
+import numpy as np
+
+
+class KKTSystem:
+    """The optimality (KKT) conditions of a GP, linearized at its solution
+
+    Differentiating these conditions implicitly gives the response of the
+    optimal (log) free variables to changes in (log) constants, valid to first
+    order for as long as the same constraints stay tight. The system is built
+    and factored when first needed, and then reused for every right-hand side.
+
+    Arguments
+    ---------
+    gp : GeometricProgram
+        The solved GP. Its constraints' substitution maps are captured here,
+        so this must be created before sens_from_dual deletes them.
+    primal : array
+        Optimal log values of the GP's free variables
+    la : array
+        Optimal duals of the GP's posynomials, including its cost's
+    """
+
+    tight_la = 1e-6  # constraints with greater duals are taken to be tight
+    chunksize = 256  # constants whose Jacobian columns are solved for at once
+
+    def __init__(self, gp, primal, la):
+        self.freevariables = list(gp.varlocs)
+        self.varidxs = gp.varidxs
+        self.constants = gp.substitutions
+        self.A, self.cs, self.p_idxs = gp.A, gp.cs, gp.p_idxs
+        self.m_idxs = gp.m_idxs
+        self.primal, self.la = np.ravel(primal), np.ravel(la)
+        self.meq_halves = {}  # {p_idx: True if first half of an equality}
+        for m_idx in gp.meq_idxs.all:
+            self.meq_halves[gp.p_idxs[m_idx]] = m_idx in gp.meq_idxs.first_half
+        cost_mmap = gp.hmaps[0].mmap(gp.cost.hmap)
+        self.presubs = [(gp.cost.hmap, None, cost_mmap, None, None)]
+        halves = {}  # {id(parent): how many of its hmaps have been seen}
+        for hmap in gp.hmaps[1:]:
+            parent = getattr(hmap, "parent", None)
+            if not hasattr(parent, "presub_v"):
+                self.presubs.append(None)
+                continue
+            i = halves[id(parent)] = halves.get(id(parent), -1) + 1
+            self.presubs.append(  # (without a pmap its monomials map one-to-one)
+                (
+                    parent,
+                    i,
+                    getattr(parent, "pmap", None),
+                    getattr(parent, "const_mmap", None),
+                    getattr(parent, "const_coeff", None),
+                )
+            )
+        self._factored = self._exps = self._jacobian = None
+
+    def dlog_coefficients(self, constants):
+        """Returns the change in the log of each monomial's coefficient
+
+        Arguments
+        ---------
+        constants : KeyDict
+            New values for the GP's constants. Linked constants change (to
+            first order) with those they are linked to, and are updated to
+            match in `constants`.
+        """
+        exps, keys = self.coefficient_exps()
+        dlogconsts = np.zeros(len(keys))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i, vk in enumerate(keys):
+                old = self.constants[vk]
+                dlogconsts[i] = np.log(constants[vk] / old)
+                if not vk.gradients:
+                    continue
+                for c, dv_dc in vk.gradients.items():
+                    if c in constants:
+                        dlogc = np.log(constants[c] / self.constants[c])
+                        dlogconsts[i] += dv_dc * self.constants[c] / old * dlogc
+                constants[vk] = old * np.exp(dlogconsts[i])
+        return exps @ np.nan_to_num(dlogconsts)
+
+    def coefficient_exps(self):
+        """Returns the sparse Jacobian of monomials' log coefficients with
+        respect to the log of each constant, and those constants' varkeys"""
+        if self._exps is None:
+            # imported here because scipy.sparse is slow to import
+            # pylint: disable=import-outside-toplevel
+            from scipy.sparse import csr_matrix
+
+            rows, cols, data, keys = [], [], [], {}
+
+            def add(m_idxs, exp, scale):
+                for vk, x in exp.items():
+                    if vk not in self.varidxs:  # then it's a constant
+                        col = keys.setdefault(vk, len(keys))
+                        rows.extend(m_idxs)
+                        cols.extend([col] * len(m_idxs))
+                        data.extend([scale * x] * len(m_idxs))
+
+            for p_idx, presub in enumerate(self.presubs):
+                if presub is None:
+                    continue
+                source, i, pmap, const_mmap, const_coeff = presub
+                exps = list(source if i is None else source.unsubbed[i].hmap)
+                m_idxs = range(self.m_idxs[p_idx].start, self.m_idxs[p_idx].stop)
+                if pmap is None:
+                    pmap = [{idx: 1.0} for idx in range(len(m_idxs))]
+                for m_idx, mmap in zip(m_idxs, pmap):
+                    for idx, fraction in mmap.items():
+                        add([m_idx], exps[idx], fraction)
+                if const_mmap:  # the posynomial was divided by 1 - constant
+                    scale = (1 - const_coeff) / const_coeff
+                    for idx, fraction in const_mmap.items():
+                        add(m_idxs, exps[idx], scale * fraction)
+            self._exps = (
+                csr_matrix((data, (rows, cols)), shape=(len(self.cs), len(keys))),
+                list(keys),
+            )
+        return self._exps
+
+    def factor(self):
+        """Builds and factors the linearized optimality conditions
+
+        In log space, with the cost's dual fixed at 1, those conditions are
+            sum_i la_i grad f_i(y) = 0,  f_i(y) = 0 for each tight posynomial i
+        where f_i is the log-sum-exp of posynomial i's monomials' logs z.
+        With w the softmax of z within each posynomial and nu = la * w,
+        differentiating them with respect to y, la and the monomials' log
+        coefficients b gives the symmetric system
+            [A'MA  G'] [dy ]     [A'M db]
+            [G     0 ] [dla] = - [W db  ]
+        where M = diag(nu) - sum_i nu_i nu_i' / la_i, the rows of W are each
+        tight posynomial's w, and G = W A.
+        """
+        if self._factored is not None:
+            return self._factored
+        # imported here because scipy.sparse is slow to import
+        # pylint: disable=import-outside-toplevel
+        from scipy.sparse import bmat, csr_matrix, diags
+        from scipy.sparse.linalg import splu
+
+        A, p_idxs, la = self.A.tocsr(), self.p_idxs, self.la
+        n_mons, n_vars = len(self.cs), len(self.freevariables)
+        A.resize((n_mons, n_vars))
+        z = np.log(self.cs) + A @ self.primal
+        w = np.empty(n_mons)
+        logsumexps = np.empty(len(la))
+        for p_idx, m_idxs in enumerate(self.m_idxs):
+            zmax = z[m_idxs].max()
+            exps = np.exp(z[m_idxs] - zmax)
+            w[m_idxs] = exps / exps.sum()
+            logsumexps[p_idx] = zmax + np.log(exps.sum())
+        nu = la[p_idxs] * w
+        curved = [i for i, m_is in enumerate(self.m_idxs) if m_is.stop - m_is.start > 1]
+        curved = [i for i in curved if la[i] > 0]
+        u_rows, u_cols, u_data = [], [], []
+        for col, p_idx in enumerate(curved):
+            m_idxs = range(self.m_idxs[p_idx].start, self.m_idxs[p_idx].stop)
+            u_rows.extend(m_idxs)
+            u_cols.extend([col] * len(m_idxs))
+            u_data.extend(nu[m_idxs] / np.sqrt(la[p_idx]))
+        U = csr_matrix((u_data, (u_rows, u_cols)), shape=(n_mons, len(curved)))
+        AtU = A.T @ U
+        tight = [
+            i
+            for i in range(1, len(la))
+            if self.meq_halves.get(i, la[i] > self.tight_la)
+        ]
+        w_rows, w_cols, w_data = [], [], []
+        for row, p_idx in enumerate(tight):
+            m_idxs = range(self.m_idxs[p_idx].start, self.m_idxs[p_idx].stop)
+            w_rows.extend([row] * len(m_idxs))
+            w_cols.extend(m_idxs)
+            w_data.extend(w[m_idxs])
+        W = csr_matrix((w_data, (w_rows, w_cols)), shape=(len(tight), n_mons))
+        H = A.T @ diags(nu) @ A - AtU @ AtU.T
+        G = W @ A
+        K = bmat([[H, G.T], [G, None]], format="csc")
+        try:
+            solve = splu(K).solve
+        except RuntimeError:  # singular, e.g. from degenerate tight constraints
+            pinv = np.linalg.pinv(K.toarray())
+            solve = pinv.dot
+        self._factored = {
+            "solve": solve,
+            "A": A,
+            "U": U,
+            "AtU": AtU,
+            "W": W,
+            "nu": nu,
+            "w": w,
+            "tight": tight,
+            "logsumexps": logsumexps,
+        }
+        return self._factored
+
+    def solve(self, db):
+        """Returns the first-order changes in the optimal log free variables
+        and tight constraints' duals caused by the change db in the log of
+        each monomial's coefficient (db may have a column per change)"""
+        f = self.factor()
+        rhs = np.concatenate(
+            [
+                -(f["A"].T @ (f["nu"] * db.T).T - f["AtU"] @ (f["U"].T @ db)),
+                -(f["W"] @ db),
+            ]
+        )
+        dyla = f["solve"](rhs)
+        n_vars = len(self.freevariables)
+        return dyla[:n_vars], dyla[n_vars:]
+
+    def predict(self, constants):
+        """Predicts the log change in the optimal free variables and cost
+
+        Arguments
+        ---------
+        constants : KeyDict
+            New values for the GP's constants (see dlog_coefficients)
+
+        Returns
+        -------
+        dlogx : array
+            Change in the log of each free variable (ordered as in the GP)
+        dlogcost : float
+            Change in the log of the cost
+        trust : float
+            Fraction (from 0 to 1) of the change for which the same
+            constraints are predicted to stay tight and the rest loose
+        """
+        f = self.factor()
+        db = self.dlog_coefficients(constants)
+        dy, dla = self.solve(db)
+        dz = f["A"] @ dy + db
+        df = np.bincount(self.p_idxs, weights=f["w"] * dz, minlength=len(self.la))
+        trust = 1.0
+        tight = set(f["tight"])
+        for p_idx in range(1, len(self.la)):
+            if p_idx not in tight and p_idx not in self.meq_halves and df[p_idx] > 0:
+                trust = min(trust, -f["logsumexps"][p_idx] / df[p_idx])
+        for p_idx, dla_i in zip(f["tight"], dla):
+            if p_idx not in self.meq_halves and dla_i < 0:
+                trust = min(trust, self.la[p_idx] / -dla_i)
+        return dy, df[0], max(trust, 0.0)
+
+    def jacobian(self):
+        """Returns the log derivatives of the optimal free variables with
+        respect to the constants, and those constants' varkeys
+
+        The derivatives are solved for with the single factorization of the
+        KKT system, a right-hand side per constant. As in a solution's
+        sensitivities, linked constants are replaced by those they are
+        linked to.
+
+        Returns
+        -------
+        jacobian : array of shape (free variables, constants)
+            d log(free variable) / d log(constant), with rows ordered as
+            the GP's free variables
+        constants : list of VarKeys
+        """
+        if self._jacobian is None:
+            exps, keys = self.coefficient_exps()
+            jac = np.zeros((len(self.freevariables), len(keys)))
+            for start in range(0, len(keys), self.chunksize):
+                cols = slice(start, start + self.chunksize)
+                jac[:, cols], _ = self.solve(exps[:, cols].toarray())
+            columns = dict(zip(keys, jac.T))
+            for v in [v for v in keys if v.gradients]:
+                dlogx_dlogv = columns.pop(v)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    for c, dv_dc in v.gradients.items():
+                        dlogv_dlogc = dv_dc * self.constants[c] / self.constants[v]
+                        before = columns.get(c, 0)
+                        columns[c] = before + dlogx_dlogv * np.nan_to_num(dlogv_dlogc)
+            jac = np.array(list(columns.values())).T.reshape(len(jac), len(columns))
+            self._jacobian = jac, list(columns)
+        return self._jacobian
@@ -10,7 +10,7 @@ from ..tools.docstring import expected_unbounded
 from .costed import CostedConstraintSet
 from .gp import GeometricProgram
 from .prog_factories import progify, solvify
-from .set import add_meq_bounds
+from .set import propagate_bounds, unmet_conditions
 from .sgp import SequentialGeometricProgram
 
 
@@ -86,7 +86,7 @@ class Model(CostedConstraintSet):
     ):  # pylint:disable=too-many-locals,too-many-branches,too-many-statements
         "Verifies docstring bounds are sufficient but not excessive."
         err = f"while verifying {self.__class__.__name__}:\n"
-        bounded, meq_bounded = self.bounded.copy(), self.meq_bounded.copy()
+        bounded, meq_bounded = set(self.bounded), self.meq_bounded
         doc = self.__class__.__doc__
         exp_unbounds = expected_unbounded(self, doc)
         unexp_bounds = bounded.intersection(exp_unbounds)
@@ -102,15 +102,10 @@ class Model(CostedConstraintSet):
                 err += f"expected {direction}-unbounded\n"
             raise ValueError(err)
         bounded.update(exp_unbounds)  # if not, treat expected as bounded
-        add_meq_bounds(bounded, meq_bounded)  # and add more meqs
+        propagate_bounds(bounded, meq_bounded)  # and add more meqs
         self.missingbounds = {}  # now let's figure out what's missing
-        for bound in meq_bounded:  # first add the un-dealt-with meq bounds
-            for condition in list(meq_bounded[bound]):
-                meq_bounded[bound].remove(condition)
-                newcond = condition - bounded
-                if newcond and not any(c.issubset(newcond) for c in meq_bounded[bound]):
-                    meq_bounded[bound].add(newcond)
-            bsets = " or ".join(str(list(c)) for c in meq_bounded[bound])
+        for bound, conditions in unmet_conditions(bounded, meq_bounded).items():
+            bsets = " or ".join(str(list(c)) for c in conditions)
             self.missingbounds[bound] = (
                 ", but would gain it from any of these sets of bounds: " + bsets
             )
@@ -172,15 +167,52 @@ class Model(CostedConstraintSet):
 
     # pylint: disable=import-outside-toplevel
     def debug(self, solver=None, verbosity=1, **solveargs):
-        "Attempts to diagnose infeasible models."
-        from .bounded import Bounded
-        from .relax import ConstantsRelaxed, ConstraintsRelaxed
+        """Attempts to diagnose infeasible models.
+
+        GPs are relaxed as compiled (see RelaxedGP); other models are wrapped
+        in relaxing ConstraintSets and solved locally.
+        """
+        from .relax import RelaxedGP
 
         sol = None
         solveargs["solver"] = solver
         solveargs["verbosity"] = verbosity - 1
-        solveargs["process_result"] = False
 
+        try:
+            try:
+                sol = RelaxedGP(self).solve(**solveargs)
+            except Infeasible:
+                if verbosity:
+                    print(
+                        "<DEBUG> Model is not feasible with relaxed constants"
+                        " and bounded variables."
+                    )
+                try:
+                    sol = RelaxedGP(self, "constraints").solve(**solveargs)
+                except Infeasible:
+                    print("<DEBUG> Model is not feasible with bounded constraints.")
+        except InvalidGPConstraint:
+            sol = self._debug_sp(verbosity, solveargs)
+        if sol and verbosity:
+            warnings = sol.table(tables=["warnings"]).split("\n")[3:-2]
+            if warnings:
+                print("<DEBUG> Model is feasible with these modifications:")
+                print("\n" + "\n".join(warnings) + "\n")
+            else:
+                print(
+                    "<DEBUG> Model seems feasible without modification,"
+                    " or only needs relaxations of less than 1%."
+                    " Check the returned solution for details."
+                )
+        return sol
+
+    def _debug_sp(self, verbosity, solveargs):
+        "Diagnoses infeasible SPs by solving them in relaxing ConstraintSets."
+        from .bounded import Bounded
+        from .relax import ConstantsRelaxed, ConstraintsRelaxed
+
+        sol = None
+        solveargs["process_result"] = False
         bounded = Bounded(self)
         tants = ConstantsRelaxed(bounded)
         if tants.relaxvars.size:
@@ -189,10 +221,7 @@ class Model(CostedConstraintSet):
             feas = Model(self.cost, bounded)
 
         try:
-            try:
-                sol = feas.solve(**solveargs)
-            except InvalidGPConstraint:
-                sol = feas.sp(use_pccp=False).localsolve(**solveargs)
+            sol = feas.sp(use_pccp=False).localsolve(**solveargs)
             # limited results processing
             bounded.check_boundaries(sol)
             tants.check_relaxed(sol)
@@ -205,23 +234,9 @@ class Model(CostedConstraintSet):
             traints = ConstraintsRelaxed(self)
             feas = Model(traints.relaxvars.prod() ** 30 * self.cost, traints)
             try:
-                try:
-                    sol = feas.solve(**solveargs)
-                except InvalidGPConstraint:
-                    sol = feas.sp(use_pccp=False).localsolve(**solveargs)
+                sol = feas.sp(use_pccp=False).localsolve(**solveargs)
                 # limited results processing
                 traints.check_relaxed(sol)
             except Infeasible:
                 print("<DEBUG> Model is not feasible with bounded constraints.")
-        if sol and verbosity:
-            warnings = sol.table(tables=["warnings"]).split("\n")[3:-2]
-            if warnings:
-                print("<DEBUG> Model is feasible with these modifications:")
-                print("\n" + "\n".join(warnings) + "\n")
-            else:
-                print(
-                    "<DEBUG> Model seems feasible without modification,"
-                    " or only needs relaxations of less than 1%."
-                    " Check the returned solution for details."
-                )
         return sol
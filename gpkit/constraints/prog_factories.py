@@ -13,6 +13,8 @@ from ..nomials import parse_subs
 from ..small_classes import FixedScalar
 from ..small_scripts import maybe_flatten
 from ..solution_array import SolutionArray
+from ..tools.sweeps import sweep_points
+from ..units import magnitude_in
 
 
 def evaluate_linked(constants, linked):
@@ -39,13 +41,9 @@ def evaluate_linked(constants, linked):
             if isinstance(out, FixedScalar):  # to allow use of gpkit.units
                 out = out.value
             if hasattr(out, "units"):
-                out = out.to(v.units or "dimensionless").magnitude
+                out = magnitude_in(out, v.units)
             elif out != 0 and v.units:
-                pywarnings.warn(
-                    f"Linked function for {v} did not return a united value."
-                    " Modifying it to do so (e.g. by using `()` instead of `[]`"
-                    " to access variables) will reduce errors."
-                )
+                _warn_ununited(v)
             out = maybe_flatten(out)
             if not hasattr(out, "x"):
                 constants[v] = out
@@ -80,6 +78,122 @@ def evaluate_linked(constants, linked):
                 )
 
 
+def _warn_ununited(v):
+    "Warns that the linked function for v did not return units"
+    pywarnings.warn(
+        f"Linked function for {v} did not return a united value."
+        " Modifying it to do so (e.g. by using `()` instead of `[]`"
+        " to access variables) will reduce errors."
+    )
+
+
+class _ReadRecorder(KeyDict):
+    "A KeyDict that records which keys are read from it, to find inputs"
+
+    def __init__(self, *args, **kwargs):
+        self.read = set()
+        super().__init__(*args, **kwargs)
+
+    def __getitem__(self, key):
+        self.read.add(self.parse_and_index(key)[0])
+        return super().__getitem__(key)
+
+
+def evaluate_linked_sweep(constants, linked, sweep_vects, stepsize=1e-20):
+    """Evaluates linked variables at every point of a sweep at once
+
+    Each linked function is called once with arrays of the swept values,
+    and its gradients are found by complex step, with one more call for
+    each constant it reads. Linked vector functions, and functions that
+    can't be called with arrays or whose complex-step results don't match
+    automatic differentiation's at the sweep's first point, are left for
+    evaluate_linked to evaluate pointwise.
+
+    Returns
+    -------
+    swept : dict
+        {linked varkey: (values, gradients)}, where values is an array over
+        the sweep's points and gradients is {input varkey: array} (or None
+        if the variable doesn't depend on any constants)
+    pointwise : dict
+        {linked varkey: function} of the linked variables left
+    """
+    swept, pointwise = {}, {}
+    if any(var.idx for var in sweep_vects):  # swept vector elements
+        return swept, dict(linked)
+    n_passes = len(next(iter(sweep_vects.values())))
+    values = KeyDict(constants)
+    values.update(sweep_vects)
+    for v, f in linked.items():
+        result = None
+        if not (v.veckey and v.veckey.vecfn):
+            try:
+                result = _evaluate_swept(v, f, values, n_passes, stepsize)
+            except Exception:  # pylint: disable=broad-except
+                pass  # e.g. the function only takes scalars
+        if result is None:
+            pointwise[v] = f
+        else:
+            swept[v] = result
+    return swept, pointwise
+
+
+def _evaluate_swept(v, f, values, n_passes, stepsize):
+    "Returns v's values and gradients at every point, or None if f can't."
+    united = []
+
+    def call(inputs):
+        with SignomialsEnabled():  # to allow use of gpkit.units
+            out = f(inputs)
+        if isinstance(out, FixedScalar):  # to allow use of gpkit.units
+            out = out.value
+        if hasattr(out, "units"):
+            united.append(True)
+            out = magnitude_in(out, v.units)
+        out = np.asarray(out)
+        if out.dtype == object or out.shape not in [(), (n_passes,)]:
+            raise ValueError(f"{v} was not evaluated at each point")
+        return np.broadcast_to(out, (n_passes,))
+
+    inputs = _ReadRecorder(values)
+    out = call(inputs)
+    if np.iscomplexobj(out):
+        return None
+    if not united and v.units and out.any():
+        _warn_ununited(v)
+    # check against automatic differentiation at the first point
+    first = KeyDict(
+        {c: adnumber(float(np.ravel(values[c])[0]), c) for c in inputs.read}
+    )
+    with SignomialsEnabled():  # to allow use of gpkit.units
+        ad_out = f(first)
+    if isinstance(ad_out, FixedScalar):
+        ad_out = ad_out.value
+    if hasattr(ad_out, "units"):
+        ad_out = magnitude_in(ad_out, v.units)
+    ad_out = maybe_flatten(ad_out)
+    if not np.isclose(getattr(ad_out, "x", ad_out), out[0], rtol=1e-8):
+        return None
+    if not hasattr(ad_out, "x"):
+        return out, None  # a new fixed variable, not a calculated one
+    ad_grads = {adn.tag: grad for adn, grad in ad_out.d().items() if adn.tag}
+    gradients = {}
+    for c in inputs.read:
+        x = values[c]
+        if np.shape(x) not in [(), (n_passes,)]:
+            return None
+        step = stepsize * np.maximum(np.abs(x), 1)
+        perturbed = KeyDict(values)
+        perturbed[c] = x + 1j * step
+        gradient = np.imag(call(perturbed)) / step
+        expected = ad_grads.get(c, 0)
+        if not np.isclose(gradient[0], expected, rtol=1e-6, atol=1e-12 * abs(out[0])):
+            return None
+        if c in ad_grads:
+            gradients[c] = np.broadcast_to(gradient, (n_passes,))
+    return np.real(out), gradients
+
+
 def progify(program, return_attr=None):
     """Generates function that returns a program() and optionally an attribute.
 
@@ -109,7 +223,15 @@ def progify(program, return_attr=None):
 def solvify(genfunction):
     "Returns function for making/solving/sweeping a program."
 
-    def solvefn(self, solver=None, *, verbosity=1, skipsweepfailures=False, **kwargs):
+    def solvefn(
+        self,
+        solver=None,
+        *,
+        verbosity=1,
+        skipsweepfailures=False,
+        sweepdesign=None,
+        **kwargs,
+    ):
         """Forms a mathematical program and attempts to solve it.
 
         Arguments
@@ -121,6 +243,9 @@ def solvify(genfunction):
             Is decremented by one and then passed to programs.
         skipsweepfailures : bool (default False)
             If True, when a solve errors during a sweep, skip it.
+        sweepdesign : SweepDesign, "grid", or "zip" (default None, a grid)
+            Which points of a sweep to solve (see gpkit.tools.sweeps);
+            for a PointTable, the model need not have sweep substitutions.
         **kwargs : Passed to solve and program init calls
 
         Returns
@@ -135,7 +260,10 @@ def solvify(genfunction):
         """
         constants, sweep, linked = parse_subs(self.varkeys, self.substitutions)
         solution = SolutionArray()
-        solution.modelstr = str(self)
+        solution.modelstrings = self.share_strings()
+
+        if sweep or sweepdesign is not None:
+            sweep = sweep_points(sweep, self.varkeys, sweepdesign)
 
         # NOTE SIDE EFFECTS: self.program and self.solution set below
         if sweep:
@@ -157,7 +285,9 @@ def solvify(genfunction):
             if kwargs.get("process_result", True):
                 self.process_result(result)
             solution.append(result)
+            solution.kkt = getattr(result, "kkt", None)
         solution.to_arrays()
+        solution["variables"].share_nameindex(self.nameindex)
         self.solution = solution
         return solution
 
@@ -172,38 +302,36 @@ def run_sweep(
     solution,
     skipsweepfailures,
     constants,
-    sweep,
+    sweep_vects,
     linked,
     solver,
     verbosity,
     **kwargs,
 ):
-    "Runs through a sweep."
-    # sort sweeps by the eqstr of their varkey
-    sweepvars, sweepvals = zip(
-        *sorted(list(sweep.items()), key=lambda vkval: vkval[0].eqstr)
-    )
-    if len(sweep) == 1:
-        sweep_grids = np.array(list(sweepvals))
-    else:
-        sweep_grids = np.meshgrid(*list(sweepvals))
-
-    n_passes = sweep_grids[0].size
-    sweep_vects = {
-        var: grid.reshape(n_passes) for (var, grid) in zip(sweepvars, sweep_grids)
-    }
+    "Runs through a sweep's points, given as {var: value at each point}."
+    n_passes = len(next(iter(sweep_vects.values())))
 
     if verbosity > 0:
         tic = time()
 
     self.program = []
     last_error = None
+    swept, pointwise = {}, {}
+    if linked:
+        swept, pointwise = evaluate_linked_sweep(constants, linked, sweep_vects)
     for i in range(n_passes):
         constants.update(
             {var: sweep_vect[i] for (var, sweep_vect) in sweep_vects.items()}
         )
-        if linked:
-            evaluate_linked(constants, linked)
+        for v, (values, _) in swept.items():
+            constants[v] = values[i]
+        if pointwise:
+            evaluate_linked(constants, pointwise)
+        for v, (_, gradients) in swept.items():
+            if gradients is None:
+                v.descr.pop("gradients", None)
+            else:
+                v.descr["gradients"] = {c: g[i] for c, g in gradients.items()}
         program, solvefn = genfunction(self, constants, **kwargs)
         program.model = None  # so it doesn't try to debug
         self.program.append(program)  # NOTE: SIDE EFFECTS
@@ -213,7 +341,7 @@ def run_sweep(
             sweepvarsstr = ", ".join(
                 [
                     str(var)
-                    for var, val in zip(sweepvars, sweepvals)
+                    for var, val in sweep_vects.items()
                     if not np.isnan(val).all()
                 ]
             )
@@ -245,7 +373,7 @@ def run_sweep(
         print()
 
     solution["sweepvariables"] = KeyDict()
-    ksweep = KeyDict(sweep)
+    ksweep = KeyDict(sweep_vects)
     for var, val in list(solution["constants"].items()):
         if var in ksweep:
             solution["sweepvariables"][var] = val
@@ -1,10 +1,22 @@
 # pylint: disable=consider-using-f-string
 """Models for assessing primal feasibility"""
 
+import numpy as np
+
 from .. import NamedVariables, SignomialsEnabled
 from ..keydict import KeyDict
 from ..nomials import NomialArray, Variable, VectorVariable, parse_subs
+from ..small_classes import CootMatrix, HashVector
 from ..small_scripts import appendsolwarning, initsolwarning, mag
+from ..varkey import VarKey
+from .bounded import check_boundaries
+from .gp import (
+    GeometricProgram,
+    MonoEqualityIndexes,
+    clean_substitutions,
+    source_constraint,
+)
+from .prog_factories import evaluate_linked
 from .set import ConstraintSet
 
 
@@ -125,32 +137,16 @@ class ConstraintsRelaxed(ConstraintSet):
         )
         initsolwarning(result, "Relaxed Constraints")
         for relaxval, i in relaxed:
-            relax_percent = "%i%%" % (0.5 + (relaxval - 1) * 100)
             oldconstraint = self.original_constraints[i]
             newconstraint = self["relaxed constraints"][i][0]
             subs = {self.relaxvars[i]: relaxval}
-            relaxdleft = newconstraint.left.sub(subs)
-            relaxdright = newconstraint.right.sub(subs)
-            oldleftstr = str(oldconstraint.left)
-            relaxedleftstr = str(relaxdleft)
-            padding = len(relaxedleftstr) - len(oldleftstr)
-            if padding > 0:
-                oldleftstr = " " * padding + oldleftstr
-            elif padding < 0:
-                relaxedleftstr = " " * padding + relaxedleftstr
-            msg = (
-                " %3i: %5s relaxed, from %s %s %s\n"
-                "                       to %s %s %s"
-                % (
-                    i,
-                    relax_percent,
-                    oldleftstr,
-                    oldconstraint.oper,
-                    oldconstraint.right,
-                    relaxedleftstr,
-                    newconstraint.oper,
-                    relaxdright,
-                )
+            msg = relaxation_msg(
+                i,
+                relaxval,
+                oldconstraint,
+                newconstraint.left.sub(subs),
+                newconstraint.oper,
+                newconstraint.right.sub(subs),
             )
             appendsolwarning(msg, oldconstraint, result, "Relaxed Constraints")
 
@@ -263,14 +259,193 @@ class ConstantsRelaxed(ConstraintSet):
         )
         initsolwarning(result, "Relaxed Constants")
         for _, freed in relaxed:
-            msg = "  %s: relaxed from %-.4g to %-.4g" % (
-                freed,
-                mag(self.constants[freed.key]),
-                mag(result["freevariables"][freed]),
+            msg = relaxed_constant_msg(
+                freed, self.constants[freed.key], result["freevariables"][freed]
             )
             appendsolwarning(msg, freed, result, "Relaxed Constants")
 
 
+class RelaxedGP(GeometricProgram):
+    # pylint: disable=too-many-instance-attributes
+    """A model's GP, relaxed as compiled to find what would make it feasible
+
+    Rather than wrapping the model in relaxing ConstraintSets (as
+    ConstantsRelaxed and ConstraintsRelaxed do) and compiling those, this
+    compiles the model itself and then adds a slack column to A for each
+    relaxation, along with the rows bounding it and its penalty in the
+    cost, remembering what each slack relaxes so as to report it.
+
+    Arguments
+    ---------
+    model : Model
+        The model to relax, which must be a GP.
+
+    relax : str (default "constants")
+        If "constants", every positive constant can move from its value by
+        a factor of its slack, as in ConstantsRelaxed, and free variables
+        are bounded, as in Bounded. If "constraints", every constraint is
+        made easier by a factor of its slack, as in ConstraintsRelaxed.
+
+    eps : float (default 1e-30)
+        Free variables are bounded to lie between eps and 1/eps.
+
+    Attributes
+    ----------
+    slacks : dict
+        {slack's VarKey: the constant's VarKey or the constraint it relaxes}
+    """
+
+    penalty = 30  # the cost is multiplied by each slack to this power
+
+    def __init__(self, model, relax="constants", *, eps=1e-30):
+        if relax not in ("constants", "constraints"):
+            raise ValueError(f"cannot relax '{relax}'.")
+        self.relax, self.eps = relax, eps
+        self.slacks = {}
+        self.bound_idxs = {}  # {varkey: p_idxs of its (lower, upper) bounds}
+        self.constants, _, linked = parse_subs(model.varkeys, model.substitutions)
+        if linked:
+            evaluate_linked(self.constants, linked)
+        clean_substitutions(self.constants)
+        if relax == "constraints":
+            super().__init__(model.cost, model, self.constants, checkbounds=False)
+            self._relax_constraints(model)
+        else:
+            fixed = {k: v for k, v in self.constants.items() if np.shape(v) or v <= 0}
+            super().__init__(model.cost, model, fixed, checkbounds=False)
+            self._relax_constants()
+        self.p_idxs = np.repeat(np.arange(len(self.k), dtype="int32"), self.k)
+        self.A = CootMatrix(self.A.row, self.A.col, self.A.data)  # new shape
+
+    def _relax_constants(self):
+        "Frees the constants left out of substitutions, and bounds variables"
+        freed = [vk for vk in self.varlocs if vk in self.constants]
+        bounded = [vk for vk in self.varlocs if vk not in self.constants]
+        for vk, slack in zip(freed, self._add_slacks(freed)):
+            vk.descr.pop("gradients", None)  # it's no longer calculated
+            value = self.constants[vk]
+            self._add_row(value, {slack: -1, vk: -1})  # value/slack <= vk
+            self._add_row(1 / value, {slack: -1, vk: 1})  # vk <= value*slack
+        for vk in bounded:
+            self.bound_idxs[vk] = (
+                self._add_row(self.eps, {vk: -1}),
+                self._add_row(self.eps, {vk: 1}),
+            )
+
+    def _relax_constraints(self, model):
+        "Divides each constraint's posynomial(s) by its slack"
+        constraints, p_idxs = {}, {}  # {id: constraint}, {id: [p_idx]}
+        for p_idx, hmap in enumerate(self.hmaps[1:], 1):
+            constraint = source_constraint(hmap)
+            constraints[id(constraint)] = constraint
+            p_idxs.setdefault(id(constraint), []).append(p_idx)
+        slacks = self._add_slacks(list(constraints.values()))
+        for slack, idxs in zip(slacks, p_idxs.values()):
+            for p_idx in idxs:
+                m_idxs = self.m_idxs[p_idx]
+                for m_idx in range(m_idxs.start, m_idxs.stop):
+                    self._add_entry(m_idx, slack, -1)
+        self.meq_idxs = MonoEqualityIndexes()  # they're now inequalities
+        self.flatidxs = {id(c): i for i, c in enumerate(model.flat())}
+
+    def _add_slacks(self, relaxed):
+        "Adds a slack column for each relaxed item, returning their VarKeys"
+        with NamedVariables("Relax") as (lineage, _):
+            pass  # gives the slacks the correct lineage
+        veckey = VarKey("C", shape=(len(relaxed),), lineage=lineage)
+        slacks = []
+        for i, item in enumerate(relaxed):
+            slack = VarKey.element({**veckey.descr, "idx": (i,), "veckey": veckey})
+            self.varidxs[slack] = len(self.varlocs)
+            self.varlocs[slack] = []
+            self.slacks[slack] = item
+            self._add_row(1, {slack: -1})  # slack >= 1
+            for m_idx in range(self.k[0]):
+                self._add_entry(m_idx, slack, self.penalty)
+            slacks.append(slack)
+        return slacks
+
+    def _add_entry(self, m_idx, vk, x, *, newrow=False):
+        "Adds x to the exponent of vk in the m_idx-th monomial"
+        self.A.row.append(m_idx)
+        self.A.col.append(self.varidxs[vk])
+        self.A.data.append(x)
+        if not newrow:
+            self.exps[m_idx] = self.exps[m_idx] + HashVector({vk: x})
+        self.varlocs[vk].append(m_idx)
+
+    def _add_row(self, c, exp):
+        "Adds the constraint c*exp <= 1, returning its p_idx"
+        m_idx = len(self.cs)
+        self.cs.append(c)
+        self.exps.append(HashVector(exp))
+        self.m_idxs.append(slice(m_idx, m_idx + 1))
+        self.k.append(1)
+        for vk, x in exp.items():
+            self._add_entry(m_idx, vk, x, newrow=True)
+        return len(self.k) - 1
+
+    def _compile_result(self, solver_out):
+        "Adds warnings of what was relaxed or bounded to the result"
+        result = super()._compile_result(solver_out)
+        if self.relax == "constants":
+            la = solver_out["la"]
+            bound_senss = {
+                vk: (la[lower], la[upper])
+                for vk, (lower, upper) in self.bound_idxs.items()
+            }
+            check_boundaries(result, bound_senss, self.eps, 1 / self.eps)
+            initsolwarning(result, "Relaxed Constants")
+        else:
+            initsolwarning(result, "Relaxed Constraints")
+        if not self.slacks:
+            return result
+        relaxvals = [result["freevariables"][slack] for slack in self.slacks]
+        for relaxval, item in get_relaxed(relaxvals, list(self.slacks.values())):
+            if self.relax == "constants":
+                freed = Variable(**item.descr)
+                msg = relaxed_constant_msg(
+                    freed, self.constants[item], result["freevariables"][item]
+                )
+                appendsolwarning(msg, freed, result, "Relaxed Constants")
+            else:
+                relaxed = item.relaxed(relaxval)[0]
+                i = self.flatidxs.get(id(item), -1)
+                msg = relaxation_msg(
+                    i, relaxval, item, relaxed.left, relaxed.oper, relaxed.right
+                )
+                appendsolwarning(msg, item, result, "Relaxed Constraints")
+        return result
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def relaxation_msg(i, relaxval, oldconstraint, relaxedleft, oper, relaxedright):
+    "Describes the relaxation of the i-th constraint by relaxval"
+    relax_percent = "%i%%" % (0.5 + (relaxval - 1) * 100)
+    oldleftstr = str(oldconstraint.left)
+    relaxedleftstr = str(relaxedleft)
+    padding = len(relaxedleftstr) - len(oldleftstr)
+    if padding > 0:
+        oldleftstr = " " * padding + oldleftstr
+    elif padding < 0:
+        relaxedleftstr = " " * padding + relaxedleftstr
+    return " %3i: %5s relaxed, from %s %s %s\n" "                       to %s %s %s" % (
+        i,
+        relax_percent,
+        oldleftstr,
+        oldconstraint.oper,
+        oldconstraint.right,
+        relaxedleftstr,
+        oper,
+        relaxedright,
+    )
+
+
+def relaxed_constant_msg(freed, value, relaxedvalue):
+    "Describes the relaxation of the constant freed from value to relaxedvalue"
+    return "  %s: relaxed from %-.4g to %-.4g" % (freed, mag(value), mag(relaxedvalue))
+
+
 def get_relaxed(relaxvals, mapped_list):
     "Returns 'relaxed' vals (those above an arbitrary threshold of 1.01)."
     sortrelaxed = sorted(zip(relaxvals, mapped_list), key=lambda x: -x[0])
@@ -1,38 +1,67 @@
 "Implements ConstraintSet"
 
+import hashlib
 import sys
 from collections import OrderedDict, defaultdict
 from itertools import chain
 
 import numpy as np
 
-from ..keydict import KeyDict, KeySet
-from ..repr_conventions import ReprMixin
+from ..keydict import KeyDict, NameIndex
+from ..repr_conventions import ReprMixin, lineagestr
 from ..small_scripts import try_str_without
 from .single_equation import SingleEquationConstraint
 
 
-# pylint: disable=fixme
-def add_meq_bounds(bounded, meq_bounded):  # TODO: collapse with GP version?
-    "Iterates through meq_bounds until convergence"
-    still_alive = True
-    while still_alive:
-        still_alive = False  # if no changes are made, the loop exits
-        for bound in list(meq_bounded):
-            if bound in bounded:  # bound already exists
-                del meq_bounded[bound]
-                continue
-            for condition in meq_bounded[bound]:
-                if condition.issubset(bounded):  # bound's condition is met
-                    del meq_bounded[bound]
-                    bounded.add(bound)
-                    still_alive = True
-                    break
-
-
-def _sort_by_name_and_idx(var):
-    "return tuple for Variable sorting"
-    return (var.key.str_without(["units", "idx"]), var.key.idx or ())
+def propagate_bounds(bounded, conditions):
+    """Adds every bound implied by `conditions` to `bounded`, in place
+
+    `conditions` maps each (varkey, direction) bound to sets of other bounds,
+    any one of which implies it. A condition is only revisited when one of
+    the bounds it waits on is found, so this takes time linear in the total
+    size of the conditions.
+    """
+    waiting, found = defaultdict(list), []
+    for bound, conds in conditions.items():
+        if bound in bounded:
+            continue
+        for condition in conds:
+            unmet = [b for b in condition if b not in bounded]
+            if not unmet:
+                found.append(bound)
+                break
+            counter = [len(unmet)]
+            for b in unmet:
+                waiting[b].append((bound, counter))
+    while found:
+        bound = found.pop()
+        if bound in bounded:
+            continue
+        bounded.add(bound)
+        for dependent, counter in waiting.pop(bound, ()):
+            counter[0] -= 1
+            if not counter[0] and dependent not in bounded:
+                found.append(dependent)
+
+
+def unmet_conditions(bounded, conditions):
+    "Returns {bound: minimal sets of missing bounds which would imply it}"
+    unmet = {}
+    for bound, conds in conditions.items():
+        if bound in bounded:
+            continue
+        unmet[bound] = minimal = []
+        for condition in sorted({c.difference(bounded) for c in conds}, key=len):
+            if not any(c.issubset(condition) for c in minimal):
+                minimal.append(condition)
+    return unmet
+
+
+def add_meq_bounds(bounded, meq_bounded):
+    "Adds the bounds meq_bounded implies to bounded, removing them from it"
+    propagate_bounds(bounded, meq_bounded)
+    for bound in [b for b in meq_bounded if b in bounded]:
+        del meq_bounded[bound]
 
 
 def _sort_constraints(item):
@@ -53,13 +82,18 @@ def sort_constraints_dict(iterable):
     return (item[0] for item in items), (item[1] for item in items)
 
 
+def _hasattr(obj, name):
+    "hasattr which doesn't evaluate (possibly expensive) class properties"
+    return hasattr(type(obj), name) or hasattr(obj, name)
+
+
 def flatiter(iterable, yield_if_hasattr=None):
     "Yields contained constraints, optionally including constraintsets."
     if isinstance(iterable, dict):
         _, iterable = sort_constraints_dict(iterable)
     for constraint in iterable:
         if not hasattr(constraint, "__iter__") or (
-            yield_if_hasattr and hasattr(constraint, yield_if_hasattr)
+            yield_if_hasattr and _hasattr(constraint, yield_if_hasattr)
         ):
             yield constraint
         else:
@@ -76,26 +110,35 @@ class ConstraintSet(list, ReprMixin):  # pylint: disable=too-many-instance-attri
 
     unique_varkeys, idxlookup = frozenset(), {}
     _name_collision_varkeys = None
-    _varkeys = None
+    _varkeys = _nameindex = None
+    _parts = _vks = _substitutions = _bounded = _meq_bounded = None
+    _bonusvks = frozenset()
+    _sharedstrings = None  # LazyStrings last given to a solution
+    _watchers = ()  # LazyStrings of this set or sets it's in, to render first
+    _fingerprintparts = _costdigest = None  # kept until the set changes
     _lineageset = False
 
     def __init__(
         self, constraints, substitutions=None, *, bonusvks=None
-    ):  # pylint: disable=too-many-branches,too-many-statements
+    ):  # pylint: disable=too-many-branches
         if isinstance(constraints, dict):
             keys, constraints = sort_constraints_dict(constraints)
             self.idxlookup = {k: i for i, k in enumerate(keys)}
         elif isinstance(constraints, ConstraintSet):
             constraints = [constraints]  # put it one level down
         list.__init__(self, constraints)
-        self.vks = set(self.unique_varkeys)
-        self.substitutions = KeyDict(
-            {k: k.value for k in self.unique_varkeys if "value" in k.descr}
-        )
-        self.substitutions.vks = self.vks
-        self.bounded, self.meq_bounded = set(), defaultdict(set)
+        # vks, substitutions and bounds are gathered from these parts, in
+        # this order, only when first accessed (see `_aggregate`); they hold
+        # copies of substitutions, so edits made after this don't change them
+        self._parts = [{k: k.value for k in self.unique_varkeys if "value" in k.descr}]
         for i, constraint in enumerate(self):
-            if hasattr(constraint, "vks"):
+            if isinstance(constraint, ConstraintSet):
+                if constraint._parts is None:
+                    raise badelement(
+                        self, i, constraint, " It had not yet been initialized!"
+                    )
+                self._update(constraint)
+            elif hasattr(constraint, "vks"):
                 self._update(constraint)
             elif not (
                 hasattr(constraint, "as_hmapslt1") or hasattr(constraint, "as_gpconstr")
@@ -105,40 +148,141 @@ class ConstraintSet(list, ReprMixin):  # pylint: disable=too-many-instance-attri
                         self._update(subconstraint)
                 except Exception as e:
                     raise badelement(self, i, constraint) from e
-            elif isinstance(constraint, ConstraintSet):
-                raise badelement(
-                    self, i, constraint, " It had not yet been initialized!"
-                )
-        if bonusvks:
-            self.vks.update(bonusvks)
+        self._bonusvks = frozenset(bonusvks) if bonusvks else frozenset()
+        valued = [k for part in self._parts if isinstance(part, dict) for k in part]
         if substitutions:
-            self.substitutions.update(substitutions)
-        for key in self.vks:
-            if key not in self.substitutions:
-                if key.veckey is None or key.veckey not in self.substitutions:
-                    continue
-                if np.isnan(self.substitutions[key.veckey][key.idx]):
-                    continue
-            self.bounded.add((key, "upper"))
-            self.bounded.add((key, "lower"))
+            self._parts.append(dict(substitutions))
+            valued.extend(
+                k for k in self._bonusvks if "value" in k.descr and k in substitutions
+            )
+        for key in valued:  # substituted values shouldn't be re-substituted above
             if key.value is not None and not key.constant:
                 del key.descr["value"]
                 if key.veckey and key.veckey.value is not None:
                     del key.veckey.descr["value"]
-        add_meq_bounds(self.bounded, self.meq_bounded)
 
     def _update(self, constraint):
-        "Update parameters with a given constraint"
-        self.vks.update(constraint.vks)
+        "Adds a constraint (and its current substitutions) to the aggregated parts"
+        if isinstance(constraint, ConstraintSet):
+            if constraint._parts is None:
+                raise ValueError(f"{type(constraint).__name__} was not initialized.")
+            if constraint._islazy():  # to be walked through as it is now
+                self._parts.append((constraint, list(constraint._parts)))
+                return
+        self._parts.append(constraint)
         if hasattr(constraint, "substitutions"):
-            self.substitutions.update(constraint.substitutions)
+            self._parts.append(dict(constraint.substitutions))
         else:
-            self.substitutions.update(
+            self._parts.append(
                 {k: k.value for k in constraint.vks if "value" in k.descr}
             )
-        self.bounded.update(constraint.bounded)
-        for bound, solutionset in constraint.meq_bounded.items():
-            self.meq_bounded[bound].update(solutionset)
+
+    def _islazy(self):
+        "Whether none of this set's aggregated attributes have been created"
+        return (
+            self._vks is None
+            and self._substitutions is None
+            and self._bounded is None
+            and self._meq_bounded is None
+            and self._parts is not None
+        )
+
+    def _aggregate(self):
+        """Creates whichever of vks, substitutions and bounds are still missing
+
+        Nested sets which hadn't aggregated themselves when this set was
+        created are walked through rather than asked for their attributes,
+        so that creating a model doesn't redo this work at every level of
+        its hierarchy.
+        """
+        if self._parts is None:
+            raise AttributeError(f"{type(self).__name__} was not initialized.")
+        vks, subsparts = set(self._bonusvks), []
+        bounded, meq_bounded = set(), defaultdict(set)
+        stack = [iter(self._parts)]
+        while stack:
+            for part in stack[-1]:
+                if isinstance(part, dict):
+                    subsparts.append(part)
+                elif isinstance(part, tuple):  # (nested set, its parts)
+                    cset, parts = part
+                    vks.update(cset.unique_varkeys)
+                    vks.update(cset._bonusvks)
+                    stack.append(iter(parts))
+                    break
+                else:
+                    vks.update(part.vks)
+                    bounded.update(part.bounded)
+                    for bound, solutionset in part.meq_bounded.items():
+                        meq_bounded[bound].update(solutionset)
+            else:
+                stack.pop()
+        vks.update(self.unique_varkeys)
+        if self._vks is None:
+            self._vks = vks
+        if self._substitutions is None:
+            substitutions = KeyDict()
+            substitutions.vks = self._vks
+            for part in subsparts:
+                substitutions.update(part)
+            self._substitutions = substitutions
+        if self._bounded is None or self._meq_bounded is None:
+            substitutions = self._substitutions
+            for key in self._vks:
+                if key not in substitutions:
+                    if key.veckey is None or key.veckey not in substitutions:
+                        continue
+                    if np.isnan(substitutions[key.veckey][key.idx]):
+                        continue
+                bounded.add((key, "upper"))
+                bounded.add((key, "lower"))
+            add_meq_bounds(bounded, meq_bounded)
+            self._bounded, self._meq_bounded = bounded, meq_bounded
+
+    @property
+    def vks(self):
+        "The varkeys of this set and everything in it, gathered when first needed"
+        if self._vks is None:
+            self._aggregate()
+        return self._vks
+
+    @vks.setter
+    def vks(self, vks):
+        self._vks = vks
+
+    @property
+    def substitutions(self):
+        "This set's substitutions, merged from its contents when first needed"
+        if self._substitutions is None:
+            self._aggregate()
+        return self._substitutions
+
+    @substitutions.setter
+    def substitutions(self, substitutions):
+        self._substitutions = substitutions
+        self._bounded = self._meq_bounded = None  # recalculated from these
+
+    @property
+    def bounded(self):
+        "Set of (varkey, direction) bounds, found when first needed"
+        if self._bounded is None:
+            self._aggregate()
+        return self._bounded
+
+    @bounded.setter
+    def bounded(self, bounded):
+        self._bounded = bounded
+
+    @property
+    def meq_bounded(self):
+        "Bounds conditional on other bounds, found when first needed"
+        if self._meq_bounded is None:
+            self._aggregate()
+        return self._meq_bounded
+
+    @meq_bounded.setter
+    def meq_bounded(self, meq_bounded):
+        self._meq_bounded = meq_bounded
 
     def __getitem__(self, key):
         if key in self.idxlookup:
@@ -172,15 +316,20 @@ class ConstraintSet(list, ReprMixin):  # pylint: disable=too-many-instance-attri
         "Get all variables with a given name"
         from ..nomials import Variable  # pylint: disable=import-outside-toplevel
 
-        return sorted(
-            [Variable(k) for k in self.varkeys[key]], key=_sort_by_name_and_idx
-        )
+        return [Variable(k) for k in self.nameindex.sortedkeys(key)]
+
+    @property
+    def nameindex(self):
+        "A NameIndex of this set's varkeys, created when first necessary."
+        if self._nameindex is None:
+            self._nameindex = NameIndex(self.vks)
+        return self._nameindex
 
     @property
     def varkeys(self):
         "The NomialData's varkeys, created when necessary for a substitution."
         if self._varkeys is None:
-            self._varkeys = KeySet(self.vks)
+            self._varkeys = self.nameindex.keyset()
         return self._varkeys
 
     def constrained_varkeys(self):
@@ -316,11 +465,292 @@ class ConstraintSet(list, ReprMixin):  # pylint: disable=too-many-instance-attri
             lines.append("\\end{array}")
         return "\n".join(lines)
 
+    @property
+    def modelstr(self):
+        "This set's string"
+        return str(self)
+
+    @property
+    def fingerprint(self):
+        """Digest of the structure of this set's constraints (but not its cost)
+
+        Sets with equal fingerprints have the same constraints, in the same
+        nesting, on the same variables. Like `modelstr`, it ignores model
+        numbers; unlike it, it renders no strings besides varkeys' names.
+        Each set's digests are kept until it is next changed.
+        """
+        if self._fingerprintparts is None:
+            self._fingerprintparts = _fingerprint_parts(self)
+        return _combine_parts(self._fingerprintparts)
+
+    def share_strings(self):
+        """Returns LazyStrings of this set as it is now, e.g. for a solution
+
+        Its fingerprint is taken now, and its string is rendered when first
+        needed, or, failing that, just before this set or any set in it is
+        next changed.
+        """
+        if self._costdigest is None:
+            self._costdigest = _cost_digest(self)
+        state = self.fingerprint, self._costdigest
+        strings = self._sharedstrings
+        if strings is not None and strings.state == state:
+            return strings  # nothing has changed since
+        self._sharedstrings = strings = LazyStrings(self, state)
+        for cset in _nested_sets(self):
+            # pylint: disable=protected-access
+            cset._watchers = [w for w in cset._watchers if w.constraintset is not None]
+            cset._watchers.append(strings)
+        return strings
+
+    def _changed(self):
+        "Renders the strings shared of this set before it changes"
+        for strings in self._watchers:
+            strings.freeze()
+        self._watchers = ()
+        self._sharedstrings = self._fingerprintparts = self._costdigest = None
+
+    def __setitem__(self, key, value):
+        self._changed()
+        list.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._changed()
+        list.__delitem__(self, key)
+
+    def __iadd__(self, other):
+        self._changed()
+        return list.__iadd__(self, other)
+
+    def __imul__(self, other):
+        self._changed()
+        return list.__imul__(self, other)
+
+    def append(self, constraint):
+        "Appends a constraint, after rendering any shared strings"
+        self._changed()
+        list.append(self, constraint)
+
+    def extend(self, constraints):
+        "Extends with constraints, after rendering any shared strings"
+        self._changed()
+        list.extend(self, constraints)
+
+    def insert(self, index, constraint):
+        "Inserts a constraint, after rendering any shared strings"
+        self._changed()
+        list.insert(self, index, constraint)
+
+    def pop(self, index=-1):
+        "Pops a constraint, after rendering any shared strings"
+        self._changed()
+        return list.pop(self, index)
+
+    def remove(self, constraint):
+        "Removes a constraint, after rendering any shared strings"
+        self._changed()
+        list.remove(self, constraint)
+
+    def clear(self):
+        "Removes every constraint, after rendering any shared strings"
+        self._changed()
+        list.clear(self)
+
+    def reverse(self):
+        "Reverses the constraints, after rendering any shared strings"
+        self._changed()
+        list.reverse(self)
+
+    def sort(self, *, key=None, reverse=False):
+        "Sorts the constraints, after rendering any shared strings"
+        self._changed()
+        list.sort(self, key=key, reverse=reverse)
+
+    def __getstate__(self):
+        "Leaves out shared strings, which belong to this set's solutions"
+        return {
+            **self.__dict__,
+            "_sharedstrings": None,
+            "_watchers": (),
+            "_fingerprintparts": None,
+        }
+
     def as_view(self):
         "Return a ConstraintSetView of this ConstraintSet."
         return ConstraintSetView(self)
 
 
+class LazyStrings:
+    """A ConstraintSet's fingerprint, taken when created, and its string,
+    rendered when first needed
+
+    Every set in the ConstraintSet renders the string before it next
+    changes. Changes no set can see (e.g. to a list of constraints in one)
+    are caught by comparing the set's state to that taken at creation: if
+    they differ, the string is unknown, and reading it raises a ValueError.
+    """
+
+    def __init__(self, constraintset, state):
+        self.constraintset = constraintset
+        self.fingerprint = state[0]
+        self.state = state  # (fingerprint, digest of the cost)
+        self._modelstr = None
+
+    @property
+    def modelstr(self):
+        "The set's string, as it was when these strings were created"
+        self.freeze()
+        if self._modelstr is None:
+            raise ValueError(
+                "the solved model was changed in place (e.g. by editing a list"
+                " of constraints in it) before its string was rendered, so"
+                " that string is unknown."
+            )
+        return self._modelstr
+
+    def freeze(self):
+        "Renders the string, unless the set changed unseen, and forgets the set"
+        cset, self.constraintset = self.constraintset, None
+        if cset is not None:
+            state = _combine_parts(_fingerprint_parts(cset), fresh=True)
+            if (state, _cost_digest(cset)) == self.state:
+                self._modelstr = str(cset)
+
+    def __getstate__(self):
+        self.freeze()
+        return self.__dict__
+
+
+class _FingerprintParts:
+    """Stands in for a hashlib digest while finding a set's fingerprint
+
+    Keeps nested sets apart from digests of what is between them, so that a
+    set's fingerprint can be found again from its nested sets' alone.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self._digest = None
+
+    def update(self, data):
+        "Adds bytes to the current run"
+        if self._digest is None:
+            self._digest = hashlib.blake2b(digest_size=16)
+        self._digest.update(data)
+
+    def add_set(self, constraintset):
+        "Ends the current run with a nested set"
+        self._end_run()
+        self.parts.append(constraintset)
+
+    def _end_run(self):
+        if self._digest is not None:
+            self.parts.append(self._digest.digest())
+            self._digest = None
+
+    def finish(self):
+        "Returns the list of digests and nested sets"
+        self._end_run()
+        return self.parts
+
+
+def _fingerprint_parts(constraintset):
+    "A set's fingerprint, as digests of its constraints and its nested sets"
+    parts = _FingerprintParts()
+    parts.update(type(constraintset).__name__.encode())
+    parts.update(lineagestr(constraintset, modelnums=False).encode())
+    parts.update(repr(list(constraintset.idxlookup)).encode())
+    for constraint in constraintset:
+        _digest_constraint(parts, constraint)
+    return parts.finish()
+
+
+def _combine_parts(parts, fresh=False):
+    "Hexdigest of fingerprint parts (recomputing nested sets' if `fresh`)"
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, bytes):
+            if fresh:
+                part = _combine_parts(_fingerprint_parts(part), fresh=True)
+            else:
+                part = part.fingerprint
+            part = part.encode()
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _nested_sets(constraintset):
+    "Yields a set and every set in it, as found by their fingerprints"
+    yield constraintset
+    for part in constraintset._fingerprintparts:  # pylint: disable=protected-access
+        if not isinstance(part, bytes):
+            yield from _nested_sets(part)
+
+
+def _cost_digest(constraintset):
+    "Digest of a set's cost, if it has one"
+    digest = hashlib.blake2b(digest_size=16)
+    _digest_nomial(digest, getattr(constraintset, "cost", None))
+    return digest.hexdigest()
+
+
+def constraint_fingerprint(constraint):
+    "Digest of a constraint's structure, as in `ConstraintSet.fingerprint`"
+    if isinstance(constraint, ConstraintSet):
+        return constraint.fingerprint
+    parts = _FingerprintParts()
+    _digest_constraint(parts, constraint)
+    return _combine_parts(parts.finish())
+
+
+def _digest_constraint(parts, constraint):
+    "Updates _FingerprintParts with a constraint's structure"
+    if isinstance(constraint, ConstraintSet):
+        parts.add_set(constraint)
+    elif hasattr(constraint, "oper") and hasattr(constraint, "left"):
+        parts.update(f"<{type(constraint).__name__} {constraint.oper}".encode())
+        _digest_nomial(parts, constraint.left)
+        _digest_nomial(parts, constraint.right)
+        parts.update(b">")
+    elif isinstance(constraint, dict):
+        keys, values = sort_constraints_dict(constraint)
+        parts.update(repr(list(keys)).encode())
+        _digest_constraint(parts, list(values))
+    elif hasattr(constraint, "__iter__") and not isinstance(constraint, str):
+        parts.update(b"[")
+        for subconstraint in getattr(constraint, "flat", constraint):
+            if subconstraint is not constraint:
+                _digest_constraint(parts, subconstraint)
+        parts.update(b"]")
+    else:
+        parts.update(str(constraint).encode())
+
+
+def _keystr(key):
+    "String identifying a varkey independent of how many models preceded it"
+    return f"{key.fullstr} [{key.unitrepr}]"
+
+
+def _digest_nomial(digest, nomial):
+    "Updates a hashlib digest with a nomial's terms, in a canonical order"
+    hmap = getattr(nomial, "hmap", None)
+    if hmap is None:
+        if isinstance(nomial, np.ndarray):
+            digest.update(repr(nomial.shape).encode())
+            for element in nomial.flat:
+                _digest_nomial(digest, element)
+        else:
+            digest.update(repr(nomial).encode())
+        return
+    terms = sorted(
+        float.hex(float(c))
+        + "".join(sorted(_keystr(vk) + float.hex(float(x)) for vk, x in exp.items()))
+        for exp, c in hmap.items()
+    )
+    units = getattr(hmap.units, "_units", None)
+    digest.update(repr((terms, units and sorted(units.items()))).encode())
+
+
 def recursively_line(iterable, excluded):
     "Generates lines in a recursive tree-like fashion, the better to indent."
     named_constraints = {}
@@ -1,6 +1,5 @@
 "Implements Tight"
 
-from .. import SignomialsEnabled
 from ..small_scripts import appendsolwarning, initsolwarning, mag
 from .set import ConstraintSet
 
@@ -21,9 +20,10 @@ class Tight(ConstraintSet):
         variables = result["variables"]
         initsolwarning(result, "Unexpectedly Loose Constraints")
         for constraint in self.flat():
-            with SignomialsEnabled():
-                leftval = constraint.left.sub(variables).value
-                rightval = constraint.right.sub(variables).value
+            leftval, rightval = (
+                side.lambdify()(variables) * (side.units or 1)
+                for side in (constraint.left, constraint.right)
+            )
             rel_diff = mag(abs(1 - leftval / rightval))
             if rel_diff >= self.reltol:
                 msg = (
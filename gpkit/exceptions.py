@@ -30,7 +30,19 @@ class InvalidLicense(RuntimeWarning):
 
 
 class Infeasible(RuntimeWarning):
-    "Raised if a model does not solve"
+    """Raised if a model does not solve
+
+    Attributes
+    ----------
+    la, nu : arrays or None
+        The posynomial and monomial duals of a certificate of infeasibility,
+        if the solver found one
+    conflicts : dict or None
+        That certificate's ranking of the constraints and constants causing
+        the infeasibility; see GeometricProgram.conflicts
+    """
+
+    la = nu = conflicts = None
 
 
 class UnknownInfeasible(Infeasible):
@@ -2,12 +2,29 @@
 
 import os
 from collections import defaultdict
+from importlib.util import find_spec
 
-from . import build
+# solvers that can be found by import, in order of preference
+IMPORTABLE_SOLVERS = (("mosek_conif", "mosek"), ("cvxopt", "cvxopt"))
+
+
+def find_solvers():
+    """Lists the solvers whose modules can be imported, without importing them
+
+    Unlike `gpkit.build()`, this never spawns a subprocess (so it won't find
+    a command-line MOSEK), which makes it cheap enough to run on import.
+    """
+    if "GPKITSOLVERS" in os.environ:
+        return os.environ["GPKITSOLVERS"].split(", ")
+    return [name for name, module in IMPORTABLE_SOLVERS if find_spec(module)] or [""]
 
 
 def load_settings(path=None, trybuild=True):
-    "Load the settings file at SETTINGS_PATH; return settings dict"
+    """Load the settings file at SETTINGS_PATH; return settings dict
+
+    If that file lists no solvers and trybuild is True, solvers are found
+    with `find_solvers()`; run `gpkit.build()` to search more thoroughly.
+    """
     if path is None:
         path = os.sep.join([os.path.dirname(__file__), "env", "settings"])
     try:  # if the settings file already exists, read it
@@ -25,28 +42,14 @@ def load_settings(path=None, trybuild=True):
     except IOError:  # pragma: no cover
         settings_ = {"installed_solvers": [""]}
     if settings_["installed_solvers"] == [""] and trybuild:  # pragma: no cover
-        print("Found no installed solvers, beginning a build.")
-        build()
-        settings_ = load_settings(path, trybuild=False)
-        if settings_["installed_solvers"] != [""]:
-            settings_["just built!"] = True
-        else:
+        settings_["installed_solvers"] = find_solvers()
+        if settings_["installed_solvers"] == [""]:
             print(
-                """
-=============
-Build failed!  :(
-=============
-You may need to install a solver and then `import gpkit` again;
-see https://gpkit.readthedocs.io/en/latest/installation.html
-for troubleshooting details.
-
-But before you go, please post the output above
-(starting from "Found no installed solvers, beginning a build.")
-to gpkit@mit.edu or https://github.com/convexengineering/gpkit/issues/new
-so we can prevent others from having to see this message.
-
-        Thanks!  :)
-"""
+                "Found no installed solvers. You may need to install a solver"
+                " and then `import gpkit` again, or run `gpkit.build()` to"
+                " search for a command-line MOSEK; see"
+                " https://gpkit.readthedocs.io/en/latest/installation.html"
+                " for troubleshooting details."
             )
     settings_["default_solver"] = settings_["installed_solvers"][0]
     return settings_
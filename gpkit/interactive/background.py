@@ -0,0 +1,122 @@
+"Solves models in a background thread, for interactive widgets"
+
+import threading
+import traceback
+from collections import OrderedDict
+
+from ..exceptions import InvalidGPConstraint
+
+
+class BackgroundSolver:
+    """Solves a model in a worker thread, answering only its latest request
+
+    Requests made less than `delay` seconds apart are debounced into the last
+    of them; requests superseded before being solved are dropped, as are the
+    results of those superseded while being solved. `callback` is thus only
+    called for the most recent request. The results of the `cachesize` most
+    recently solved substitutions are cached, and returned without solving.
+
+    Arguments
+    ---------
+    model : Model
+        The model to solve; requested substitutions are applied to it.
+
+    callback : function
+        Called (in the worker thread) with each solution, or with the
+        exception (e.g. a RuntimeWarning) its solve raised. Exceptions the
+        callback raises are printed, and the worker goes on.
+
+    delay : float (default 0.15)
+        Seconds to wait for newer requests before solving
+
+    cachesize : int (default 16)
+        Number of recent solutions to keep
+
+    **solvekwargs
+        Passed to model.solve() (or to model.localsolve(), for models that
+        are not GPs)
+    """
+
+    def __init__(self, model, callback, delay=0.15, cachesize=16, **solvekwargs):
+        self.model = model
+        self.callback = callback
+        self.delay = delay
+        self.cachesize = cachesize
+        self.solvekwargs = solvekwargs
+        self.cache = OrderedDict()
+        self.latest = 0  # number of the most recent request
+        self._pending = None  # (number, substitutions, cache key) to solve
+        self._condition = threading.Condition()
+        self._answered = threading.Event()
+        self._answered.set()
+        self._thread = None
+
+    def request(self, subs):
+        "Asks for model to be solved with subs; returns the request's number"
+        try:
+            key = frozenset(subs.items())
+        except TypeError:  # unhashable substitutions aren't cached
+            key = None
+        with self._condition:
+            self.latest += 1
+            number = self.latest
+            self._pending = (number, dict(subs), key)
+            self._answered.clear()
+            self._condition.notify()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+        return number
+
+    def wait(self, timeout=None):
+        "Waits until the latest request is answered; returns whether it was"
+        return self._answered.wait(timeout)
+
+    def _work(self):
+        "Answers requests, the latest first, for as long as the program runs"
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                number, subs, key = self._pending
+                while key not in self.cache:  # wait until requests stop
+                    self._condition.wait(self.delay)
+                    if self._pending[0] == number:
+                        break
+                    number, subs, key = self._pending
+                self._pending = None
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                result = self.cache[key]
+            else:
+                result = self._solve(subs)
+                if key is not None and not isinstance(result, Exception):
+                    self.cache[key] = result
+                    while len(self.cache) > self.cachesize:
+                        self.cache.popitem(last=False)
+            if self._is_latest(number):  # otherwise it's been superseded
+                try:
+                    self.callback(result)
+                except Exception:  # pylint: disable=broad-except
+                    traceback.print_exc()  # rather than stop answering
+                finally:
+                    with self._condition:
+                        if number == self.latest:
+                            self._answered.set()
+
+    def _is_latest(self, number):
+        "Whether request `number` is still the most recent one"
+        with self._condition:
+            return number == self.latest
+
+    def _solve(self, subs):
+        "Solves the model with subs, returning its solution or the exception"
+        try:
+            self.model.substitutions.update(subs)
+            try:
+                return self.model.solve(**self.solvekwargs)
+            except InvalidGPConstraint:
+                # TypeError raised by as_hmapslt1 in non-GP-compatible models
+                return self.model.localsolve(**self.solvekwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            return e  # given to the callback, to show instead of a solution
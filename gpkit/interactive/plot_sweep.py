@@ -1,5 +1,7 @@
 "Implements plot_sweep1d function"
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import matplotlib.pyplot as plt
 
 from ..exceptions import InvalidGPConstraint
@@ -53,10 +55,43 @@ def format_and_label_axes(var, posys, axes, ylabel=True):
     plt.subplots_adjust(wspace=0.15)
 
 
+def map_as_completed(function, argtuples, workers=None):
+    """Yields (i, function(*argtuples[i])) for each i, as each finishes
+
+    With more than one worker the calls are made in a pool of that many
+    processes, so function (which must be defined at a module's top level)
+    and its arguments and results must be picklable; otherwise they are
+    made here, in order.
+    """
+    if not workers or workers <= 1 or len(argtuples) <= 1:
+        for i, args in enumerate(argtuples):
+            yield i, function(*args)
+        return
+    with ProcessPoolExecutor(min(workers, len(argtuples))) as pool:
+        futures = {pool.submit(function, *args): i for i, args in enumerate(argtuples)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def sweep_one(model, swept, swept_over, tol, solveargs):
+    "Autosweeps (if swept_over is a (min, max) tuple) or sweeps a single variable"
+    if isinstance(swept_over, tuple) and len(swept_over) == 2:
+        return model.autosweep({swept: swept_over}, tol=tol, **solveargs)
+    return model.sweep({swept: swept_over}, **solveargs)
+
+
 # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-def plot_1dsweepgrid(model, sweeps, posys, origsol=None, tol=0.01, **solveargs):
+# pylint: disable=too-many-arguments
+def plot_1dsweepgrid(
+    model, sweeps, posys, origsol=None, tol=0.01, *, workers=None, **solveargs
+):
     """Creates and plots a sweep from an existing model
 
+    If workers is greater than 1 the sweeps are run in a pool of that many
+    processes, and each column is plotted as soon as its sweep finishes.
+    (Where processes are spawned rather than forked, as on Windows and
+    macOS, scripts doing so need an ``if __name__ == "__main__":`` guard.)
+
     Example usage:
     f, _ = plot_sweep_1d(m, {'x': np.linspace(1, 2, 5)}, 'y')
     f.savefig('mysweep.png')
@@ -80,12 +115,9 @@ def plot_1dsweepgrid(model, sweeps, posys, origsol=None, tol=0.01, **solveargs):
     )
     plt.subplots_adjust(hspace=0.15)
 
-    for i, (swept, swept_over) in enumerate(sweeps.items()):
-        if isinstance(swept_over, tuple) and len(swept_over) == 2:
-            sol = model.autosweep({swept: swept_over}, tol=tol, **solveargs)
-        else:
-            sol = model.sweep({swept: swept_over}, **solveargs)
-
+    jobs = [(model, swept, over, tol, solveargs) for swept, over in sweeps.items()]
+    for i, sol in map_as_completed(sweep_one, jobs, workers):
+        swept = jobs[i][1]
         if len(sweeps) == 1:
             if len(posys) == 1:
                 subaxes = [axes]
@@ -102,5 +134,6 @@ def plot_1dsweepgrid(model, sweeps, posys, origsol=None, tol=0.01, **solveargs):
                 ax.plot(origsubs[swept], origsol(posy), "ko", markersize=4)
         format_and_label_axes(swept, posys, subaxes, ylabel=i == 0)
         model.substitutions.update(origsubs)
+        f.canvas.draw_idle()
 
     return f, axes
@@ -8,10 +8,15 @@ import numpy as np
 import plotly.graph_objects as go
 
 from .. import GPCOLORS
-from .plot_sweep import assign_axes
+from .plot_sweep import assign_axes, map_as_completed
 
 
-def compare(models, sweeps, posys, tol=0.001):
+def _autosweep(model, sweeps, tol):
+    "Autosweeps a model quietly (in a worker process, if compare has them)"
+    return model.autosweep(sweeps, tol, verbosity=0)
+
+
+def compare(models, sweeps, posys, tol=0.001, workers=None):
     """Compares the values of posys over a sweep of several models.
 
     If posys is of the same length as models, this will plot different
@@ -19,15 +24,20 @@ def compare(models, sweeps, posys, tol=0.001):
 
     Currently only supports a single sweepvar.
 
+    If workers is greater than 1 the models are swept in a pool of that
+    many processes, and each is plotted as soon as its sweep finishes.
+
     Example Usage:
     compare([aec, fbc], {"R": (160, 300)},
             ["cost", ("W_{\\rm batt}", "W_{\\rm fuel}")], tol=0.001)
     """
-    sols = [m.autosweep(sweeps, tol, verbosity=0) for m in models]
-    posys, axes = assign_axes(sols[0].bst.sweptvar, posys, None)
-    for posy, ax in zip(posys, axes):
-        for i, sol in enumerate(sols):
-            if hasattr(posy, "__len__") and len(posy) == len(sols):
+    axes = None
+    jobs = [(m, sweeps, tol) for m in models]
+    for i, sol in map_as_completed(_autosweep, jobs, workers):
+        if axes is None:
+            posys, axes = assign_axes(sol.bst.sweptvar, posys, None)
+        for posy, ax in zip(posys, axes):
+            if hasattr(posy, "__len__") and len(posy) == len(models):
                 p = posy[i]
             else:
                 p = posy
@@ -43,6 +53,7 @@ def compare(models, sweeps, posys, tol=0.001):
                 )
             else:
                 ax.plot(sol.sampled_at, sol(p), color=color)
+        ax.figure.canvas.draw_idle()
 
 
 def plot_convergence(model):
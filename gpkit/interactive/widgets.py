@@ -1,21 +1,29 @@
 # pylint: disable=import-error,import-outside-toplevel
 "Interactive GPkit widgets for iPython notebook"
 
+import traceback
+
 import ipywidgets as widgets
 from traitlets import link
 
-from ..exceptions import InvalidGPConstraint
 from ..small_classes import Numbers
 from ..small_scripts import is_sweepvar
+from .background import BackgroundSolver
 
 
 # pylint: disable=too-many-locals
-def modelinteract(model, fns_of_sol, ranges=None, **solvekwargs):
+def modelinteract(
+    model, fns_of_sol, ranges=None, *, delay=0.15, cachesize=16, **solvekwargs
+):
     """Easy model interaction in IPython / Jupyter
 
     By default, this creates a model with sliders for every constant
     which prints a new solution table whenever the sliders are changed.
 
+    Solves run in a background thread, so sliders stay responsive: only
+    the latest slider position is solved for once they stop for `delay`
+    seconds, and the display only updates with that latest solution.
+
     Arguments
     ---------
     fn_of_sol : function
@@ -27,6 +35,12 @@ def modelinteract(model, fns_of_sol, ranges=None, **solvekwargs):
         two or three floats: two correspond to (min, max), while three
         correspond to (min, step, max)
 
+    delay : float (default 0.15)
+        Seconds to wait for sliders to stop before solving
+
+    cachesize : int (default 16)
+        Number of recent slider positions whose solutions are kept
+
     **solvekwargs
         kwargs which get passed to the solve()/localsolve() method.
     """
@@ -72,30 +86,35 @@ def modelinteract(model, fns_of_sol, ranges=None, **solvekwargs):
         fns_of_sol = [fns_of_sol]
 
     solvekwargs["verbosity"] = 0
+    output = widgets.Output()
+
+    def show(sol):
+        "Displays the latest solution (or why there isn't one)"
+        with output:
+            output.clear_output(wait=True)
+            try:
+                if isinstance(sol, RuntimeWarning):
+                    print("RuntimeWarning:", str(sol).split("\n", maxsplit=1)[0])
+                    print("\n> Running model.debug()")
+                    model.debug()
+                elif isinstance(sol, Exception):
+                    traceback.print_exception(type(sol), sol, sol.__traceback__)
+                else:
+                    for fn in fns_of_sol:
+                        fn(sol)
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()  # shown here, as it was in the cell
+
+    solver = BackgroundSolver(model, show, delay, cachesize, **solvekwargs)
 
     def resolve(**subs):
         "This method gets called each time the user changes something"
-        model.substitutions.update(subs)
-        try:
-            try:
-                model.solve(**solvekwargs)
-            except InvalidGPConstraint:
-                # TypeError raised by as_hmapslt1 in non-GP-compatible models
-                model.localsolve(**solvekwargs)
-            if hasattr(model, "solution"):
-                sol = model.solution
-            else:
-                sol = model.result
-            for fn in fns_of_sol:
-                fn(sol)
-        except RuntimeWarning as e:
-            print("RuntimeWarning:", str(e).split("\n", maxsplit=1)[0])
-            print("\n> Running model.debug()")
-            model.debug()
-
-    resolve()
-
-    return widgets.interactive(resolve, **ranges_out)
+        solver.request(subs)
+
+    interaction = widgets.interactive(resolve, clear_output=False, **ranges_out)
+    interaction.children += (output,)
+    interaction.solver = solver
+    return interaction
 
 
 # pylint: disable=too-many-locals, too-many-statements
@@ -125,9 +144,11 @@ def modelcontrolpanel(model, showvars=(), fns_of_sol=None, **solvekwargs):
 
         fns_of_sol = [__defaultfntable]
 
-    sliders = model.interact(fns_of_sol, showvars, **solvekwargs)
+    sliders = modelinteract(model, fns_of_sol, showvars, **solvekwargs)
     sliderboxes = []
     for sl in sliders.children:
+        if not hasattr(sl, "varkey"):
+            continue  # not a slider, but where solutions are shown
         cb = widgets.Checkbox(value=True, width="3ex")
         unit_latex = sl.varkey.latex_unitstr()
         if unit_latex:
@@ -167,7 +188,7 @@ def modelcontrolpanel(model, showvars=(), fns_of_sol=None, **solvekwargs):
             varname = varname.strip()
             try:
                 yvars.append(model[varname])
-            except Exception:  # pylint: disable=broad-exception-caught
+            except Exception:  # pylint: disable=broad-except
                 break
         ranges = {}
         for sb in sliderboxes[1:]:
@@ -1,12 +1,14 @@
-"Implements KeyDict and KeySet classes"
+"Implements KeyDict, SlotKeyDict, KeySet and NameIndex classes"
 
 from collections import defaultdict
 from collections.abc import Hashable
+from functools import cached_property
 
 import numpy as np
 
 from .small_classes import FixedScalar, Numbers, Quantity
 from .small_scripts import is_sweepvar, isnan, veclinkedfn
+from .units import magnitude_in
 
 DIMLESS_QUANTITY = Quantity(1, "dimensionless")
 INT_DTYPE = np.dtype(int)
@@ -22,10 +24,32 @@ def clean_value(key, value):
     if isinstance(value, FixedScalar):
         value = value.value
     if isinstance(value, Quantity):
-        value = value.to(key.units or "dimensionless").magnitude
+        value = magnitude_in(value, key.units)
     return value
 
 
+class FrozenKeymap(dict):
+    "A keymap for sharing: missing keys map to an empty frozenset."
+
+    def __missing__(self, key):
+        return frozenset()
+
+
+def _frozen_keymap(keys):
+    "Returns the keymap a KeyMap holding `keys` would build, frozen."
+    keymap = defaultdict(set)
+    for key in keys:
+        keymap[key].add(key)
+        for mapkey in key.keys:
+            keymap[mapkey].add(key)
+    return FrozenKeymap((mapkey, frozenset(ks)) for mapkey, ks in keymap.items())
+
+
+def _sort_by_name_and_idx(key):
+    "return tuple for VarKey sorting"
+    return (key.str_without(["units", "idx"]), key.idx or ())
+
+
 class KeyMap:
     """Helper class to provide KeyMapping to interfaces.
 
@@ -50,7 +74,7 @@ class KeyMap:
     collapse_arrays = False
     keymap = []
     log_gets = False
-    vks = varkeys = None
+    vks = varkeys = nameindex = None
 
     def __init__(self, *args, **kwargs):
         "Passes through to super().__init__ via the `update()` method"
@@ -116,8 +140,32 @@ class KeyMap:
                     ) from err
         return key in self.keymap
 
+    def share_nameindex(self, nameindex):
+        """Shares the keymap of a NameIndex, if this holds exactly its keys.
+
+        Returns whether it did. A shared keymap is copied before changes.
+        """
+        if self.collapse_arrays:
+            keys, keymap = nameindex.collapsedkeys, nameindex.collapsed
+        else:
+            keys, keymap = nameindex.varkeys, nameindex.keymap
+        if len(self) != len(keys) or not keys.issuperset(self):
+            return False
+        self.keymap = keymap
+        self._unmapped_keys = set()
+        self.nameindex = nameindex
+        return True
+
+    def _ownkeymap(self):
+        "Copies a shared keymap, so that it can be changed"
+        if isinstance(self.keymap, FrozenKeymap):
+            self.keymap = defaultdict(set, self.keymap)
+            self.nameindex = None
+
     def update_keymap(self):
         "Updates the keymap with the keys in _unmapped_keys"
+        if self._unmapped_keys:
+            self._ownkeymap()
         copied = set()  # have to copy bc update leaves duplicate sets
         for key in self._unmapped_keys:
             for mapkey in key.keys:
@@ -162,7 +210,10 @@ class KeyDict(KeyMap, dict):
         "Iterates through the dictionary created by args and kwargs"
         if not self and len(args) == 1 and isinstance(args[0], KeyDict):
             super().update(args[0])
-            self.keymap.update(args[0].keymap)
+            if isinstance(args[0].keymap, FrozenKeymap):
+                self.keymap, self.nameindex = args[0].keymap, args[0].nameindex
+            else:
+                self.keymap.update(args[0].keymap)
             self._unmapped_keys.update(
                 args[0]._unmapped_keys  # pylint:disable=protected-access
             )
@@ -185,7 +236,7 @@ class KeyDict(KeyMap, dict):
         key, idx = self.parse_and_index(key)
         keys = self.keymap[key]
         if not keys:
-            del self.keymap[key]  # remove blank entry added by defaultdict
+            self.keymap.pop(key, None)  # remove blank entry added by defaultdict
             raise KeyError(key)
         got = {}
         for k in keys:
@@ -222,6 +273,7 @@ class KeyDict(KeyMap, dict):
         if key not in self.keymap:
             if not hasattr(self, "_unmapped_keys"):
                 self.__init__()  # py3's pickle sets items before init... :(
+            self._ownkeymap()
             self.keymap[key].add(key)
             self._unmapped_keys.add(key)
             if idx:
@@ -278,6 +330,7 @@ class KeyDict(KeyMap, dict):
 
     def __delitem__(self, key):
         "Overloads del [] to work with all keys"
+        self._ownkeymap()
         if not hasattr(key, "key"):  # not a keyed object
             self.update_keymap()
             keys = self.keymap[key]
@@ -316,8 +369,10 @@ class KeySet(KeyMap, set):
 
     def update(self, keys):
         "Iterates through the dictionary created by args and kwargs"
+        self._ownkeymap()
         for key in keys:
-            self.keymap[key].add(key)
+            if key not in self.keymap[key]:  # may be a shared frozenset
+                self.keymap[key] = self.keymap[key] | {key}
         self._unmapped_keys.update(keys)
         super().update(keys)
 
@@ -325,3 +380,299 @@ class KeySet(KeyMap, set):
         "Gets the keys corresponding to a particular key."
         key, _ = self.parse_and_index(key)
         return self.keymap[key]
+
+
+class SlotKeyDict(KeyDict):
+    """KeyDict whose float values share one contiguous array.
+
+    Each scalar key, and each collapsed vector, has a slot (or a block of
+    slots) in a single float64 array, given by `.slots`. Vector values are
+    read-only views of their block, so reading them never copies, and
+    `asarray()` exports every value without copying. `positions`,
+    `get_many` and `set_many` access many keys with one numpy operation.
+
+    Values that aren't floats of their key's shape (e.g. sweeps, linked
+    functions, or a DictOfLists' lists) are stored as in a KeyDict,
+    outside of the array.
+
+    >>> sol = m.solve()
+    >>> positions = sol["variables"].positions([x, y[2]])
+    >>> sol["variables"].asarray()[positions]
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.slots = {}
+        self._elements = {}  # element or scalar VarKeys to their position
+        self._array = np.empty(0)
+        self._size = 0
+        super().__init__(*args, **kwargs)
+
+    def __setstate__(self, state):
+        "Restores views of the (copied) array after pickling or copying"
+        self.__dict__.update(state)
+        self._array = self._array.copy()
+        for key in self.slots:
+            self._view(key)
+
+    def asarray(self):
+        "Returns a read-only view of every slot's value, without copying."
+        array = self._array[: self._size]
+        array.flags.writeable = False
+        return array
+
+    def positions(self, keys):
+        "Returns the positions in asarray() of keys (vectors give all theirs)"
+        return self._positions(keys)[0]
+
+    def get_many(self, keys):
+        "Returns the values of keys as one array, ordered as in positions()"
+        return self._array[self.positions(keys)]
+
+    def set_many(self, keys, values):
+        "Sets the values of keys, ordered as in positions(), all at once"
+        positions, scalars = self._positions(keys)
+        self._array[positions] = values
+        for key in scalars:
+            self._view(key)
+
+    def _positions(self, keys):
+        "Returns the positions of keys, and which of keys are scalars."
+        positions, scalars = [], []
+        for key in keys:
+            position = self._elements.get(getattr(key, "key", key))
+            if position is not None:
+                positions.append(position)
+                continue
+            key, idx = self.parse_and_index(key)
+            if not hasattr(key, "key"):  # a string
+                keys = self.keymap.get(key, ())
+                if len(keys) != 1:
+                    raise KeyError(key)
+                (key,) = keys
+            if key not in self.slots:
+                raise KeyError(f"{key} has no slot in this SlotKeyDict")
+            slots = self.slots[key]
+            if idx:
+                positions.append(slots.start + np.ravel_multi_index(idx, key.shape))
+            elif isinstance(slots, slice):
+                positions.extend(range(slots.start, slots.stop))
+            else:
+                positions.append(slots)
+                scalars.append(key)
+        return np.array(positions, dtype=int), scalars
+
+    def _allocate(self, keys):
+        "Gives each of keys a slot, or a block of slots if it's a vector."
+        sizes = [int(np.prod(key.shape)) if key.shape else 1 for key in keys]
+        needed = self._size + sum(sizes)
+        if needed > len(self._array):  # grow, then re-point all views
+            array = np.full(max(needed, 2 * len(self._array)), np.nan)
+            array[: self._size] = self._array[: self._size]
+            self._array = array
+            for key, slots in self.slots.items():
+                if isinstance(slots, slice):
+                    self._view(key)
+        for key, size in zip(keys, sizes):
+            if key.shape:
+                self.slots[key] = slice(self._size, self._size + size)
+            else:
+                self.slots[key] = self._size
+            self._size += size
+            if key not in self.keymap:
+                self._ownkeymap()
+                self.keymap[key].add(key)
+                self._unmapped_keys.add(key)
+            self.owned.add(key)
+            self._view(key)
+
+    def _view(self, key):
+        "Sets key's value in the dictionary from the array."
+        slots = self.slots[key]
+        if isinstance(slots, slice):
+            value = self._array[slots].reshape(key.shape)
+            value.flags.writeable = False
+        else:
+            value = self._array[slots]
+        dict.__setitem__(self, key, value)
+
+    def _detach(self, key):
+        "Moves key's value out of the array, into ordinary KeyDict storage."
+        slots = self.slots.pop(key, None)
+        if slots is None:
+            return
+        if isinstance(slots, slice):
+            dict.__setitem__(self, key, np.array(dict.__getitem__(self, key)))
+            self._elements = {
+                vk: position
+                for vk, position in self._elements.items()
+                if vk.veckey != key
+            }
+        else:
+            del self._elements[key]
+        self._array[slots] = np.nan
+
+    @staticmethod
+    def _floats(shape, value):
+        "Returns value if it's floats that fit shape, and otherwise None."
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return float(value)
+        if (
+            isinstance(value, np.ndarray)
+            and value.dtype.kind in "fiu"
+            and value.shape in (shape, ())
+        ):
+            return value
+        return None
+
+    def _parse(self, key, value):
+        "Returns key's canonical key, idx, cleaned value, and its floats."
+        vk = getattr(key, "key", None)
+        if vk is None:
+            return None, None, value, None
+        key, idx = (vk.veckey, vk.idx) if vk.idx else (vk, None)
+        if not isinstance(value, (float, int)):
+            value = clean_value(key, value)
+        return key, idx, value, self._floats(() if idx else key.shape or (), value)
+
+    def update(self, *args, **kwargs):
+        "Sets many items, giving all of their new keys slots at once"
+        if not hasattr(self, "slots"):
+            self.__init__()  # py3's pickle sets items before init... :(
+        if not self and len(args) == 1 and isinstance(args[0], SlotKeyDict):
+            other = args[0]
+            self._array = other.asarray().copy()
+            self._size = other._size  # pylint: disable=protected-access
+            self.slots = dict(other.slots)
+            self._elements = dict(other._elements)  # pylint: disable=protected-access
+            dict.update(self, other)
+            for key in self.slots:
+                self._view(key)
+            self.owned.update(self.slots)
+            if isinstance(other.keymap, FrozenKeymap):
+                self.keymap, self.nameindex = other.keymap, other.nameindex
+            else:
+                self.keymap.update(other.keymap)
+            self._unmapped_keys.update(
+                other._unmapped_keys  # pylint: disable=protected-access
+            )
+            return
+        self._setitems(dict(*args, **kwargs).items())
+
+    def _setitems(self, items):
+        "Sets (key, value) items, allocating all new slots at once"
+        parsed = [(k, v) + self._parse(k, v) for k, v in items]
+        self._allocate(
+            list(
+                dict.fromkeys(
+                    key
+                    for _, _, key, _, _, floats in parsed
+                    if floats is not None
+                    and key not in self.slots
+                    and not dict.__contains__(self, key)
+                )
+            )
+        )
+        positions, values, scalars = [], [], []
+        for rawkey, rawvalue, key, idx, value, floats in parsed:
+            slots = None if floats is None else self.slots.get(key)
+            if idx and slots is not None:  # an element, written below
+                position = slots.start + np.ravel_multi_index(idx, key.shape)
+                self._elements[rawkey.key] = position
+                positions.append(position)
+                values.append(floats)
+                continue
+            if not isinstance(slots, slice):  # a scalar, written below
+                if slots is not None:
+                    self._elements[key] = slots
+                    positions.append(slots)
+                    values.append(floats)
+                    scalars.append(key)
+                    continue
+            self._array[positions] = values  # keep order: write pending
+            positions, values = [], []
+            if slots is None:  # stored as in a KeyDict
+                self._detach(key)
+                KeyDict.__setitem__(self, rawkey, rawvalue if key is None else value)
+                continue
+            block = self._array[slots].reshape(key.shape)
+            if np.ndim(floats):
+                goodvals = ~np.isnan(floats)
+                block[goodvals] = floats[goodvals]
+            else:
+                block[...] = floats
+        self._array[positions] = values
+        for key in scalars:
+            if key in self.slots:
+                self._view(key)
+
+    def __getitem__(self, key):
+        try:
+            return self._array[self._elements[key.key]]
+        except (AttributeError, KeyError, TypeError):
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if not hasattr(self, "slots"):
+            self.__init__()  # py3's pickle sets items before init... :(
+        self._setitems([(key, value)])
+
+    def __delitem__(self, key):
+        vk = getattr(key, "key", None)
+        if vk is not None:
+            self._detach(vk.veckey if vk.idx else vk)
+        super().__delitem__(key)
+
+
+class NameIndex:
+    """Frozen keymaps of a fixed set of VarKeys, built once and shared.
+
+    A ConstraintSet's `.nameindex` maps each name of its varkeys (see
+    VarKey.keys) to those varkeys, both as a KeySet would (`keymap`) and,
+    with arrays collapsed to their veckeys, as a KeyDict would
+    (`collapsed`). KeyMaps holding exactly the same keys use these by
+    reference (see KeyMap.share_nameindex) instead of building their own,
+    so its Model's KeySet and its solutions' variables all resolve names
+    with one dictionary lookup.
+
+    Values derived from just the index, like the name collisions found by
+    SolutionArray.set_necessarylineage, can be kept in `.derived`.
+    """
+
+    def __init__(self, varkeys):
+        self.varkeys = frozenset(varkeys)
+        self.derived = {}
+        self._sorted = {}
+
+    def __getstate__(self):
+        "Pickles only the varkeys and derived values; the rest is remade."
+        return {"varkeys": self.varkeys, "derived": self.derived, "_sorted": {}}
+
+    @cached_property
+    def keymap(self):
+        "Keymap of the varkeys, as a KeySet of them would have."
+        return _frozen_keymap(self.varkeys)
+
+    @cached_property
+    def collapsedkeys(self):
+        "The varkeys with each array's elements replaced by its veckey."
+        return frozenset(vk.veckey if vk.idx else vk for vk in self.varkeys)
+
+    @cached_property
+    def collapsed(self):
+        "Keymap of the collapsedkeys, as a KeyDict of them would have."
+        return _frozen_keymap(self.collapsedkeys)
+
+    def sortedkeys(self, key):
+        "Returns the varkeys key maps to, sorted by name and idx."
+        key = getattr(key, "key", key)
+        if key not in self._sorted:
+            keys = sorted(self.keymap[key], key=_sort_by_name_and_idx)
+            self._sorted[key] = tuple(keys)
+        return self._sorted[key]
+
+    def keyset(self):
+        "Returns a KeySet of the varkeys, sharing this index's keymap."
+        keyset = KeySet(())
+        set.update(keyset, self.varkeys)
+        keyset.share_nameindex(self)
+        return keyset
@@ -8,7 +8,7 @@ Example
 """
 
 from functools import reduce  # pylint: disable=redefined-builtin
-from operator import eq, ge, le, xor
+from operator import eq, ge, is_, le, mul, xor
 
 import numpy as np
 
@@ -16,8 +16,12 @@ from ..constraints import ArrayConstraint
 from ..repr_conventions import ReprMixin
 from ..small_classes import EMPTY_HV, HashVector
 from ..small_scripts import try_str_without
+from ..units import Quantity, of_product, qty
 from .map import NomialMap
 
+NUMERIC = (int, float, np.number)
+NUMERIC_DTYPES = (np.dtype(int), np.dtype(float))
+
 
 @np.vectorize
 def vec_recurse(element, function, *args, **kwargs):
@@ -25,6 +29,76 @@ def vec_recurse(element, function, *args, **kwargs):
     return function(element, *args, **kwargs)
 
 
+def nomial_terms(element):
+    "Returns the (exp, c) terms and units of a nomial or number."
+    hmap = getattr(element, "hmap", None)
+    if hmap is not None:
+        return hmap.items(), hmap.units
+    if isinstance(element, Quantity):
+        return ((EMPTY_HV, element.magnitude),), qty(element.units)
+    return ((EMPTY_HV, element),), None
+
+
+def product_terms(left, right):
+    "Returns the (exp, c) terms and units of left*right, without a new nomial."
+    lterms, lunits = nomial_terms(left)
+    rterms, runits = nomial_terms(right)
+    scale = 1.0
+    if lunits is not None and runits is not None:
+        prod_units, dimless_convert = of_product(lunits, runits)
+        if dimless_convert:
+            scale = dimless_convert
+    elif lunits is not None or runits is not None:
+        prod_units = lunits if lunits is not None else runits
+    else:
+        prod_units = None
+    rterms = list(rterms)
+    terms = [
+        (lexp + rexp if rexp else lexp, lc * rc * scale)
+        for lexp, lc in lterms
+        for rexp, rc in rterms
+    ]
+    return terms, prod_units
+
+
+def bulk_hmap(termsets):
+    """Returns the NomialMap of a sum of (terms, units) pairs.
+
+    All terms are gathered into a single map in one pass, so that summing
+    N nomials is O(N) instead of the O(N^2) of repeated NomialMap addition.
+    The sum takes the units of the first pair; the others are converted.
+    """
+    hmap, conversions, first = NomialMap(), {}, True
+    for terms, tunits in termsets:
+        if first:
+            hmap.units, first = tunits, False
+        conversion = conversions.get(id(tunits))
+        if conversion is None:
+            if tunits is hmap.units:
+                factor = 1.0
+            elif hmap.units is None:
+                factor = float(tunits)
+            elif tunits is None:
+                factor = 1 / float(hmap.units)
+            else:
+                factor = float(tunits / hmap.units)
+            # tunits is stored alongside so its id can't be reused in this loop
+            conversion = conversions[id(tunits)] = (factor, tunits)
+        factor = conversion[0]
+        for exp, c in terms:
+            hmap[exp] = hmap.get(exp, 0) + c * factor
+    for exp in [exp for exp, c in hmap.items() if c == 0]:
+        del hmap[exp]  # remove zeros created by addition
+    if not hmap:  # make sure it's never an empty hmap
+        hmap[EMPTY_HV] = 0.0
+    return hmap
+
+
+def _is_zero(element):
+    "True for numbers that contribute nothing to a sum."
+    return getattr(element, "hmap", None) is None and not element
+
+
 def array_constraint(symbol, func):
     "Return function which creates constraints of the given operator."
     vecfunc = np.vectorize(func)
@@ -33,6 +107,10 @@ def array_constraint(symbol, func):
         "Creates array constraint from vectorized operator."
         if not isinstance(other, NomialArray):
             other = NomialArray(other)
+        if symbol != "=":
+            out = DenseInequalities.from_sides(self, symbol, other)
+            if out is not None:
+                return out
         result = vecfunc(self, other)
         return ArrayConstraint(
             result, getattr(self, "key", self), symbol, getattr(other, "key", other)
@@ -53,26 +131,116 @@ class NomialArray(ReprMixin, np.ndarray):
     >>> px = gpkit.NomialArray([1, x, x**2])
     """
 
+    _dense = _dense_terms = None
+    _dense_elements = None  # the elements the dense forms were made from
+
+    def _dense_current(self):
+        """Whether this array still holds the elements its dense forms are of
+
+        Elements can be written without this array knowing (e.g. through
+        `.flat`, a reshaped view or `np.put`), so this checks them each time.
+        """
+        elements = self._dense_elements
+        if elements is None:
+            return False
+        if len(elements) == self.size and all(map(is_, elements, self.flat)):
+            return True
+        self._clear_dense()
+        return False
+
+    def _set_dense_form(self, attr, value):
+        "Sets a dense form, noting which elements it is of"
+        setattr(self, attr, value)
+        if self._dense is None and self._dense_terms is None:
+            self._dense_elements = None
+        else:
+            self._dense_elements = list(self.flat)
+
+    @property
+    def dense(self):
+        "DenseMonomials form, if this is an array of monomials"
+        return self._dense if self._dense_current() else None
+
+    @dense.setter
+    def dense(self, dense):
+        self._set_dense_form("_dense", dense)
+
+    @property
+    def dense_terms(self):
+        "List of DenseMonomials, if this is a sum of them"
+        return self._dense_terms if self._dense_current() else None
+
+    @dense_terms.setter
+    def dense_terms(self, terms):
+        self._set_dense_form("_dense_terms", terms)
+
+    def _clear_dense(self):
+        "Forgets this array's dense forms"
+        self._dense = self._dense_terms = self._dense_elements = None
+
+    def _clear_caches(self):
+        "Forgets this array's dense forms and ast, which writes make stale"
+        self._clear_dense()
+        self.ast = None
+
+    def __setitem__(self, idxs, value):
+        self._clear_caches()
+        np.ndarray.__setitem__(self, idxs, value)
+
+    def _dense_op(self, ast, operation, *others):
+        "Returns the result of a monomial operation on dense forms, or None."
+        dense = self.dense
+        if (
+            dense is None
+            and not self.shape
+            and any(getattr(o, "shape", None) for o in others)
+        ):
+            # e.g. a Monomial times an array
+            dense = DenseMonomials.from_operand(self[()])
+        if dense is None:
+            return None
+        others = [DenseMonomials.from_operand(other) for other in others]
+        if any(other is None for other in others):
+            return None
+        dense = operation(dense, *others)
+        if dense is None or not dense.positive:
+            return None  # leave zeros, signomials and errors to the elements
+        out = NomialArray(dense.materialize())
+        out.dense, out.ast = dense, ast
+        return out
+
     def __mul__(self, other, *, reverse_order=False):
         astorder = (self, other) if not reverse_order else (other, self)
-        out = NomialArray(np.ndarray.__mul__(self, other))
-        out.ast = ("mul", astorder)
+        out = self._dense_op(("mul", astorder), mul, other)
+        if out is None:
+            out = NomialArray(np.ndarray.__mul__(self, other))
+            out.ast = ("mul", astorder)
         return out
 
     def __truediv__(self, other):
-        out = NomialArray(np.ndarray.__truediv__(self, other))
-        out.ast = ("div", (self, other))
+        ast = ("div", (self, other))
+        out = self._dense_op(ast, lambda s, o: s * o**-1, other)
+        if out is None:
+            out = NomialArray(np.ndarray.__truediv__(self, other))
+            out.ast = ast
         return out
 
     def __rtruediv__(self, other):
-        out = np.ndarray.__mul__(self**-1, other)
-        out.ast = ("div", (other, self))
+        ast = ("div", (other, self))
+        out = self._dense_op(ast, lambda s, o: o * s**-1, other)
+        if out is None:
+            out = np.ndarray.__mul__(self**-1, other)
+            out.ast = ast
         return out
 
     def __add__(self, other, *, reverse_order=False):
         astorder = (self, other) if not reverse_order else (other, self)
         out = np.ndarray.__add__(self, other)
         out.ast = ("add", astorder)
+        if self.dense is not None or self.dense_terms is not None:
+            terms = DenseMonomials.terms_of(self), DenseMonomials.terms_of(other)
+            if None not in terms:  # elements keep self's units, so its terms lead
+                out.dense_terms = terms[0] + terms[1]
         return out
 
     # pylint: disable=multiple-statements
@@ -83,8 +251,14 @@ class NomialArray(ReprMixin, np.ndarray):
         return self.__add__(other, reverse_order=True)
 
     def __pow__(self, expo):  # pylint: disable=arguments-differ
-        out = np.ndarray.__pow__(self, expo)  # pylint: disable=too-many-function-args
-        out.ast = ("pow", (self, expo))
+        ast = ("pow", (self, expo))
+        out = None
+        if isinstance(expo, NUMERIC) or getattr(expo, "dtype", None) in NUMERIC_DTYPES:
+            out = self._dense_op(ast, lambda s: s**expo)
+        if out is None:
+            # pylint: disable=too-many-function-args
+            out = np.ndarray.__pow__(self, expo)
+            out.ast = ast
         return out
 
     def __neg__(self):
@@ -97,6 +271,9 @@ class NomialArray(ReprMixin, np.ndarray):
         if not getattr(out, "shape", None):
             return out
         out.ast = ("index", (self, idxs))
+        dense = self.dense
+        if dense is not None:
+            out.dense = dense[idxs]
         return out
 
     def str_without(self, excluded=()):
@@ -133,12 +310,17 @@ class NomialArray(ReprMixin, np.ndarray):
 
     def __array_finalize__(self, obj):
         "Finalizer. Required for objects inheriting from np.ndarray."
+        # new arrays and views start without dense forms, which are only
+        # given to the fresh results of operations known to preserve them
+        self._dense = self._dense_terms = self._dense_elements = None
 
     # pylint: disable=arguments-renamed,too-many-function-args
     def __array_wrap__(self, out_arr, context=None, return_scalar=True):
         """Called by numpy ufuncs.
         Special case to avoid creation of 0-dimensional arrays
         See http://docs.scipy.org/doc/numpy/user/basics.subclassing.html"""
+        if isinstance(out_arr, NomialArray):  # written in place, e.g. by `*=`
+            out_arr._clear_caches()  # pylint: disable=protected-access
         if return_scalar and out_arr.ndim == 0:
             val = out_arr.item()
             return np.float(val) if isinstance(val, np.generic) else val
@@ -148,9 +330,54 @@ class NomialArray(ReprMixin, np.ndarray):
     __le__ = array_constraint("<=", le)
     __ge__ = array_constraint(">=", ge)
 
+    def __array_function__(self, func, types, args, kwargs):
+        "Routes np.dot and np.inner to their one-pass implementations."
+        if func in (np.dot, np.inner) and len(args) == 2 and not kwargs:
+            left, right = args
+            if left is self:
+                return getattr(self, func.__name__)(right)
+            return getattr(NomialArray(left), func.__name__)(right)
+        return super().__array_function__(func, types, args, kwargs)
+
+    def _contract(self, other, other_axis):
+        "Sums products over self's last axis and other's other_axis."
+        other = np.asarray(other)
+        if not self.ndim or not other.ndim or not self.size or not other.size:
+            return None
+        other = np.moveaxis(other, other_axis, -1)
+        if self.shape[-1] != other.shape[-1]:
+            raise ValueError(
+                f"shapes {self.shape} and {other.shape} are not aligned"
+                " for summing products."
+            )
+        left, length = self.view(np.ndarray), self.shape[-1]
+        out = np.empty(left.shape[:-1] + other.shape[:-1], dtype="object")
+        for lidx in np.ndindex(left.shape[:-1]):
+            for ridx in np.ndindex(other.shape[:-1]):
+                lrow, rrow = left[lidx], other[ridx]
+                out[lidx + ridx] = Signomial(
+                    bulk_hmap(
+                        product_terms(lrow[i], rrow[i])
+                        for i in range(length)
+                        if not (_is_zero(lrow[i]) or _is_zero(rrow[i]))
+                    )
+                )
+        return out[()] if not out.shape else NomialArray(out)
+
     def inner(self, other):
         "Returns the array and argument's inner product."
-        return NomialArray(np.inner(self, other))
+        out = self._contract(other, -1)
+        if out is None:
+            return NomialArray(np.inner(self.view(np.ndarray), other))
+        return out
+
+    def dot(self, other, out=None):  # pylint: disable=arguments-differ
+        "Returns the array and argument's dot product."
+        other_axis = -2 if np.ndim(other) > 1 else -1
+        result = self._contract(other, other_axis) if out is None else None
+        if result is None:
+            return np.ndarray.dot(self, other, out)
+        return result
 
     def outer(self, other):
         "Returns the array and argument's outer product."
@@ -164,25 +391,34 @@ class NomialArray(ReprMixin, np.ndarray):
         "Substitutes into the array"
         return self.vectorize(lambda nom: nom.sub(subs, require_positive))
 
+    def lambdify(self, varkeys=None):
+        "Compiles the array into a vectorized numpy evaluator of its elements"
+        if not self.size:
+            raise ValueError("cannot lambdify NomialArray of size 0")
+        hmaps = [Signomial(el, require_positive=False).hmap for el in self.flat]
+        return Lambdified(hmaps, varkeys, self.shape)
+
     def sum(self, *args, **kwargs):  # pylint: disable=arguments-differ
-        "Returns a sum. O(N) if no arguments are given."
+        "Returns a sum. O(N) if no arguments or only an integer axis are given."
         if not self.size:
             raise ValueError("cannot sum NomialArray of size 0")
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        if len(args) == 1 and "axis" not in kwargs:
+            (kwargs["axis"],), args = args, ()
+        axis = kwargs.pop("axis", None)
         if args or kwargs or not self.shape:
-            return np.ndarray.sum(self, *args, **kwargs)
-        hmap = NomialMap()
-        for p in self.flat:  # pylint:disable=not-an-iterable
-            if not hmap and hasattr(p, "units"):
-                hmap.units = p.units
-            if hasattr(p, "hmap"):
-                hmap += p.hmap
-            else:
-                if hasattr(p, "units"):
-                    p = p.to(hmap.units).magnitude
-                elif hmap.units and p and not np.isnan(p):
-                    p /= float(hmap.units)
-                hmap[EMPTY_HV] = p + hmap.get(EMPTY_HV, 0)
-        out = Signomial(hmap)
+            return np.ndarray.sum(self, *args, axis=axis, **kwargs)
+        if axis is not None and self.ndim > 1:
+            if not isinstance(axis, (int, np.integer)):
+                return np.ndarray.sum(self, axis=axis)
+            moved = np.moveaxis(self.view(np.ndarray), axis, -1)
+            out = np.empty(moved.shape[:-1], dtype="object")
+            for idx in np.ndindex(out.shape):
+                summands = (nomial_terms(p) for p in moved[idx] if not _is_zero(p))
+                out[idx] = Signomial(bulk_hmap(summands))
+            return NomialArray(out)
+        summands = (nomial_terms(p) for p in self.flat if not _is_zero(p))
+        out = Signomial(bulk_hmap(summands))
         out.ast = ("sum", (self, None))
         return out
 
@@ -192,7 +428,7 @@ class NomialArray(ReprMixin, np.ndarray):
             raise ValueError("cannot prod NomialArray of size 0")
         if args or kwargs:
             return np.ndarray.prod(self, *args, **kwargs)
-        c, exp = 1.0, HashVector()
+        c, exp = 1.0, {}
         hmap = NomialMap()
         for m in self.flat:  # pylint:disable=not-an-iterable
             try:
@@ -200,14 +436,17 @@ class NomialArray(ReprMixin, np.ndarray):
             except (AttributeError, ValueError):
                 return np.ndarray.prod(self, *args, **kwargs)
             c *= mc
-            exp += mexp
+            for vk, x in mexp.items():
+                exp[vk] = exp.get(vk, 0) + x
             if m.units:
                 hmap.units = (hmap.units or 1) * m.units
-        hmap[exp] = c
+        hmap[HashVector({vk: x for vk, x in exp.items() if x})] = c
         out = Signomial(hmap)
         out.ast = ("prod", (self, None))
         return out
 
 
 # pylint: disable=wrong-import-position
+from .dense import DenseInequalities, DenseMonomials  # noqa: E402
+from .lambdify import Lambdified  # noqa: E402
 from .math import Signomial  # noqa: E402
@@ -0,0 +1,442 @@
+"""Structure-of-arrays representation of same-shaped arrays of monomials
+
+Example
+-------
+>>> x = gpkit.VectorVariable(3, "x")
+>>> x.dense.cs
+array([1., 1., 1.])
+>>> (2 * x**2).dense.cs
+array([2., 2., 2.])
+
+"""
+
+from functools import cached_property
+from itertools import combinations
+
+import numpy as np
+
+from ..constraints import ArrayConstraint
+from ..globals import NamedVariables
+from ..small_classes import HashVector, Numbers, Quantity
+from ..units import DimensionalityError, magnitude_in, of_division, of_product, qty
+from .map import NomialMap
+from .math import Monomial, Posynomial, PosynomialInequality, Signomial
+
+
+def _as_object_array(key):
+    "Wraps a single VarKey in a 0-d object array without numpy introspecting it."
+    keys = np.empty((), dtype="object")
+    keys[()] = key
+    return keys
+
+
+def _exp_at(exps, i):
+    "Returns the exponent HashVector at flat index i of raveled (keys, xs) pairs."
+    exp = HashVector()
+    for keys, xs in exps:
+        x = xs[i]
+        if x:
+            vk = keys[i]
+            x += exp.get(vk, 0)
+            if x:
+                exp[vk] = float(x)
+            else:
+                del exp[vk]
+    return exp
+
+
+class DenseMonomials:
+    """An array of monomials stored as coefficient and exponent arrays.
+
+    Arguments
+    ---------
+    cs : ndarray
+        Coefficient of each monomial; its shape is the array's shape.
+    exps : list of (keys, xs) pairs
+        Each `keys` is an object array of VarKeys and each `xs` is a float
+        array of their exponents; both must broadcast to the shape of `cs`.
+        The same VarKey may appear in more than one pair.
+    units : Quantity or None
+        Units shared by every monomial in the array.
+
+    Algebra between DenseMonomials is elementwise NumPy arithmetic on these
+    arrays; the Monomials made by `.materialize()` build their NomialMaps
+    only when they are first used.
+    """
+
+    _flat = None  # raveled cs and exps, cached by .hmap_at
+
+    def __init__(self, cs, exps=(), units=None):
+        self.cs = cs
+        self.exps = list(exps)
+        self.units = units
+
+    @classmethod
+    def from_keys(cls, keys, units=None):
+        "DenseMonomials for an array of variables, e.g. a VectorVariable."
+        ones = np.ones(keys.shape)
+        return cls(ones, [(keys, ones)], units)
+
+    @classmethod
+    def from_operand(cls, other):
+        "DenseMonomials for a NomialArray, Monomial or number; None otherwise."
+        dense = getattr(other, "dense", None)
+        if dense is not None:
+            return dense
+        if isinstance(other, Monomial):
+            ((exp, c),) = other.hmap.items()
+            exps = [(_as_object_array(vk), np.float64(x)) for vk, x in exp.items()]
+            return cls(np.array(c, "f8"), exps, other.hmap.units)
+        if isinstance(other, Quantity):
+            if getattr(other.magnitude, "shape", None):
+                return None  # arrays of Quantities stay on the object path
+            return cls(np.array(other.magnitude, "f8"), (), qty(other.units))
+        if isinstance(other, Numbers):
+            return cls(np.array(other, "f8"))
+        if isinstance(other, (list, tuple)):
+            other = np.asarray(other)
+        if isinstance(other, np.ndarray) and other.dtype.kind in "biuf":
+            return cls(np.asarray(other, "f8"))
+        return None
+
+    @classmethod
+    def terms_of(cls, operand):
+        "List of DenseMonomials summing to operand, or None if there isn't one."
+        terms = getattr(operand, "dense_terms", None)
+        if terms is not None:
+            return terms
+        dense = cls.from_operand(operand)
+        if dense is None or not dense.positive:
+            return None
+        return [dense]
+
+    @property
+    def shape(self):
+        "Shape of the represented array"
+        return self.cs.shape
+
+    @property
+    def positive(self):
+        "True if every coefficient is positive and finite (i.e. a posynomial)."
+        return bool(np.all(self.cs > 0) and np.all(np.isfinite(self.cs)))
+
+    def __mul__(self, other):
+        cs = self.cs * other.cs
+        if self.units is not None and other.units is not None:
+            units, dimless_convert = of_product(self.units, other.units)
+            if dimless_convert:
+                cs = cs * dimless_convert
+        else:
+            units = self.units if self.units is not None else other.units
+        if self is other:  # e.g. x*x: add the exponents of shared keys
+            return DenseMonomials(cs, [(k, 2 * xs) for k, xs in self.exps], units)
+        return DenseMonomials(cs, self.exps + other.exps, units)
+
+    def __pow__(self, expo):
+        "Accepts numbers and numeric arrays, as Monomial.__pow__ does."
+        with np.errstate(divide="ignore", over="ignore"):
+            cs = self.cs**expo
+        if self.units is None or not np.any(expo):
+            units = None
+        elif np.ndim(expo):
+            return None  # elements would have different units
+        else:
+            units = self.units**expo
+        return DenseMonomials(cs, [(k, xs * expo) for k, xs in self.exps], units)
+
+    def __getitem__(self, idxs):
+        shape = self.shape
+        cs = self.cs[idxs]
+        exps = [
+            (np.broadcast_to(keys, shape)[idxs], np.broadcast_to(xs, shape)[idxs])
+            for keys, xs in self.exps
+        ]
+        return DenseMonomials(cs, exps, self.units)
+
+    def materialize(self):
+        "Returns an object array of the Monomials this represents."
+        out = np.empty(self.cs.size, dtype="object")
+        for i in range(self.cs.size):
+            mon = DenseMonomial.__new__(DenseMonomial)
+            mon._dense, mon._idx = self, i  # pylint: disable=protected-access
+            out[i] = mon
+        return out.reshape(self.shape)
+
+    def hmap_at(self, i):
+        "Returns the NomialMap of the monomial at flat index i."
+        if self._flat is None:
+            shape = self.shape
+            self._flat = (
+                self.cs.ravel().tolist(),
+                [
+                    (
+                        np.broadcast_to(k, shape).ravel(),
+                        np.broadcast_to(x, shape).ravel(),
+                    )
+                    for k, x in self.exps
+                ],
+            )
+        cs, exps = self._flat
+        hmap = NomialMap({_exp_at(exps, i): cs[i]})
+        hmap.units = self.units
+        return hmap
+
+
+class DenseMonomial(Monomial):
+    """A Monomial element of DenseMonomials, whose NomialMap is built on use.
+
+    Elements are made in bulk by DenseMonomials.materialize, which sets their
+    `_dense` array and flat `_idx` instead of calling __init__.
+    """
+
+    any_nonpositive_cs = False
+    _dense = _idx = _hmap = None
+
+    __hash__ = Monomial.__hash__
+
+    @property
+    def hmap(self):
+        "Creates hmap or returns a cached hmap"
+        if self._hmap is None:
+            self._hmap = self._dense.hmap_at(self._idx)
+        return self._hmap
+
+    @property
+    def units(self):
+        "The units shared by every element of the dense array"
+        return self._dense.units
+
+    def to(self, units):
+        "Create new Monomial converted to new units"
+        return Monomial(self.hmap.to(units))
+
+
+def _flat_pairs(dense, shape, sign=1):
+    "Returns dense's (keys, xs) pairs broadcast to shape and raveled."
+    return [
+        (
+            np.broadcast_to(keys, shape).ravel(),
+            sign * np.broadcast_to(xs, shape).ravel(),
+        )
+        for keys, xs in dense.exps
+    ]
+
+
+def _substituted(keys, substitutions):
+    """Returns (mask, values, unusual) arrays for the keys substituted, or None.
+
+    `unusual` marks substitutions (e.g. by Monomials) that have to be left
+    to PosynomialInequality.as_hmapslt1.
+    """
+    if dict.keys(substitutions).isdisjoint(keys):
+        return None
+    mask, unusual = np.zeros(keys.size, bool), np.zeros(keys.size, bool)
+    values = np.ones(keys.size)
+    for i, key in enumerate(keys):
+        if not dict.__contains__(substitutions, key):
+            continue
+        value = dict.__getitem__(substitutions, key)
+        if hasattr(value, "hmap"):
+            unusual[i] = True
+            continue
+        if hasattr(value, "to"):
+            value = magnitude_in(value, key.units)
+        try:
+            values[i], mask[i] = value, True
+        except (TypeError, ValueError):
+            unusual[i] = True
+    return mask, values, unusual
+
+
+class DenseInequalities(ArrayConstraint):
+    """An ArrayConstraint of PosynomialInequalities held as dense terms.
+
+    Made by NomialArray comparisons between an array of monomials on the
+    greater-than side and a sum of arrays of monomials on the other. Each
+    element's posynomial <= 1 is stored as one coefficient array and a list
+    of exponent arrays per term, so that variables, bounds and substitutions
+    are found for every element at once. Elements that cancel a variable or
+    have a constant term are handled by their own PosynomialInequality code.
+
+    Arguments
+    ---------
+    left, right : NomialArray
+        The two sides of the comparison, as given to the operator.
+    oper : str
+        Either "<=" or ">=".
+    p_terms : list of DenseMonomials
+        The terms of the less-than side.
+    m_gt : DenseMonomials
+        The greater-than side.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def __init__(self, left, oper, right, p_terms, m_gt):
+        shape = np.broadcast_shapes(left.shape, right.shape)
+        size = int(np.prod(shape))
+        self.sides = [
+            np.broadcast_to(side.view(np.ndarray), shape).ravel()
+            for side in (left, right)
+        ]
+        self.p_units = p_terms[0].units
+        m_c = m_gt.cs * of_division(m_gt, p_terms[0])
+        m_pairs = _flat_pairs(m_gt, shape, sign=-1)
+        self.terms = []
+        self.irregular = np.zeros(size, bool)
+        for term in p_terms:
+            cs = term.cs * of_division(term, p_terms[0]) / m_c
+            pairs = _flat_pairs(term, shape) + m_pairs
+            self.terms.append((np.broadcast_to(cs, shape).ravel(), pairs))
+            nonzero = [xs != 0 for _, xs in pairs]
+            if not nonzero:
+                self.irregular[:] = True  # a constant term
+                continue
+            self.irregular |= ~np.any(nonzero, axis=0)
+            hashes = [np.fromiter(map(hash, keys), np.int64, size) for keys, _ in pairs]
+            for j, k in combinations(range(len(pairs)), 2):
+                self.irregular |= (hashes[j] == hashes[k]) & nonzero[j] & nonzero[k]
+
+        lineage = tuple(NamedVariables.lineage)
+        elements = np.empty(size, dtype="object")
+        for i in range(size):
+            element = DenseInequality.__new__(DenseInequality)
+            element._batch, element._idx = self, i  # pylint: disable=protected-access
+            element.oper, element.lineage = oper, lineage
+            elements[i] = element
+
+        self.vks, self.bounded, self.meq_bounded = set(), set(), {}
+        regular = ~self.irregular
+        for _, pairs in self.terms:
+            for keys, xs in pairs:
+                for direction, where in (("upper", xs > 0), ("lower", xs < 0)):
+                    vks = set(keys[where & regular])
+                    self.vks.update(vks)
+                    self.bounded.update((vk, direction) for vk in vks)
+        for element in elements[self.irregular]:
+            self.vks.update(element.vks)
+            self.bounded.update(element.bounded)  # raises if infeasible
+        ArrayConstraint.__init__(
+            self,
+            elements.reshape(shape),
+            getattr(left, "key", left),
+            oper,
+            getattr(right, "key", right),
+        )
+
+    @classmethod
+    def from_sides(cls, left, oper, right):
+        "Returns DenseInequalities for `left oper right`, or None if it can't."
+        if left.dense is None and left.dense_terms is None:
+            return None
+        sides = [
+            DenseMonomials.terms_of(side if side.shape else side[()])
+            for side in (left, right)
+        ]
+        if any(terms is None for terms in sides):
+            return None
+        p_terms, m_terms = sides if oper == "<=" else reversed(sides)
+        if len(m_terms) != 1:
+            return None
+        try:
+            return cls(left, oper, right, p_terms, m_terms[0])
+        except DimensionalityError:
+            return None  # leave the error message to the elements
+
+    def unsubbed_at(self, i, element):
+        "Returns the unsubstituted posys <= 1 of the element at flat index i."
+        hmap = NomialMap()
+        for cs, pairs in self.terms:
+            exp = _exp_at(pairs, i)
+            hmap[exp] = hmap.get(exp, 0) + cs[i]
+        hmap.units = self.p_units
+        hmap = element._simplify_posy_ineq(hmap)  # pylint: disable=protected-access
+        return [Posynomial(hmap)] if hmap else []
+
+    def as_hmapslt1(self, substitutions):
+        "Returns the posys <= 1 of every element, substituting in bulk."
+        fallback = self.irregular.copy()
+        terms = []
+        for cs, pairs in self.terms:
+            subbed_pairs = []
+            for keys, xs in pairs:
+                subbed = _substituted(keys, substitutions)
+                if subbed is not None:
+                    mask, values, unusual = subbed
+                    fallback |= unusual
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        cs = cs * values**xs
+                    xs = np.where(mask, 0.0, xs)
+                subbed_pairs.append((keys.tolist(), xs.tolist()))
+            fallback |= ~((cs > 0) & np.isfinite(cs))
+            terms.append((cs.tolist(), subbed_pairs))
+        out = []
+        for i, element in enumerate(self.constraints.flat):
+            hmap = None if fallback[i] else self._subbed_hmap(terms, i)
+            if hmap is None:  # e.g. constant or merged terms after substitution
+                out.extend(element.as_hmapslt1(substitutions))
+                continue
+            for attr in ("pmap", "const_mmap"):  # so sens_from_dual ignores them
+                element.__dict__.pop(attr, None)
+            hmap.parent = element
+            out.append(hmap)
+        return out
+
+    def _subbed_hmap(self, terms, i):
+        "Element i's hmap if its terms stayed distinct and variable, else None."
+        hmap = NomialMap()
+        for cs, pairs in terms:
+            exp = _exp_at(pairs, i)
+            if not exp or exp in hmap:
+                return None
+            hmap[exp] = cs[i]
+        hmap.units = self.p_units
+        return hmap
+
+
+class DenseInequality(PosynomialInequality):
+    """A PosynomialInequality element of DenseInequalities.
+
+    Elements are made in bulk by DenseInequalities, which sets their
+    `_batch` and flat `_idx` instead of calling __init__; their sides,
+    variables, posynomials <= 1 and bounds are found when first used.
+    """
+
+    _batch = _idx = None
+
+    def _side(self, i):
+        side = self._batch.sides[i][self._idx]
+        return side if isinstance(side, Signomial) else Signomial(side)
+
+    @cached_property
+    def left(self):  # pylint: disable=method-hidden
+        "Left side of this element"
+        return self._side(0)
+
+    @cached_property
+    def right(self):  # pylint: disable=method-hidden
+        "Right side of this element"
+        return self._side(1)
+
+    @cached_property
+    def vks(self):  # pylint: disable=method-hidden
+        "Variables in either side of this element"
+        vks = set()
+        for side in (self.left, self.right):
+            for exp in side.hmap:
+                vks.update(exp)
+        return vks
+
+    @cached_property
+    def unsubbed(self):  # pylint: disable=method-hidden
+        "Unsubstituted posynomials <= 1"
+        return self._batch.unsubbed_at(self._idx, self)
+
+    @cached_property
+    def bounded(self):  # pylint: disable=method-hidden
+        "Bounds this element puts on its variables"
+        bounded = set()
+        for p in self.unsubbed:
+            for exp in p.hmap:
+                for vk, x in exp.items():
+                    bounded.add((vk, "upper" if x > 0 else "lower"))
+        return bounded
@@ -0,0 +1,111 @@
+"""Compiles nomials into vectorized numpy evaluators
+
+Example
+-------
+>>> x = gpkit.Variable("x")
+>>> y = gpkit.Variable("y")
+>>> evaluate = (x**2 + 3*y).lambdify([x.key, y.key])
+>>> evaluate([np.array([1, 2]), 1])
+array([4., 7.])
+
+"""
+
+import numpy as np
+
+from ..small_classes import Quantity
+from ..units import magnitude_in, of_division
+
+
+def _magnitude(vk, value):
+    "Returns value as an array in vk's units."
+    if isinstance(value, Quantity):
+        value = magnitude_in(value, vk.units)
+    return np.asarray(value)
+
+
+class Lambdified:
+    """Evaluates an array of nomials, and optionally its log-gradient.
+
+    Arguments
+    ---------
+    hmaps : list of NomialMaps
+        The flattened (C-order) elements to evaluate
+    varkeys : list of VarKeys (optional)
+        Order of the evaluator's arguments; by default every variable in
+        hmaps, in order of first appearance
+    shape : tuple (optional)
+        Shape into which the evaluated elements are arranged
+
+    Calling the result with values (a sequence aligned with `varkeys`, or a
+    mapping such as a solution's variables) returns the magnitudes of each
+    element in `self.units`. Values may be arrays; their broadcast shape
+    is prepended to `shape`, so a whole sweep evaluates in one call.
+    Coefficients of elements in other units are converted on creation.
+    """
+
+    def __init__(self, hmaps, varkeys=None, shape=()):
+        self.shape = tuple(shape)
+        self.units = hmaps[0].units if hmaps else None
+        if varkeys is None:
+            varkeys = dict.fromkeys(vk for hmap in hmaps for exp in hmap for vk in exp)
+        self.varkeys = list(varkeys)
+        idxs = {vk: i for i, vk in enumerate(self.varkeys)}
+        cs, starts, rows, cols, xs = [], [], [], [], []
+        for hmap in hmaps:
+            factor = of_division(hmap, hmaps[0])
+            starts.append(len(cs))
+            for exp, c in hmap.items():
+                for vk, x in exp.items():
+                    if vk not in idxs:
+                        raise ValueError(f"{vk} is not one of the varkeys {varkeys}.")
+                    rows.append(len(cs))
+                    cols.append(idxs[vk])
+                    xs.append(x)
+                cs.append(c * factor)
+        self.cs = np.array(cs, dtype=float)
+        self.starts = np.array(starts, dtype=int)
+        self.exps = np.zeros((len(cs), len(self.varkeys)))
+        self.exps[rows, cols] = xs
+        self.terms_of = [np.flatnonzero(exps) for exps in self.exps.T]
+
+    def __call__(self, values, grad=False):
+        """Evaluates each element at values.
+
+        Arguments
+        ---------
+        values : sequence or dict
+            Values (numbers, arrays or Quantities) of each varkey
+        grad : bool (optional)
+            If True, also returns d(log element)/d(log value) for each
+            varkey, along a new last axis in the order of `varkeys`
+
+        Returns
+        -------
+        ndarray (or scalar, if both values and shape are scalar)
+        """
+        if isinstance(values, dict):
+            values = [values[vk] for vk in self.varkeys]
+        values = [_magnitude(vk, v) for vk, v in zip(self.varkeys, values)]
+        if len(values) != len(self.varkeys):
+            raise ValueError(
+                f"expected {len(self.varkeys)} values but received {len(values)}."
+            )
+        bshape = np.broadcast_shapes(*(value.shape for value in values))
+        column = (-1,) + (1,) * len(bshape)
+        terms = np.empty((len(self.cs),) + bshape)
+        terms[:] = self.cs.reshape(column)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for value, terms_of, exps in zip(values, self.terms_of, self.exps.T):
+                if terms_of.size:
+                    terms[terms_of] *= value ** exps[terms_of].reshape(column)
+            out = np.add.reduceat(terms, self.starts, axis=0)
+            if grad:
+                exps = self.exps.reshape((len(self.cs),) + column[1:] + (-1,))
+                weighted = terms[..., None] * exps
+                grads = np.add.reduceat(weighted, self.starts, axis=0)
+                grads /= out[..., None]
+        out = np.moveaxis(out, 0, -1).reshape(bshape + self.shape)[()]
+        if not grad:
+            return out
+        grads = np.moveaxis(grads, 0, -2)
+        return out, grads.reshape(bshape + self.shape + (len(self.varkeys),))
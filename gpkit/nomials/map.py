@@ -6,7 +6,7 @@ import numpy as np
 
 from .. import units
 from ..small_classes import EMPTY_HV, HashVector, Strings
-from ..units import DimensionalityError, qty
+from ..units import DimensionalityError, magnitude_in, qty
 from .substitution import parse_subs
 
 DIMLESS_QUANTITY = qty("dimensionless")
@@ -52,17 +52,20 @@ class NomialMap(HashVector):
     def to(self, to_units):
         "Returns a new NomialMap of the given units"
         sunits = self.units or DIMLESS_QUANTITY
-        nm = self * sunits.to(to_units).magnitude  # note that * creates a copy
+        nm = self * magnitude_in(sunits, to_units)  # note that * creates a copy
         nm.units_of_product(to_units)  # pylint: disable=no-member
         return nm
 
     def __add__(self, other):
         "Adds NomialMaps together"
-        if self.units != other.units:
-            try:
-                other *= float(other.units / self.units)
-            except (TypeError, AttributeError) as exc:  # one of those is None
-                raise DimensionalityError(self.units, other.units) from exc
+        if self.units is not other.units:
+            if self.units is None or other.units is None:
+                if self.units != other.units:
+                    raise DimensionalityError(self.units, other.units)
+            else:
+                conversion = units.of_division(other, self)
+                if conversion != 1:
+                    other *= conversion
         hmap = HashVector.__add__(self, other)
         hmap.units = self.units
         return hmap
@@ -134,7 +137,7 @@ class NomialMap(HashVector):
                     raise ValueError("Monomial substitutions are not supported.")
                 (cval,) = cval.hmap.to(vk.units or DIMLESS_QUANTITY).values()
             elif hasattr(cval, "to"):
-                cval = cval.to(vk.units or DIMLESS_QUANTITY).magnitude
+                cval = magnitude_in(cval, vk.units)
             for o_exp, exp in exps:
                 subinplace(cp, exp, o_exp, vk, cval, squished)
         return cp
@@ -155,14 +158,13 @@ class NomialMap(HashVector):
             fraction of the post-substitution coefficient
         """
         pmap = [{} for _ in self]
-        origexps = list(orig.keys())
-        selfexps = list(self.keys())
+        origidxs = {exp: i for i, exp in enumerate(orig)}
+        selfidxs = {exp: i for i, exp in enumerate(self)}
         for orig_exp, self_exp in self.expmap.items():
             if self_exp not in self:  # can occur in tautological constraints
                 continue  # after substitution
             fraction = self.csmap.get(orig_exp, orig[orig_exp]) / self[self_exp]
-            orig_idx = origexps.index(orig_exp)
-            pmap[selfexps.index(self_exp)][orig_idx] = fraction
+            pmap[selfidxs[self_exp]][origidxs[orig_exp]] = fraction
         return pmap
 
 
@@ -191,3 +193,87 @@ def subinplace(cp, exp, o_exp, vk, cval, squished):
     elif exp in squished:
         exp.hashvalue ^= hash((vk, x))  # remove (key, value) from hashvalue
         del exp[vk]
+
+
+class SubstitutionPlan:
+    """The substitution of a fixed set of keys into a NomialMap, worked out once.
+
+    Records which terms contain which keys and with what exponents, and which
+    terms merge once those keys are removed, so that substituting new values
+    is just a power-and-product that also gives the pmap `.mmap` would.
+    Large plans do that product with NumPy; for the few terms of a typical
+    constraint NumPy's per-call overhead outweighs it, so they loop instead.
+
+    Arguments
+    ---------
+    hmap : NomialMap
+        The map to substitute into.
+    keys : sequence of VarKeys
+        The keys whose values will be given to `.apply`, in that order.
+    vectorize_above : int (default None, meaning the class's)
+        Plans with more (term, key) pairs than this use NumPy.
+    """
+
+    vectorize_above = 64  # number of (term, key) pairs
+
+    def __init__(self, hmap, keys, vectorize_above=None):
+        self.hmap, self.keys = hmap, keys
+        if vectorize_above is not None:
+            self.vectorize_above = vectorize_above
+        idxs = {vk: k for k, vk in enumerate(keys)}
+        self.cs = list(hmap.values())
+        self.xs = [
+            [(idxs[vk], x) for vk, x in exp.items() if vk in idxs] for exp in hmap
+        ]
+        self.exps, self.members, newidxs = [], [], {}
+        for i, (exp, xs) in enumerate(zip(hmap, self.xs)):
+            if xs:
+                exp = HashVector({vk: x for vk, x in exp.items() if vk not in idxs})
+            if exp not in newidxs:
+                newidxs[exp] = len(self.exps)
+                self.exps.append(exp)
+                self.members.append([])
+            self.members[newidxs[exp]].append(i)
+        self.dense_xs = None
+        if len(self.cs) * len(keys) > self.vectorize_above:
+            self.dense_xs = np.zeros((len(self.cs), len(keys)))
+            for i, xs in enumerate(self.xs):
+                for k, x in xs:
+                    self.dense_xs[i, k] = x
+
+    def _csmap(self, values):
+        "Returns each original term's coefficient after substitution."
+        if self.dense_xs is not None:
+            values = np.array(values, dtype=float)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                powvals = values**self.dense_xs
+            powvals[(values == 0) & (self.dense_xs < 0)] = np.nan
+            return (np.array(self.cs) * powvals.prod(axis=1)).tolist()
+        csmap = []
+        for c, xs in zip(self.cs, self.xs):
+            for k, x in xs:
+                value = values[k]
+                c *= float(value) ** x if value != 0 or x >= 0 else np.nan
+            csmap.append(c)
+        return csmap
+
+    def apply(self, values):
+        """Returns the substituted NomialMap and its pmap.
+
+        Arguments
+        ---------
+        values : sequence of numbers
+            Magnitudes to substitute for `keys`, in the plan's units.
+        """
+        csmap = self._csmap(values)
+        hmap, pmap = NomialMap(), []
+        hmap.units = self.hmap.units
+        for exp, members in zip(self.exps, self.members):
+            c = sum(csmap[i] for i in members)
+            if c != 0:  # remove zeros created during substitution
+                hmap[exp] = c
+                pmap.append({i: csmap[i] / c for i in members})
+        if not hmap:  # make sure it's never an empty hmap
+            hmap[EMPTY_HV] = 0.0
+            pmap = [{}]
+        return hmap, pmap
@@ -12,12 +12,13 @@ from ..exceptions import (
     PrimalInfeasible,
 )
 from ..globals import SignomialsEnabled
-from ..small_classes import EMPTY_HV, HashVector, Numbers
+from ..small_classes import EMPTY_HV, HashVector, Numbers, Quantity
 from ..small_scripts import mag
-from ..units import DimensionalityError
+from ..units import DimensionalityError, magnitude_in
 from ..varkey import VarKey
 from .core import Nomial
-from .map import NomialMap
+from .lambdify import Lambdified
+from .map import NomialMap, SubstitutionPlan
 from .substitution import parse_subs
 
 
@@ -40,7 +41,7 @@ class Signomial(Nomial):
     Monomial   (if the input has one term and only positive cs)
     """
 
-    _c = _exp = None  # pylint: disable=invalid-name
+    _c = _exp = _lambdified = None  # pylint: disable=invalid-name
 
     __hash__ = Nomial.__hash__
 
@@ -177,6 +178,30 @@ class Signomial(Nomial):
             self.hmap.sub(substitutions, self.vks), require_positive=require_positive
         )
 
+    def lambdify(self, varkeys=None):
+        """Compiles this into a vectorized numpy evaluator
+
+        Usage
+        -----
+        (x**2 + y).lambdify([x.key, y.key])([np.arange(1, 4), 2])
+        (x**2 + y).lambdify()(sol["variables"])
+
+        Arguments
+        ---------
+        varkeys : list of VarKeys (optional)
+            Order of the evaluator's arguments; by default every variable
+            in this, in order of first appearance.
+
+        Returns
+        -------
+        Lambdified, which returns magnitudes in this Signomial's units
+        """
+        if varkeys is not None:
+            return Lambdified([self.hmap], varkeys)
+        if self._lambdified is None:
+            self._lambdified = Lambdified([self.hmap])
+        return self._lambdified
+
     def __le__(self, other):
         if isinstance(other, (Numbers, Signomial)):
             return SignomialInequality(self, "<=", other)
@@ -377,6 +402,7 @@ class Monomial(Posynomial):
 
 
 MONS = Numbers + (Monomial,)
+REAL_NUMBERS = (int, float, np.number)  # Numbers without Quantity
 
 
 class ScalarSingleEquationConstraint(SingleEquationConstraint):
@@ -422,6 +448,7 @@ class PosynomialInequality(ScalarSingleEquationConstraint):
 
     feastol = 1e-3
     # NOTE: follows .check_result's max default, but 1e-3 seems a bit lax...
+    _subplans = None  # {(posy index, substituted keys): SubstitutionPlan}
 
     def __init__(self, left, oper, right):
         ScalarSingleEquationConstraint.__init__(self, left, oper, right)
@@ -485,16 +512,42 @@ class PosynomialInequality(ScalarSingleEquationConstraint):
         hmap = self._simplify_posy_ineq(hmap)
         return [Posynomial(hmap)] if hmap else []
 
+    def _subplan(self, i, posy, substitutions):
+        """Returns a SubstitutionPlan for posy and the values to apply to it.
+
+        Plans are cached by which keys are substituted, so only the values
+        change between compiles. Returns None, None if any value found is not
+        a number (e.g. a Monomial or a sweep), to be handled by NomialMap.sub.
+        """
+        fixed = {}
+        for vk in posy.vks:
+            if dict.__contains__(substitutions, vk):
+                value = dict.__getitem__(substitutions, vk)
+                if isinstance(value, Quantity):
+                    value = magnitude_in(value, vk.units)
+                if not isinstance(value, REAL_NUMBERS):
+                    return None, None
+                fixed[vk] = value
+        if self._subplans is None:
+            self._subplans = {}
+        cachekey = (i, frozenset(fixed))
+        plan = self._subplans.get(cachekey)
+        if plan is None or plan.hmap is not posy.hmap:
+            plan = self._subplans[cachekey] = SubstitutionPlan(posy.hmap, list(fixed))
+        return plan, fixed
+
     def as_hmapslt1(self, substitutions):
         "Returns the posys <= 1 representation of this constraint."
         out = []
-        for posy in self.unsubbed:
-            fixed, _, _ = parse_subs(posy.vks, substitutions, clean=True)
-            hmap = posy.hmap.sub(fixed, posy.vks, parsedsubs=True)
-            self.pmap = hmap.mmap(
-                posy.hmap
-            )  # pylint: disable=attribute-defined-outside-init
-            del hmap.expmap, hmap.csmap  # needed only for the mmap call above
+        for i, posy in enumerate(self.unsubbed):
+            plan, fixed = self._subplan(i, posy, substitutions)
+            if plan is not None:
+                hmap, self.pmap = plan.apply([fixed[vk] for vk in plan.keys])
+            else:
+                fixed, _, _ = parse_subs(posy.vks, substitutions, clean=True)
+                hmap = posy.hmap.sub(fixed, posy.vks, parsedsubs=True)
+                self.pmap = hmap.mmap(posy.hmap)
+                del hmap.expmap, hmap.csmap  # needed only for the mmap call above
             hmap = self._simplify_posy_ineq(hmap, self.pmap, fixed)
             if hmap is not None:
                 if any(c <= 0 for c in hmap.values()):
@@ -505,29 +558,40 @@ class PosynomialInequality(ScalarSingleEquationConstraint):
                 out.append(hmap)
         return out
 
-    def sens_from_dual(self, la, nu, _):
-        "Returns the variable/constraint sensitivities from lambda/nu"
+    def presub_v(self, la, nu):
+        """Returns the sensitivities of this constraint's variables to lambda/nu
+
+        Unlike sens_from_dual this has no side effects, so it can also be used
+        with duals that are not a solution's (e.g. certificates of infeasibility).
+        """
         (presub,) = self.unsubbed
         if hasattr(self, "pmap"):
             nu_ = np.zeros(len(presub.hmap))
             for i, mmap in enumerate(self.pmap):
                 for idx, percentage in mmap.items():
                     nu_[idx] += percentage * nu[i]
-            del self.pmap  # not needed after dual has been derived
             if hasattr(self, "const_mmap"):
                 scale = (1 - self.const_coeff) / self.const_coeff
                 for idx, percentage in self.const_mmap.items():
                     nu_[idx] += percentage * la * scale
-                del self.const_mmap  # not needed after dual has been derived
             nu = nu_
-        self.v_ss = HashVector()
+        v_ss = HashVector()
+        for nu_i, exp in zip(nu, presub.hmap):
+            for vk, x in exp.items():
+                v_ss[vk] = nu_i * x + v_ss.get(vk, 0)
+        return v_ss
+
+    def sens_from_dual(self, la, nu, _):
+        "Returns the variable/constraint sensitivities from lambda/nu"
+        self.v_ss = self.presub_v(la, nu)
+        if hasattr(self, "pmap"):
+            del self.pmap  # not needed after dual has been derived
+            if hasattr(self, "const_mmap"):
+                del self.const_mmap
         if self.parent:
             self.parent.v_ss = self.v_ss
         if self.generated_by:
             self.generated_by.v_ss = self.v_ss
-        for nu_i, exp in zip(nu, presub.hmap):
-            for vk, x in exp.items():
-                self.v_ss[vk] = nu_i * x + self.v_ss.get(vk, 0)
         return self.v_ss, la
 
 
@@ -585,10 +649,16 @@ class MonomialEquality(PosynomialInequality):
             return {}, 0
         la = self._las[0] - self._las[1]
         self._las = []
-        (exp,) = self.unsubbed[0].hmap
-        self.v_ss = exp * la
+        self.v_ss = self.presub_v(la, None)
         return self.v_ss, la
 
+    def presub_v(self, la, nu):
+        """Returns the sensitivities of this constraint's variables to lambda
+
+        Here lambda is the difference of the duals of its two posynomials."""
+        (exp,) = self.unsubbed[0].hmap
+        return exp * la
+
 
 class SignomialInequality(ScalarSingleEquationConstraint):
     """A constraint of the general form posynomial >= posynomial
@@ -10,6 +10,7 @@ from ..small_scripts import is_sweepvar, veclinkedfn
 from ..varkey import VarKey
 from .array import NomialArray
 from .data import NomialData
+from .dense import DenseMonomials
 from .map import NomialMap
 from .math import Monomial
 
@@ -168,23 +169,34 @@ class ArrayVariable(NomialArray):  # pylint: disable=too-many-locals
             veckeydescr["value"] = values
         veckey = VarKey(**veckeydescr)
 
+        # elements share the veckey's (already parsed) units and lineage
         descr["veckey"] = veckey
+        descr["units"] = veckey.units
+        descr["unitrepr"] = veckey.unitrepr
+        if "lineage" in veckeydescr:
+            descr["lineage"] = veckeydescr["lineage"]
+        namedvars = None
+        if NamedVariables.lineage:
+            namedvars = NamedVariables.namedvars[NamedVariables.lineage]
         vl = np.empty(shape, dtype="object")
-        it = np.nditer(vl, flags=["multi_index", "refs_ok"])
-        while not it.finished:
-            i = it.multi_index
-            it.iternext()
-            descr["idx"] = i
+        keys = np.empty(shape, dtype="object")
+        for i in np.ndindex(shape):
+            elementdescr = descr.copy()
+            elementdescr["idx"] = i
             if values is not None:
                 if hasattr(values, "__call__"):  # a vector function
-                    descr["value"] = veclinkedfn(values, i)
+                    elementdescr["value"] = veclinkedfn(values, i)
                 else:
-                    descr["value"] = values[i]
-            vl[i] = Variable(**descr)
+                    elementdescr["value"] = values[i]
+            keys[i] = VarKey.element(elementdescr)
+            vl[i] = Variable(keys[i])
+            if namedvars is not None:
+                namedvars.append(vl[i])
 
         obj = np.asarray(vl).view(NomialArray)
         obj.key = veckey
         obj.units = obj.key.units
+        obj.dense = DenseMonomials.from_keys(keys, veckey.units)
         return obj
 
 
@@ -4,7 +4,6 @@ from functools import reduce
 from operator import xor
 
 import numpy as np
-from scipy.sparse import csr_matrix
 
 from .units import Quantity
 
@@ -73,6 +72,9 @@ class CootMatrix:
 
     def tocsr(self):
         "Converts to a Scipy sparse csr_matrix"
+        # imported here because scipy.sparse is slow to import
+        from scipy.sparse import csr_matrix  # pylint: disable=import-outside-toplevel
+
         return csr_matrix((self.data, (self.row, self.col)))
 
     def dot(self, arg):
@@ -103,6 +105,10 @@ class SolverLog:
     def flush(self):
         "Dummy function for I/O api compatibility"
 
+    def __getstate__(self):
+        "Leaves out output, which (as e.g. sys.stdout) can't be pickled"
+        return {**self.__dict__, "output": None}
+
 
 class DictOfLists(dict):
     "A hierarchy of dicionaries, with lists at the bottom."
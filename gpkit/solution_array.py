@@ -14,8 +14,8 @@ from operator import sub
 
 import numpy as np
 
-from .breakdowns import Breakdowns
-from .nomials import NomialArray
+from .keydict import KeyDict, KeySet, SlotKeyDict
+from .nomials import NomialArray, Signomial
 from .repr_conventions import UNICODE_EXPONENTS, lineagestr, unitstr
 from .small_classes import DictOfLists, SolverLog, Strings
 from .small_scripts import mag, try_str_without
@@ -53,6 +53,7 @@ class SolSavingEnvironment:
                 "v_ss",
                 "unsubbed",
                 "varkeys",
+                "_subplans",
             ]:
                 store = {}
                 for constraint in self.solarray["sensitivities"]["constraints"]:
@@ -332,7 +333,7 @@ def bdtable_gen(key):
 
     def bdtable(self, _showvars, **_):
         "Cost breakdown plot"
-        bds = Breakdowns(self)
+        bds = self.breakdowns
         original_stdout = sys.stdout
         try:
             sys.stdout = SolverLog(original_stdout, verbosity=0)
@@ -419,7 +420,8 @@ class SolutionArray(DictOfLists):
     >>> assert all(np.array(senss) == 1)
     """
 
-    modelstr = ""
+    modelstrings = _modelfingerprint = _breakdowns = kkt = None
+    _modelstr = ""
     _name_collision_varkeys = None
     _lineageset = False
     table_titles = {
@@ -430,8 +432,59 @@ class SolutionArray(DictOfLists):
         "variables": "Variables",
     }
 
+    @property
+    def modelstr(self):
+        "String of the solved model, rendered from it when first needed"
+        if not self._modelstr and self.modelstrings is not None:
+            self._modelstr = self.modelstrings.modelstr
+        return self._modelstr
+
+    @modelstr.setter
+    def modelstr(self, modelstr):
+        self._modelstr = modelstr
+
+    @property
+    def modelfingerprint(self):
+        "Fingerprint of the solved model's constraints (None if unknown)"
+        if self._modelfingerprint is None and self.modelstrings is not None:
+            self._modelfingerprint = self.modelstrings.fingerprint
+        return self._modelfingerprint
+
+    @property
+    def breakdowns(self):
+        "Breakdowns (or SweepBreakdowns) of this solution, found when first needed"
+        if self._breakdowns is None:
+            from .breakdowns import (  # pylint: disable=import-outside-toplevel
+                Breakdowns,
+                SweepBreakdowns,
+            )
+
+            if len(self) > 1:
+                self._breakdowns = SweepBreakdowns(self)
+            else:
+                self._breakdowns = Breakdowns(self)
+        return self._breakdowns
+
+    def __getstate__(self):
+        "Pickles the model's string and fingerprint instead of the model"
+        state = self.__dict__.copy()
+        state.pop("_breakdowns", None)
+        state.pop("kkt", None)
+        if state.pop("modelstrings", None) is not None:
+            state["_modelstr"] = self.modelstr
+            state["_modelfingerprint"] = self.modelfingerprint
+        return state
+
+    def __setstate__(self, state):
+        if "modelstr" in state:  # pickled before modelstr was lazy
+            state["_modelstr"] = state.pop("modelstr")
+        self.__dict__.update(state)
+
     def set_necessarylineage(self, clear=False):  # pylint: disable=too-many-branches
         "Returns the set of contained varkeys whose names are not unique"
+        nameindex = self["variables"].nameindex
+        if self._name_collision_varkeys is None and nameindex is not None:
+            self._name_collision_varkeys = nameindex.derived.get("name collisions")
         if self._name_collision_varkeys is None:
             self._name_collision_varkeys = {}
             self["variables"].update_keymap()
@@ -464,6 +517,8 @@ class SolutionArray(DictOfLists):
                 for (_, idx), vks in min_namespaced.items():
                     (vk,) = vks
                     self._name_collision_varkeys[vk] = idx
+            if nameindex is not None:
+                nameindex.derived["name collisions"] = self._name_collision_varkeys
         if clear:
             self._lineageset = False
             for vk in self._name_collision_varkeys:
@@ -482,8 +537,87 @@ class SolutionArray(DictOfLists):
             return 0
 
     def __call__(self, posy):
-        posy_subbed = self.subinto(posy)
-        return getattr(posy_subbed, "c", posy_subbed)
+        if posy in self["variables"]:
+            return self["variables"](posy)
+        try:
+            return self._evaluate(posy)
+        except KeyError:  # posy has variables that aren't in the solution
+            posy_subbed = self.subinto(posy)
+            return getattr(posy_subbed, "c", posy_subbed)
+
+    def _evaluate(self, posy):
+        "Evaluates posy at every solution point in one vectorized call."
+        if not hasattr(posy, "lambdify"):
+            raise ValueError(f"no variable '{posy}' found in the solution")
+        evaluate = posy.lambdify()
+        values = evaluate(self["variables"])
+        return values * evaluate.units if evaluate.units else values
+
+    def predict(self, subs):
+        """Estimates the solution with substitutions `subs`, without solving
+
+        The optimal free variables are changed to first order (in log space)
+        by implicitly differentiating the solved GP's optimality conditions;
+        see KKTSystem. Only GP solutions (not those of sweeps, SPs, or
+        unpickled solutions) keep those conditions.
+
+        Returns
+        -------
+        SolutionArray, with "cost", "freevariables", "constants", "variables",
+        and "trust": the fraction (from 0 to 1) of the change in constants
+        for which the solution's tight constraints are predicted to stay
+        tight and the rest loose. Below 1, the prediction is less reliable.
+        """
+        if self.kkt is None:
+            raise ValueError(
+                "predictions require the optimality conditions of a GP's"
+                " solution, which were not kept for this one."
+            )
+        constants = KeyDict(self["constants"])
+        constants.varkeys = KeySet(self["constants"])  # to parse string keys
+        constants.update(subs)
+        dlogx, dlogcost, trust = self.kkt.predict(constants)
+        freevariables = SlotKeyDict(
+            zip(self.kkt.freevariables, np.exp(self.kkt.primal + dlogx))
+        )
+        variables = SlotKeyDict(freevariables)
+        variables.update(constants)
+        return SolutionArray(
+            {
+                "cost": self["cost"] * np.exp(dlogcost),
+                "freevariables": freevariables,
+                "constants": constants,
+                "variables": variables,
+                "trust": trust,
+            }
+        )
+
+    def jacobian(self, var):
+        """Returns the log derivatives of a free variable w.r.t. constants
+
+        These are found (for all free variables at once, when first needed)
+        by implicitly differentiating the solved GP's optimality conditions;
+        see KKTSystem.jacobian. Only GP solutions (not those of sweeps, SPs,
+        or unpickled solutions) keep those conditions.
+
+        Returns
+        -------
+        KeyDict of d log(var) / d log(constant) for each constant
+        """
+        if self.kkt is None:
+            raise ValueError(
+                "Jacobians require the optimality conditions of a GP's"
+                " solution, which were not kept for this one."
+            )
+        freevariables = self["freevariables"]
+        if not hasattr(var, "key"):
+            (var,) = freevariables.keymap[freevariables.parse_and_index(var)[0]]
+        try:
+            row = self.kkt.freevariables.index(var.key)
+        except ValueError as err:
+            raise KeyError(f"{var} is not a scalar free variable") from err
+        jac, constants = self.kkt.jacobian()
+        return KeyDict(zip(constants, jac[row]))
 
     def almost_equal(self, other, reltol=1e-3):
         "Checks for almost-equality between two solutions"
@@ -833,9 +967,16 @@ class SolutionArray(DictOfLists):
             raise ValueError(f"no variable '{posy}' found in the solution")
 
         if len(self) > 1:
-            return NomialArray(
-                [self.atindex(i).subinto(posy) for i in range(len(self))]
-            )
+            try:
+                values = self._evaluate(posy)
+            except KeyError:  # leave the unsolved variables in place
+                return NomialArray(
+                    [self.atindex(i).subinto(posy) for i in range(len(self))]
+                )
+            subbed = np.empty(np.shape(values), dtype="object")
+            for idx in np.ndindex(subbed.shape):
+                subbed[idx] = Signomial(values[idx])
+            return NomialArray(subbed)
 
         return posy.sub(self["variables"], require_positive=False)
 
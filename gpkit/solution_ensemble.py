@@ -1,12 +1,26 @@
 "implements SolutionEnsemble class"
 
 import pickle
+from collections.abc import Mapping
+from weakref import WeakValueDictionary
 
 import numpy as np
 
-from gpkit.keydict import KeyDict
+from gpkit.constraints.set import constraint_fingerprint
+from gpkit.solution_array import SolutionArray
 from gpkit.varkey import VarKey
 
+# sections of a solution stored as columns, i.e. as {key: value} dicts
+COLUMNS = (
+    ("constants",),
+    ("variables",),
+    ("sensitivities", "constraints"),
+    ("sensitivities", "cost"),
+    ("sensitivities", "variables"),
+    ("sensitivities", "variablerisk"),
+    ("sensitivities", "models"),
+)
+
 
 def varsort(diff):
     "Sort function for variables"
@@ -19,6 +33,108 @@ def vardescr(var):
     return f"{var.label} ({var})"
 
 
+def _same_constraints(sol, other):
+    "Whether two solutions are of models with identical constraints"
+    fingerprints = sol.modelfingerprint, other.modelfingerprint
+    if None not in fingerprints:
+        return fingerprints[0] == fingerprints[1]
+    sol_cstrs, other_cstrs = (
+        s.modelstr[s.modelstr.find("Constraints") :] for s in [sol, other]
+    )
+    return sol_cstrs == other_cstrs
+
+
+def _section(solution, path):
+    "Returns the section of a solution at path, or None if it has none"
+    for name in path:
+        solution = solution.get(name)
+        if solution is None:
+            return None
+    return solution
+
+
+def _element(veckey, idx):
+    "Returns the VarKey of veckey[idx], without rendering any strings"
+    descr = {k: v for k, v in veckey.descr.items() if k not in ("value", "vecfn")}
+    descr.update(veckey=veckey, idx=tuple(int(i) for i in idx))
+    return VarKey.element(descr)
+
+
+def _keys_where(var, mask):
+    "Yields var's (element) keys where mask is True"
+    if not var.shape:
+        if mask:
+            yield var, ()
+        return
+    for idx in zip(*np.nonzero(mask)):
+        yield _element(var, idx), idx
+
+
+def _fixed(value, shape):
+    "Mask of where a constant value (possibly None or swept) fixes its key"
+    if value is None:
+        return np.zeros(shape, dtype=bool)
+    value = np.asarray(value, dtype=float)
+    sweepaxes = tuple(range(value.ndim - len(shape)))
+    return np.broadcast_to(~np.isnan(value).all(axis=sweepaxes), shape)
+
+
+class CompressionPolicy:
+    """How a SolutionEnsemble stores the values of its (non-baseline) members
+
+    Arguments
+    ---------
+    rtol : float (default 0)
+        Values within this relative tolerance of the baseline's aren't stored
+    sens_dtype : numpy dtype (default np.float16)
+        Precision at which arrays of sensitivities are stored (None: as is)
+    sens_floor : float (default 1e-2)
+        Sensitivities whose magnitudes are all below this are stored as zero
+    """
+
+    def __init__(self, rtol=0, sens_dtype=np.float16, sens_floor=1e-2):
+        self.rtol = rtol
+        self.sens_dtype = sens_dtype
+        self.sens_floor = sens_floor
+
+    def compress(self, path, value):
+        "Returns the value to store for a key in the section at path"
+        if path[0] != "sensitivities":
+            return np.array(value) if hasattr(value, "shape") else value
+        if self.sens_floor and np.abs(value).max() < self.sens_floor:
+            if hasattr(value, "shape"):
+                return np.zeros(value.shape, dtype=np.bool_)
+            return 0
+        if hasattr(value, "shape"):
+            return np.array(value, dtype=self.sens_dtype)
+        return value
+
+    def same(self, value, base):
+        "Whether a value is close enough to the baseline's to not be stored"
+        if np.shape(value) != np.shape(base):
+            return False
+        try:
+            return np.allclose(value, base, rtol=self.rtol, atol=0, equal_nan=True)
+        except TypeError:  # not numbers
+            return bool(np.all(value == base))
+
+
+class EnsembleSolutions(Mapping):
+    "A SolutionEnsemble's solutions, rebuilt from its columns when accessed"
+
+    def __init__(self, ensemble):
+        self.ensemble = ensemble
+
+    def __getitem__(self, difference):
+        return self.ensemble.solution(difference)
+
+    def __iter__(self):
+        return iter(self.ensemble.labels)
+
+    def __len__(self):
+        return len(self.ensemble.labels)
+
+
 class OpenedSolutionEnsemble:
     "Helper class for use with `with` to handle opening/closing an ensemble"
 
@@ -39,14 +155,26 @@ class OpenedSolutionEnsemble:
 class SolutionEnsemble:
     """An ensemble of solutions.
 
+    The baseline solution is kept whole; every other solution is stored as
+    the values in which it differs from the baseline, as judged and
+    compressed by `.compression`, in columns shared by all solutions.
+
     Attributes:
       "solutions" : all solutions, keyed by modified variables
+                    (each but the baseline is rebuilt when accessed, and
+                    reused for as long as anything else refers to it)
       "labels" : solution labels, keyed by modified variables
+      "columns" : {section: {key: {modified variables: stored value}}}
+      "compression" : the ensemble's CompressionPolicy
+      "viewof" : for the result of .filter(), the ensemble it is a view of
 
     SolutionEnsemble[varstr]  : will return the relevant varkey
 
     """
 
+    _basekeys = _basevalues = _baseconstraints = _index = _rebuilt = None
+    viewof = None
+
     def __str__(self):
         nmods = len(self.solutions) - 1
         out = "Solution ensemble with a baseline and" f"{nmods} modified solutions:"
@@ -55,10 +183,44 @@ class SolutionEnsemble:
                 out += "\n    " + self.labels[differences]
         return out
 
-    def __init__(self):
+    def __init__(self, compression=None):
         self.baseline = None
-        self.solutions = {}
         self.labels = {}
+        self.columns = {path: {} for path in COLUMNS}
+        self.compression = compression or CompressionPolicy()
+        # {modified variables: {"rest": the solution's other items,
+        #                       "removed": {section: baseline keys it lacks},
+        #                       "fingerprint"/"modelstr": of its model}}
+        self._members = {}
+
+    @property
+    def solutions(self):
+        "All solutions, keyed by modified variables"
+        return EnsembleSolutions(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for cache in (
+            "_basekeys",
+            "_basevalues",
+            "_baseconstraints",
+            "_index",
+            "_rebuilt",
+        ):
+            state.pop(cache, None)
+        return state
+
+    def __setstate__(self, state):
+        if "columns" in state:
+            self.__dict__.update(state)
+            return
+        # pickled before solutions were stored as columns
+        self.__init__()
+        self.baseline = state["baseline"]
+        for difference, label in state["labels"].items():
+            self.labels[difference] = label
+            if difference:
+                self._store(difference, state["solutions"][difference])
 
     def save(self, filename="solensemble.pkl", **pickleargs):
         "Pickle a file and then compress it into a file with extension."
@@ -86,30 +248,36 @@ class SolutionEnsemble:
         return basevar
 
     def filter(self, *requirements):
-        "Filters by requirements, returning another solution ensemble"
-        candidates = set(self.solutions)
+        """Filters by requirements, returning a view of this ensemble
+
+        Each requirement is one or more of a variable (or its name), a kind of
+        modification ("set", "freed", "sweep", "cost") or a value, all of
+        which must describe the same modification of a solution for that
+        solution to pass; a vector variable matches each of its elements.
+        """
+        tokens, holders = self._indexed()
+        candidates = set(self.labels)
         for requirement in requirements:
-            if isinstance(requirement, str) or not hasattr(requirement, "__len__"):
+            if not isinstance(requirement, (list, tuple, set, frozenset)):
                 requirement = [requirement]
-            subreqs = []
+            items = None
             for subreq in requirement:
                 try:
-                    subreqs.append(self[subreq])
+                    subreq = self[subreq]
                 except (AttributeError, KeyError):
-                    subreqs.append(subreq)
-            for candidate in set(candidates):
-                found_requirement = False
-                for difference in candidate:
-                    if all(subreq in difference for subreq in subreqs):
-                        found_requirement = True
-                        break
-                if not found_requirement:
-                    candidates.remove(candidate)
-        se = SolutionEnsemble()
-        se.append(self.baseline)
-        for candidate in candidates:
-            se.append(self.solutions[candidate], verbosity=0)
-        return se
+                    pass
+                try:
+                    found = tokens.get(subreq, set())
+                except TypeError:  # unhashable, so look through every item
+                    found = {item for item in holders if subreq in item}
+                items = found if items is None else items & found
+            candidates &= set().union(*(holders[item] for item in items or ()))
+        candidates.add(())
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view.labels = {d: lbl for d, lbl in self.labels.items() if d in candidates}
+        view.viewof = self.viewof or self
+        return view
 
     def get_solutions(self, *requirements):
         "Filters by requirements, returning a list of solutions."
@@ -117,10 +285,57 @@ class SolutionEnsemble:
             sol for diff, sol in self.filter(*requirements).solutions.items() if diff
         ]
 
-    def append(
-        self, solution, verbosity=1
-    ):  # pylint: disable=too-many-locals, too-many-branches, too-many-statements
+    def solution(self, difference):
+        "Returns the solution with the given modified variables"
+        if not difference:
+            return self.baseline
+        rebuilt = self._rebuilt_members()
+        sol = rebuilt.get(difference)
+        if sol is None:
+            sol = rebuilt[difference] = self._rebuild(difference)
+        return sol
+
+    def _rebuilt_members(self):
+        "Rebuilt solutions still in use, shared by this ensemble and its views"
+        ensemble = self.viewof or self
+        if ensemble._rebuilt is None:  # pylint: disable=protected-access
+            ensemble._rebuilt = WeakValueDictionary()
+        return ensemble._rebuilt  # pylint: disable=protected-access
+
+    def _rebuild(self, difference):
+        "Rebuilds the solution with the given modified variables from columns"
+        member = self._members[difference]
+        sol = SolutionArray(member["rest"])
+        sol["sensitivities"] = dict(sol["sensitivities"])
+        sol._modelfingerprint = member["fingerprint"]
+        sol.modelstr = member["modelstr"]
+        for path in COLUMNS:
+            basesection = _section(self.baseline, path)
+            if basesection is None:
+                continue
+            values = dict(self._base_values(path))
+            for key, column in self.columns[path].items():
+                if difference in column:
+                    values[key] = column[difference]
+            for key in member["removed"].get(path, ()):
+                del values[key]
+            section = type(basesection)()
+            section.update(values)
+            if path == ("variables",):
+                section.share_nameindex(basesection.nameindex)
+            parent = sol
+            for name in path[:-1]:
+                parent = parent[name]
+            parent[path[-1]] = section
+        return sol
+
+    def append(self, solution, verbosity=1):
         "Appends solution to the Ensemble"
+        if self.viewof is not None:
+            raise ValueError(
+                "this is a filtered view of another ensemble;"
+                " append to that (its .viewof) instead."
+            )
         solution.set_necessarylineage()
         for var in solution["variables"]:
             var.descr.pop("vecfn", None)
@@ -128,15 +343,11 @@ class SolutionEnsemble:
         if self.baseline is None:
             if "sweepvariables" in solution:
                 raise ValueError("baseline solution cannot be a sweep")
-            self.baseline = self.solutions[()] = solution
+            self.baseline = solution
             self.labels[()] = "Baseline Solution"
             return
 
-        solconstraintstr, baseconstraintstr = (
-            sol.modelstr[sol.modelstr.find("Constraints") :]
-            for sol in [solution, self.baseline]
-        )
-        if solconstraintstr != baseconstraintstr:
+        if not _same_constraints(solution, self.baseline):
             raise ValueError(
                 "the new model's constraints are not identical"
                 " to the base model's constraints."
@@ -146,38 +357,136 @@ class SolutionEnsemble:
         solution.pop("warnings", None)
         solution.pop("freevariables", None)
         solution["sensitivities"].pop("constants", None)
-        for subd, value in solution.items():
-            if isinstance(value, KeyDict):
-                solution[subd] = KeyDict()
-                for oldkey, val in value.items():
-                    solution[subd][self[oldkey]] = val
-        for subd, value in solution["sensitivities"].items():
-            if subd == "constraints":
-                solution["sensitivities"][subd] = {}
-                cstrs = {str(c): c for c in self.baseline["sensitivities"][subd]}
-                for oldkey, val in value.items():
-                    if np.abs(val).max() < 1e-2:
-                        if hasattr(val, "shape"):
-                            val = np.zeros(val.shape, dtype=np.bool_)
-                        else:
-                            val = 0
-                    elif hasattr(val, "shape"):
-                        val = np.array(val, dtype=np.float16)
-                    solution["sensitivities"][subd][cstrs[str(oldkey)]] = val
-            elif isinstance(value, KeyDict):
-                solution["sensitivities"][subd] = KeyDict()
-                for oldkey, val in value.items():
-                    if np.abs(val).max() < 1e-2:
-                        if hasattr(val, "shape"):
-                            val = np.zeros(val.shape, dtype=np.bool_)
-                        else:
-                            val = 0
-                    elif hasattr(val, "shape"):
-                        val = np.array(val, dtype=np.float16)
-                    solution["sensitivities"][subd][self[oldkey]] = val
-
-        differences = []
-        labels = []
+        rekeyed = self._rekeyed(solution)
+        difference, label = self._difference(solution, rekeyed)
+        if verbosity > 0:
+            if difference in self.labels:
+                if not difference:
+                    print("The baseline in this ensemble cannot be replaced.")
+                else:
+                    print(label + " will be replaced in the ensemble.")
+            else:
+                print(label + " added to the ensemble.")
+        if not difference:
+            return
+        self.labels[difference] = label
+        self._store(difference, solution, rekeyed)
+        if self._index is not None:
+            self._add_to_index(difference)
+
+    def _indexed(self):
+        "Returns ({token: modifications with it}, {modification: solutions})"
+        if self._index is None:
+            self._index = ({}, {})
+            for difference in self.labels:
+                self._add_to_index(difference)
+        return self._index
+
+    def _add_to_index(self, difference):
+        "Indexes each of a solution's modifications by what describes it"
+        tokens, holders = self._index
+        for item in difference:
+            if item not in holders:
+                holders[item] = set()
+                var, *rest = item
+                kind = "set" if rest[0] not in ("freed", "sweep") else rest[0]
+                if var == "cost":
+                    kind = "cost"
+                described = [var, kind, *rest]
+                if getattr(var, "veckey", None) is not None:
+                    described.append(var.veckey)
+                for token in described:
+                    tokens.setdefault(token, set()).add(item)
+            holders[item].add(difference)
+
+    def _store(self, difference, solution, rekeyed=None):
+        "Stores a solution as its differences from the baseline"
+        if rekeyed is None:
+            rekeyed = self._rekeyed(solution)
+        self._rebuilt_members().pop(difference, None)
+        for column in self.columns.values():  # it may be replacing another
+            for values in column.values():
+                values.pop(difference, None)
+        removed = {}
+        for path, values in rekeyed.items():
+            base = self._base_values(path)
+            column = self.columns[path]
+            for key, value in values.items():
+                value = self.compression.compress(path, value)
+                if key in base and self.compression.same(value, base[key]):
+                    continue
+                column.setdefault(key, {})[difference] = value
+            missing = [k for k in base if k not in values]
+            if missing:
+                removed[path] = missing
+        rest = {k: v for k, v in solution.items() if (k,) not in COLUMNS}
+        rest["sensitivities"] = {
+            k: v
+            for k, v in solution.get("sensitivities", {}).items()
+            if ("sensitivities", k) not in COLUMNS
+        }
+        # the fingerprint suffices to compare constraints, if there is one
+        fingerprint = solution.modelfingerprint
+        self._members[difference] = {
+            "rest": rest,
+            "removed": removed,
+            "fingerprint": fingerprint,
+            "modelstr": "" if fingerprint else solution.modelstr,
+        }
+
+    def _base_values(self, path):
+        "The baseline's (compressed) values in the section at path"
+        if self._basevalues is None:
+            self._basevalues = {}
+        if path not in self._basevalues:
+            section = _section(self.baseline, path) or {}
+            self._basevalues[path] = {
+                k: self.compression.compress(path, v) for k, v in dict.items(section)
+            }
+        return self._basevalues[path]
+
+    def _basekey(self, key):
+        "Returns the baseline's VarKey equal to (or with the name of) key"
+        if self._basekeys is None:
+            self._basekeys = {}
+            for path in COLUMNS:
+                if path != ("sensitivities", "constraints"):
+                    section = _section(self.baseline, path) or {}
+                    self._basekeys.update((k, k) for k in section)
+        basekey = self._basekeys.get(key)
+        if basekey is None and hasattr(key, "descr"):
+            try:
+                basekey = self[key]
+            except KeyError:
+                basekey = key
+        return key if basekey is None else basekey
+
+    def _rekeyed(self, solution):
+        "Returns the solution's columns, keyed by the baseline's keys"
+        if self._baseconstraints is None:
+            self._baseconstraints = {}
+            basesenss = self.baseline["sensitivities"]["constraints"]
+            for constraint in basesenss:
+                fingerprint = constraint_fingerprint(constraint)
+                self._baseconstraints.setdefault(fingerprint, []).append(constraint)
+        rekeyed = {}
+        for path in COLUMNS:
+            section = _section(solution, path)
+            if section is None:
+                continue
+            if path == ("sensitivities", "constraints"):
+                unused = {fp: iter(cs) for fp, cs in self._baseconstraints.items()}
+                rekeyed[path] = {
+                    next(unused.get(constraint_fingerprint(c), iter(())), c): v
+                    for c, v in section.items()
+                }
+            else:
+                rekeyed[path] = {self._basekey(k): v for k, v in dict.items(section)}
+        return rekeyed
+
+    def _difference(self, solution, rekeyed):  # pylint: disable=too-many-locals
+        "Returns the modified variables of a solution, and their label"
+        differences, labels = [], []
         solcostfun = solution["cost function"]
         if len(solution) > 1:
             solcostfun = solcostfun[0]
@@ -187,85 +496,49 @@ class SolutionEnsemble:
             differences.append(("cost", solcoststr))
             labels.append(f"Cost function set to {solcoststr}")
 
-        freedvars = set()
-        setvars = set()
-
-        def check_var(
-            var,
-        ):
-            fixed_in_baseline = var in self.baseline["constants"]
-            fixed_in_solution = var in solution["constants"]
-            bval = self.baseline["variables"][var]
-            if fixed_in_solution:
-                sval = solution["constants"][var]
-            else:
-                sval = solution["variables"][var]
-            if fixed_in_solution and getattr(sval, "shape", None):
-                pass  # calculated constant that depends on a sweep variable
-            elif fixed_in_solution and sval != bval:
-                setvars.add((var, sval))  # whether free or fixed before
-            elif not fixed_in_solution and fixed_in_baseline:
-                if var not in solution["sweepvariables"]:
-                    freedvars.add((var,))
-
-        for var in self.baseline["variables"]:
-            if var not in solution["variables"]:
+        freedvars, setvars = set(), set()
+        solvars, solconsts = rekeyed[("variables",)], rekeyed[("constants",)]
+        sweeps = {
+            self._basekey(k): v for k, v in solution.get("sweepvariables", {}).items()
+        }
+        baseconsts = self._base_values(("constants",))
+        for var, bval in self._base_values(("variables",)).items():
+            if var not in solvars:
                 print("Variable", var, "removed (relative to baseline)")
                 continue
-            if not var.shape:
-                check_var(var)
-            else:
-                it = np.nditer(np.empty(var.shape), flags=["multi_index"])
-                while not it.finished:
-                    check_var(VarKey(idx=it.multi_index, **var.descr))
-                    it.iternext()
-
-        for (freedvar,) in sorted(freedvars, key=varsort):
+            shape = var.shape or ()
+            sval = solconsts.get(var)
+            fixed = _fixed(sval, shape)
+            if sval is not None and np.ndim(sval) == len(shape):
+                # (otherwise it's calculated from a sweep variable)
+                with np.errstate(invalid="ignore"):
+                    changed = fixed & (np.asarray(sval) != bval)
+                for key, idx in _keys_where(var, changed):
+                    setvars.add((key, np.asarray(sval)[idx].item()))
+            freed = ~fixed & _fixed(baseconsts.get(var), shape)
+            freed &= ~_fixed(sweeps.get(var), shape)
+            freedvars.update(_keys_where(var, freed))
+
+        for freedvar, _ in sorted(freedvars, key=varsort):
             differences.append((freedvar, "freed"))
             labels.append(vardescr(freedvar) + " freed")
         for setvar, setval in sorted(setvars, key=varsort):
             differences.append((setvar, setval))
             ustr = setvar.unitstr(into=" %s")
             labels.append(vardescr(setvar) + f" set to {setval:.5g}" + ustr)
-        if "sweepvariables" in solution:
-            for var, vals in sorted(solution["sweepvariables"].items(), key=varsort):
-                var = self[var]
-                if var.shape:
-                    it = np.nditer(np.empty(var.shape), flags=["multi_index"])
-                    while not it.finished:
-                        valsi = vals[(...,) + it.multi_index]
-                        if not np.isnan(valsi).any():
-                            idxvar = VarKey(idx=it.multi_index, **var.descr)
-                            differences.append(
-                                (idxvar, "sweep", (min(valsi), max(valsi)))
-                            )
-                            labels.append(
-                                vardescr(idxvar)
-                                + " swept from"
-                                + f" {min(valsi):.5g} to"
-                                + f" {max(valsi):.5g}"
-                                + idxvar.unitstr(into=" %s")
-                            )
-                        it.iternext()
-                else:
-                    differences.append((var, "sweep", (min(vals), max(vals))))
-                    labels.append(
-                        vardescr(var)
-                        + " swept from"
-                        + f" {min(vals):.5g} to"
-                        + f" {max(vals):.5g}"
-                        + var.unitstr(into=" %s")
-                    )
-        difference = tuple(differences)
-        label = ", ".join(labels)
-        if verbosity > 0:
-            if difference in self.solutions:
-                if not difference:
-                    print("The baseline in this ensemble cannot be replaced.")
-                else:
-                    print(label + " will be replaced in the ensemble.")
-            else:
-                print(label + " added to the ensemble.")
-
-        self.solutions[difference] = solution
-        self.labels[difference] = label
+        for var, vals in sorted(sweeps.items(), key=varsort):
+            vals = np.asarray(vals, dtype=float)
+            sweepaxes = tuple(range(vals.ndim - len(var.shape or ())))
+            with np.errstate(invalid="ignore"):
+                mins, maxs = np.nanmin(vals, sweepaxes), np.nanmax(vals, sweepaxes)
+            for key, idx in _keys_where(var, _fixed(vals, var.shape or ())):
+                lo, hi = mins[idx].item(), maxs[idx].item()
+                differences.append((key, "sweep", (lo, hi)))
+                labels.append(
+                    vardescr(key)
+                    + " swept from"
+                    + f" {lo:.5g} to"
+                    + f" {hi:.5g}"
+                    + key.unitstr(into=" %s")
+                )
+        return tuple(differences), ", ".join(labels)
@@ -4,7 +4,7 @@ import numpy as np
 from cvxopt import matrix, spmatrix
 from cvxopt.solvers import gp
 
-from gpkit.exceptions import DualInfeasible, UnknownInfeasible
+from gpkit.exceptions import DualInfeasible, PrimalInfeasible, UnknownInfeasible
 
 
 # pylint: disable=too-many-locals,too-many-statements,too-many-branches,invalid-name
@@ -99,8 +99,6 @@ def optimize(*, c, A, k, meq_idxs, use_leqs=True, **kwargs):
         solution = gp(k_lse, F, g, **kwargs)
     except ValueError as e:
         raise DualInfeasible() from e
-    if solution["status"] != "optimal":
-        raise UnknownInfeasible("solution status " + repr(solution["status"]))
     la = np.zeros(len(k))
     la[lin_posys] = list(solution["zl"])
     la[lse_posys] = [1.0] + list(solution["znl"])
@@ -109,9 +107,55 @@ def optimize(*, c, A, k, meq_idxs, use_leqs=True, **kwargs):
             la[leq_posy] = yi
         else:  # flip it around to the other "inequality"
             la[leq_posy + 1] = -yi
+    if solution["status"] != "optimal":
+        certificate = infeasibility_certificate(
+            log_c, A, k, la, np.ravel(solution["x"])
+        )
+        if certificate is None:
+            raise UnknownInfeasible("solution status " + repr(solution["status"]))
+        err = PrimalInfeasible(
+            "the dual variables diverged along a certificate of infeasibility"
+        )
+        err.la, err.nu = certificate
+        raise err
     return {
         "status": solution["status"],
         "objective": np.exp(solution["primal objective"]),
         "primal": np.ravel(solution["x"]),
         "la": la,
     }
+
+
+def infeasibility_certificate(log_c, A, k, la, x, tol=1e-6):
+    """Returns the (la, nu) of a certificate of primal infeasibility, or None
+
+    CVXOPT's gp does not detect infeasibility: on a primal infeasible GP its
+    constraints' dual variables instead grow without bound along the ray of
+    such a certificate. This normalizes those duals, splits each among its
+    posynomial's monomials as at the primal point x, and returns them if they
+    do prove infeasibility: that is, if the monomial duals' exponents sum to
+    zero and their dual objective is positive.
+    """
+    la = np.array(la, dtype=float)
+    la[0] = 0  # the cost takes no part in a certificate
+    la[~(la > 0)] = 0
+    if not np.isfinite(la).all() or not la.sum():
+        return None
+    la /= la.sum()
+    z = log_c + A @ x
+    nu = np.zeros(len(log_c))
+    start = 0
+    for la_i, n_monomials in zip(la, k):
+        mons = slice(start, start + n_monomials)
+        start += n_monomials
+        if la_i:
+            weights = np.exp(z[mons] - z[mons].max())
+            nu[mons] = la_i * weights / weights.sum()
+    if np.abs(A.T @ nu).max(initial=0) > tol:
+        return None
+    nonzero = nu > 0
+    la_nonzero = np.repeat(la, k)[nonzero]
+    nu_nonzero = nu[nonzero]
+    if nu_nonzero @ (log_c[nonzero] - np.log(nu_nonzero / la_nonzero)) <= tol:
+        return None
+    return la, nu
@@ -271,9 +271,34 @@ def optimize(*, c, A, k, p_idxs, **kwargs):
     else:
         sol = mosek.soltype.itr
         optimal = mosek.solsta.optimal
+
+    def posynomial_duals():
+        "Recovers the (cost-less) la of the interior-point solution or certificate"
+        # dual variables for log-sum-exp epigraph constraints
+        # (skip epigraph of the objective function).
+        z_duals = [0.0] * (p_lse - 1)
+        task.getsuxslice(mosek.soltype.itr, m + 3 * n_lse + 1, msk_nvars, z_duals)
+        z_duals = np.array(z_duals)
+        z_duals[z_duals < 0] = 0
+        # dual variables for the remaining user-provided constraints
+        if log_c_lin is None:
+            return z_duals
+        aff_duals = [0.0] * log_c_lin.size
+        task.getsucslice(mosek.soltype.itr, n_lse + p_lse, cur_con_idx, aff_duals)
+        aff_duals = np.array(aff_duals)
+        aff_duals[aff_duals < 0] = 0
+        # merge z_duals with aff_duals
+        merged_duals = np.zeros(len(k))
+        merged_duals[lse_posys[1:]] = z_duals  # skipping the cost
+        merged_duals[lin_posys] = aff_duals
+        return merged_duals[1:]
+
     msk_solsta = task.getsolsta(sol)
     if msk_solsta == mosek.solsta.prim_infeas_cer:
-        raise PrimalInfeasible()
+        err = PrimalInfeasible()
+        if not choicevaridxs:  # the certificate's dual ray
+            err.la = posynomial_duals()
+        raise err
     if msk_solsta == mosek.solsta.dual_infeas_cer:
         raise DualInfeasible()
     if msk_solsta != optimal:  # pragma: no cover
@@ -291,29 +316,11 @@ def optimize(*, c, A, k, p_idxs, **kwargs):
         "primal": np.array(x),
         "objective": np.exp(task.getprimalobj(sol)),
     }
-    # recover dual variables for log-sum-exp epigraph constraints
-    # (skip epigraph of the objective function).
     if choicevaridxs:  # no dual solution
         solution["la"] = []
         solution["nu"] = []
     else:
-        z_duals = [0.0] * (p_lse - 1)
-        task.getsuxslice(mosek.soltype.itr, m + 3 * n_lse + 1, msk_nvars, z_duals)
-        z_duals = np.array(z_duals)
-        z_duals[z_duals < 0] = 0
-        # recover dual variables for the remaining user-provided constraints
-        if log_c_lin is None:
-            solution["la"] = z_duals
-        else:
-            aff_duals = [0.0] * log_c_lin.size
-            task.getsucslice(mosek.soltype.itr, n_lse + p_lse, cur_con_idx, aff_duals)
-            aff_duals = np.array(aff_duals)
-            aff_duals[aff_duals < 0] = 0
-            # merge z_duals with aff_duals
-            merged_duals = np.zeros(len(k))
-            merged_duals[lse_posys[1:]] = z_duals  # skipping the cost
-            merged_duals[lin_posys] = aff_duals
-            solution["la"] = merged_duals[1:]
+        solution["la"] = posynomial_duals()
 
     task.__exit__(None, None, None)
     env.__exit__(None, None, None)
@@ -15,6 +15,7 @@ from gpkit import (
 )
 from gpkit.constraints.bounded import Bounded
 from gpkit.constraints.costed import CostedConstraintSet
+from gpkit.constraints.gp import BOUNDS_CACHE, BOUNDS_CACHE_SIZE
 from gpkit.constraints.loose import Loose
 from gpkit.constraints.relax import (
     ConstantsRelaxed,
@@ -25,6 +26,7 @@ from gpkit.constraints.tight import Tight
 from gpkit.exceptions import InvalidGPConstraint, PrimalInfeasible
 from gpkit.globals import NamedVariables
 from gpkit.nomials import MonomialEquality, PosynomialInequality, SignomialInequality
+from gpkit.nomials.dense import DenseInequalities
 from gpkit.tests.helpers import run_tests
 from gpkit.units import DimensionalityError
 
@@ -168,6 +170,29 @@ class TestConstraint(unittest.TestCase):
         c2 = 1 + x**2 <= y  # same as c
         self.assertEqual(c2.as_hmapslt1({}), c.as_hmapslt1({}))
 
+    def test_dense_array_inequality(self):
+        "Test that vector inequalities are batched like their elements"
+        x = VectorVariable(3, "x")
+        a = VectorVariable(3, "a", [1, 2, 3])
+        c = x >= 2 * a + 1
+        self.assertIsInstance(c, DenseInequalities)
+        subs = {a[i]: i + 1 for i in range(3)}
+        hmaps = c.as_hmapslt1(subs)
+        for i, element in enumerate(c):
+            scalar = PosynomialInequality(x[i], ">=", 2 * a[i] + 1)
+            self.assertEqual(element.as_hmapslt1({}), scalar.as_hmapslt1({}))
+            self.assertEqual(hmaps[i], scalar.as_hmapslt1(subs)[0])
+            self.assertIs(hmaps[i].parent, element)
+        bounded = {(xi.key, "lower") for xi in x} | {(ai.key, "upper") for ai in a}
+        self.assertEqual(c.bounded, bounded)
+        self.assertEqual(c.meq_bounded, {})
+        c2 = x / x[0] <= 2
+        self.assertIsNot(c2.meq_bounded, c.meq_bounded)
+        self.assertEqual(c2.constraints[0].unsubbed, [])
+        sol = Model(x.prod(), [c]).solve(verbosity=0)
+        for element in c:
+            self.assertAlmostEqual(sol["sensitivities"]["constraints"][element], 1)
+
     def test_sub_tol(self):
         "Test PosyIneq feasibility tolerance under substitutions"
         x = Variable("x")
@@ -179,6 +204,37 @@ class TestConstraint(unittest.TestCase):
         PosynomialInequality.feastol = 1e-3
         self.assertEqual(m.substitutions("x"), m.solve(verbosity=0)("x"))
 
+    def test_lazy_aggregation(self):
+        x, z = Variable("x"), Variable("z")
+        y = Variable("y", 2)
+        inner = ConstraintSet([x >= y])
+        outer = ConstraintSet([inner, z >= x], {y: 3})
+        m = Model(z, [outer])
+        self.assertIsNone(inner._vks)  # pylint: disable=protected-access
+        self.assertEqual(m.vks, {x.key, y.key, z.key})
+        self.assertEqual(m.substitutions[y], 3)
+        self.assertIn((y.key, "lower"), m.bounded)
+        self.assertEqual(inner.substitutions[y], 2)
+        self.assertIsNone(y.key.value)  # only kept in substitutions
+        self.assertAlmostEqual(m.solve(verbosity=0)["cost"], 3)
+        # edits made after a set is created don't change it, whenever it
+        # happens to aggregate
+        subs = {y: 4}
+        for aggregate_first in (False, True):
+            inner = ConstraintSet([x >= y])
+            outer = ConstraintSet([inner, z >= x], subs)
+            if aggregate_first:
+                self.assertEqual(outer.substitutions[y], 4)
+            subs[y] = 5
+            inner.substitutions[y] = 7
+            self.assertEqual(outer.substitutions[y], 4)
+            self.assertEqual(ConstraintSet([inner]).substitutions[y], 7)
+            subs[y] = 4
+        cs = ConstraintSet([z >= x], {x: 1})
+        self.assertIn((x.key, "lower"), cs.bounded)
+        cs.substitutions = {}
+        self.assertNotIn((x.key, "lower"), cs.bounded)
+
 
 class TestCostedConstraint(unittest.TestCase):
     "Tests for Costed Constraint class"
@@ -223,6 +279,32 @@ class TestMonomialEquality(unittest.TestCase):
         mec = f == m * a
         self.assertTrue(isinstance(mec, MonomialEquality))
 
+    def test_bounds_chain(self):
+        "Bounds should propagate through chains of equalities"
+        x = VectorVariable(6, "x")
+        chain = [x[i] == x[i + 1] for i in range(5)]
+        m = Model(x[0], chain + [x[-1] >= 1, x[-1] <= 2])
+        self.assertEqual(len(m.bounded), 12)
+        self.assertEqual(m.gp().check_bounds(), {})
+        gp = Model(x[0], chain + [x[-1] <= 2]).gp(checkbounds=False)
+        missingbounds = gp.check_bounds()
+        self.assertEqual(len(missingbounds), 6)
+        self.assertEqual(
+            missingbounds[(x[0].key, "lower")],
+            f", but would gain it from any of these sets: [({x[1]}, 'lower')]",
+        )
+        missingbounds.clear()  # the cached copy is unaffected
+        self.assertEqual(len(gp.check_bounds()), 6)
+        # the cache keeps the most recently used structures
+        structure = next(reversed(BOUNDS_CACHE))
+        for n in range(2, BOUNDS_CACHE_SIZE + 1):
+            y = VectorVariable(n, "y")
+            Model(y.prod(), [y >= 1]).gp()
+        gp.check_bounds()  # a hit, which makes gp's structure the most recent
+        self.assertEqual(next(reversed(BOUNDS_CACHE)), structure)
+        Model(x.prod(), [x >= 1]).gp()
+        self.assertIn(structure, BOUNDS_CACHE)
+
     def test_non_monomial(self):
         "Try to initialize a MonomialEquality with non-monomial args"
         x = Variable("x")
@@ -1,12 +1,13 @@
 """Test KeyDict class"""
 
+import pickle
 import unittest
 
 import numpy as np
 
 import gpkit
 from gpkit import Variable, VectorVariable
-from gpkit.keydict import KeyDict
+from gpkit.keydict import KeyDict, NameIndex, SlotKeyDict
 from gpkit.tests.helpers import run_tests
 
 
@@ -70,7 +71,94 @@ class TestKeyDict(unittest.TestCase):
             kd[v[0]] = gpkit.units("inch")
 
 
-TESTS = [TestKeyDict]
+class TestSlotKeyDict(unittest.TestCase):
+    """TestCase for the SlotKeyDict class"""
+
+    def test_slots(self):
+        x = Variable("x")
+        v = VectorVariable(3, "v", "m")
+        kd = SlotKeyDict(zip([x.key, v[0].key, v[2].key], [1.0, 2.0, 3.0]))
+        self.assertEqual(kd[x], 1)
+        self.assertEqual(kd["v"].tolist()[::2], [2, 3])
+        self.assertTrue(np.isnan(kd[v[1]]))
+        self.assertNotIn(v[1], kd)
+        array = kd.asarray()
+        self.assertEqual(array.shape, (4,))
+        self.assertFalse(array.flags.writeable)
+        self.assertFalse(kd[v].flags.writeable)
+        self.assertTrue(np.shares_memory(array, kd[v]))
+        self.assertEqual(kd.positions([v[2], x, "v"]).tolist(), [3, 0, 1, 2, 3])
+        kd.set_many([x, v[1]], [10, 20])
+        self.assertEqual(kd[x], 10)
+        self.assertEqual(kd.get_many([v]).tolist(), [2, 20, 3])
+        kd[v[0]] = gpkit.units("cm")
+        self.assertAlmostEqual(kd[v[0]], 0.01)
+        kd[v] = np.array([np.nan, 5, np.nan])
+        self.assertEqual(kd[v].tolist(), [0.01, 5, 3])
+        kd2 = SlotKeyDict(kd)
+        kd2[x] = 4
+        self.assertEqual(kd[x], 10)
+        self.assertEqual(pickle.loads(pickle.dumps(kd2))[x], 4)
+
+    def test_nonfloat(self):
+        x = Variable("x")
+        v = VectorVariable(2, "v")
+        kd = SlotKeyDict({x: 1, v: np.array([1, 2])})
+        kd[v] = ("sweep", [1, 2])
+        self.assertNotIn(v.key, kd.slots)
+        self.assertEqual(kd[v], ("sweep", [1, 2]))
+        self.assertTrue(np.isnan(kd.asarray()[1:]).all())
+        kd[x] = [1, 2, 3]  # e.g. as in a DictOfLists
+        self.assertEqual(kd[x], [1, 2, 3])
+        self.assertEqual(kd.slots, {})
+        del kd[x]
+        self.assertNotIn(x, kd)
+
+
+class TestNameIndex(unittest.TestCase):
+    """TestCase for the NameIndex class"""
+
+    def test_shared_keymap(self):
+        x = Variable("x", lineage=[("Motor", 0)])
+        v = VectorVariable(2, "v")
+        index = NameIndex([x.key, v[0].key, v[1].key])
+        self.assertEqual(index.sortedkeys("v"), (v[0].key, v[1].key))
+        self.assertEqual(set(index.keymap["Motor.x"]), {x.key})
+        keyset = index.keyset()
+        self.assertIs(keyset.keymap, index.keymap)
+        self.assertEqual(keyset["v"], {v[0].key, v[1].key})
+        kd = KeyDict({x: 1})
+        self.assertFalse(kd.share_nameindex(index))  # v is missing
+        kd[v] = np.array([2, 3])
+        self.assertTrue(kd.share_nameindex(index))
+        self.assertIs(kd.keymap, index.collapsed)
+        self.assertIs(KeyDict(kd).keymap, index.collapsed)
+        self.assertEqual(kd["x"], 1)
+        self.assertNotIn("y", kd)
+        y = Variable("y")
+        kd[y] = 4  # copies the keymap before changing it
+        self.assertIsNot(kd.keymap, index.collapsed)
+        self.assertIsNone(kd.nameindex)
+        self.assertEqual(kd["y"], 4)
+        self.assertNotIn("y", index.collapsed)
+        del kd["x"]
+        self.assertIn("x", index.collapsed)
+        self.assertIn(x.key, index.collapsed["Motor.x"])
+
+    def test_model_and_solution(self):
+        x = Variable("x")
+        y = Variable("y", 2)
+        m = gpkit.Model(x, [x >= y])
+        self.assertIs(m.varkeys.keymap, m.nameindex.keymap)
+        sol = m.solve(verbosity=0)
+        self.assertIs(sol["variables"].nameindex, m.nameindex)
+        self.assertAlmostEqual(sol["variables"]["x"], 2)
+        self.assertAlmostEqual(sol("x").magnitude, 2)
+        _ = sol.table()
+        self.assertIn("name collisions", m.nameindex.derived)
+
+
+TESTS = [TestKeyDict, TestSlotKeyDict, TestNameIndex]
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -23,6 +23,7 @@ from gpkit.constraints.relax import (
     ConstantsRelaxed,
     ConstraintsRelaxed,
     ConstraintsRelaxedEqually,
+    RelaxedGP,
 )
 from gpkit.exceptions import (
     DualInfeasible,
@@ -278,6 +279,54 @@ class TestGP(unittest.TestCase):
         self.assertAlmostEqual(sol["cost"], 0.1, self.ndig)
         self.assertTrue(sol.almost_equal(sol))
 
+    def test_relaxed_gp(self):
+        x = Variable("x", "ft")
+        x_min = Variable("x_min", 2, "ft")
+        x_max = Variable("x_max", 1, "ft")
+        y = Variable("y", "volts")
+        m = Model(x / y, [x <= x_max, x >= x_min])
+        gp = RelaxedGP(m)
+        self.assertEqual(gp.A.shape, [len(gp.cs), len(gp.varlocs)])
+        sol = gp.solve(self.solver, verbosity=0)
+        self.assertEqual(len(gp.slacks), 2)  # one for each constant
+        self.assertAlmostEqual(sol(x_min) / sol(x_max), 1, self.ndig)
+        relaxed = sol["warnings"]["Relaxed Constants"]
+        self.assertEqual(len(relaxed), 1)  # since one of the two suffices
+        bounds = sol["warnings"]["Arbitrarily Bounded Variables"][0][1]
+        self.assertIn(y.key, bounds["sensitive to upper bound of 1e+30"])
+        self.assertNotIn(x.key, set().union(*bounds.values()))
+        # and with only constraints relaxed
+        m = Model(x, [x <= units("inch"), x >= units("yard")])
+        gp = RelaxedGP(m, "constraints")
+        self.assertFalse(gp.meq_idxs.all)
+        sol = gp.solve(self.solver, verbosity=0)
+        ((msg, constraint),) = sol["warnings"]["Relaxed Constraints"]
+        self.assertIs(constraint, m[1])
+        self.assertIn("3500% relaxed", msg)
+
+    def test_infeasibility_certificate(self):
+        x = Variable("x")
+        z = Variable("z")
+        a = Variable("a", 2)
+        b = Variable("b", 1)
+        c = Variable("c", 1)
+        m = Model(x + z, [x >= a, x == b * z, z + 0.1 * c <= 2 * c, x <= 3])
+        with self.assertRaises(PrimalInfeasible) as cm:
+            m.solve(solver=self.solver, verbosity=0)
+        err = cm.exception
+        if err.la is None:  # pragma: no cover
+            return  # mosek_cli doesn't return certificates
+        for conflicts in [err.conflicts, m.program.conflicts(err.la)]:
+            constraints = [constraint for _, constraint in conflicts["constraints"]]
+            self.assertEqual(len(constraints), 3)
+            self.assertEqual(set(map(id, constraints)), {id(m[i]) for i in range(3)})
+            senss = {vk: sens for sens, vk in conflicts["constants"]}
+            self.assertEqual(set(senss), {a.key, b.key, c.key})
+            self.assertGreater(senss[a.key], 0)  # lowering it helps
+            self.assertLess(senss[b.key], 0)  # raising it helps
+            self.assertLess(senss[c.key], 0)
+        self.assertIn("x ≥ a", str(err))
+
     @unittest.skipIf(
         settings["default_solver"] == "cvxopt",
         "cvxopt cannot solve singular problems",
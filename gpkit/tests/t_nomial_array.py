@@ -8,6 +8,7 @@ import numpy as np
 import gpkit
 from gpkit import Monomial, NomialArray, Posynomial, Variable, VectorVariable
 from gpkit.constraints.set import ConstraintSet
+from gpkit.small_scripts import mag
 from gpkit.units import DimensionalityError
 
 
@@ -105,6 +106,20 @@ class TestNomialArray(unittest.TestCase):
         self.assertEqual(mismatch[:2].sum().c, 1.3048 * gpkit.ureg.m)
         self.assertEqual(mismatch.prod().c, 1 * gpkit.ureg.m * gpkit.ureg.ft)
 
+    def test_lambdify(self):
+        x = VectorVariable(3, "x", "m")
+        y = Variable("y", "ft")
+        arr = NomialArray([y + x[0], x[1] + y, 2 * x[2]])
+        evaluate = arr.lambdify()
+        self.assertEqual(evaluate.units, arr[0].units)
+        subs = {x[0].key: 1, x[1].key: 2, x[2].key: 3, y.key: 2}
+        values = evaluate(subs)
+        expected = [mag(nom.sub(subs).value.to(arr[0].units)) for nom in arr]
+        self.assertEqual(values.shape, (3,))
+        for value, expected_value in zip(values, expected):
+            self.assertAlmostEqual(value, expected_value)
+        self.assertRaises(ValueError, NomialArray([]).lambdify)
+
     def test_sum(self):
         x = VectorVariable(5, "x")
         p = x.sum()
@@ -121,6 +136,96 @@ class TestNomialArray(unittest.TestCase):
         self.assertEqual(len(rowsum), 2)
         self.assertEqual(len(colsum), 3)
 
+    def test_bulk_sum(self):
+        x = VectorVariable(1000, "x", "m")
+        p = x.sum()
+        self.assertEqual(len(p.hmap), 1000)
+        self.assertEqual(p.units, 1 * gpkit.ureg.m)
+        self.assertEqual(p.ast, ("sum", (x, None)))
+        self.assertEqual(NomialArray([x[0], 2 * x[0], 0]).sum(), 3 * x[0])
+        self.assertEqual(np.sum(x[:3]), x[0] + x[1] + x[2])
+        with pywarnings.catch_warnings():  # skip the UnitStrippedWarning
+            pywarnings.simplefilter("ignore")
+            y = NomialArray([x[0], 1 * gpkit.ureg.ft])
+        self.assertAlmostEqual(y.sum().hmap[gpkit.small_classes.EMPTY_HV], 0.3048)
+
+    def test_inner_and_dot(self):
+        x = VectorVariable(3, "x", "m")
+        y = VectorVariable(3, "y", "s")
+        p = x[0] * y[0] + x[1] * y[1] + x[2] * y[2]
+        for product in [x.dot(y), x.inner(y), np.dot(x, y), np.inner(x, y)]:
+            self.assertEqual(product, p)
+            self.assertEqual(product.units, 1 * gpkit.ureg("m*s"))
+        self.assertEqual(x.dot([1, 0, 2]), x[0] + 2 * x[2])
+        z = VectorVariable((2, 3), "z")
+        zx = z.dot(x)
+        self.assertIsInstance(zx, NomialArray)
+        self.assertEqual(zx[1], z[1, 0] * x[0] + z[1, 1] * x[1] + z[1, 2] * x[2])
+        zz = z.inner(z)
+        self.assertEqual(zz.shape, (2, 2))
+        self.assertEqual(zz[0, 1], zz[1, 0])
+        self.assertEqual(z.sum(axis=0)[2], z[0, 2] + z[1, 2])
+        self.assertRaises(ValueError, x.dot, VectorVariable(2, "w"))
+
+    def test_dense_monomials(self):
+        x = VectorVariable(3, "x", "m")
+        y = VectorVariable(3, "y", "s")
+        m = Variable("m", "kg")
+        self.assertIsNotNone(x.dense)
+        for array, elementwise in [
+            (x * y, lambda i: x[i] * y[i]),
+            (x**2 / m, lambda i: x[i] ** 2 / m),
+            (2 * x * m, lambda i: 2 * x[i] * m),
+            (x / y * [1, 2, 3], lambda i: x[i] / y[i] * (i + 1)),
+            (3 / x, lambda i: 3 / x[i]),
+            (x * x / x, lambda i: x[i]),
+            ((x * y)[1:], lambda i: x[i + 1] * y[i + 1]),
+        ]:
+            self.assertIsNotNone(array.dense)
+            for i, el in enumerate(array):
+                self.assertIsInstance(el, Monomial)
+                self.assertEqual(el, elementwise(i))
+                self.assertEqual(el.units, elementwise(i).units)
+        self.assertEqual(str(2 * x * m), "2·x[:]·m")
+        self.assertEqual((x * y)[0].hmap, (x[0] * y[0]).hmap)
+        # non-posynomial results fall back to elementwise arithmetic
+        with gpkit.SignomialsEnabled():
+            negx = x * -1
+        self.assertIsNone(negx.dense)
+        self.assertIsInstance(negx[0], gpkit.Signomial)
+        self.assertIsNone((x * 0).dense)
+
+    def test_dense_writes(self):
+        x = VectorVariable(3, "x")
+        y = VectorVariable(3, "y")
+        z = Variable("z")
+        a = x * y
+        view = a[:2]
+        a[0] = z
+        self.assertIsNone(a.dense)
+        self.assertEqual((a * 2)[0], 2 * z)
+        self.assertEqual(a.sum(), z + x[1] * y[1] + x[2] * y[2])
+        self.assertEqual((view * 2)[0], 2 * z)
+        a = x * y
+        view = a[1:]
+        view[0] = z  # writes to a view are writes to its base
+        self.assertEqual((a * 2)[1], 2 * z)
+        a = x * y
+        a *= z
+        self.assertEqual((a * 2)[0], 2 * x[0] * y[0] * z)
+        a = x * y
+        a.flat[0] = z  # writes that bypass __setitem__ are noticed too
+        self.assertEqual((a * 2)[0], 2 * z)
+        a = x * y
+        a.reshape(3, 1)[1] = z
+        self.assertEqual((a * 2)[1], 2 * z)
+        a = x * y
+        a.T[2] = z
+        np.put(a, 0, z)
+        self.assertEqual(list(a * 2), [2 * z, 2 * x[1] * y[1], 2 * z])
+        self.assertEqual(a.sum(), 2 * z + x[1] * y[1])
+        self.assertIsNotNone((x * y)[1:].dense)
+
     def test_getitem(self):
         x = VectorVariable((2, 4), "x")
         self.assertTrue(isinstance(x[0][0], Monomial))
@@ -17,6 +17,7 @@ from gpkit import (
 )
 from gpkit.exceptions import InvalidPosynomial
 from gpkit.nomials import NomialMap
+from gpkit.small_scripts import mag
 
 
 class TestMonomial(unittest.TestCase):
@@ -402,6 +403,28 @@ class TestPosynomial(unittest.TestCase):
             expected = -(y**-2)
         self.assertEqual(d, expected)
 
+    def test_lambdify(self):
+        x = Variable("x", "m")
+        y = Variable("y", "ft")
+        p = x**2 * y + 3 * x * y**2
+        evaluate = p.lambdify([x.key, y.key])
+        xs, ys = np.array([1.0, 2.0, 3.0]), np.array([[0.5], [2.0]])
+        values, grads = evaluate([xs, ys], grad=True)
+        self.assertEqual(values.shape, (2, 3))
+        self.assertEqual(grads.shape, (2, 3, 2))
+        for i, j in np.ndindex(values.shape):
+            subs = {x: xs[j], y: ys[i, 0]}
+            self.assertAlmostEqual(values[i, j], mag(p.sub(subs).c))
+            for k, var in enumerate([x, y]):
+                dlogp = (p.diff(var) * var).sub(subs).value / p.sub(subs).value
+                self.assertAlmostEqual(grads[i, j, k], mag(dlogp.to("dimensionless")))
+        # values are converted to the varkeys' units
+        self.assertAlmostEqual(
+            evaluate([1 * gpkit.ureg.m, 12 * gpkit.ureg.inch]), evaluate([1, 1])
+        )
+        self.assertIs(p.lambdify(), p.lambdify())
+        self.assertRaises(ValueError, p.lambdify, [x.key])
+
     def test_mono_lower_bound(self):
         "Test monomial approximation"
         x = Variable("x")
@@ -1,10 +1,16 @@
 """Tests for small_classes.py and small_scripts.py"""
 
+import subprocess
+import sys
 import unittest
 
+import numpy as np
+import numpy.testing as npt
+
 import gpkit
 from gpkit.repr_conventions import unitstr
 from gpkit.small_classes import HashVector
+from gpkit.units import DimensionalityError, magnitude_in, qty
 
 
 class TestHashVector(unittest.TestCase):
@@ -79,8 +85,46 @@ class TestSmallScripts(unittest.TestCase):
             )
             self.assertEqual(gpkit.units("nautical_mile"), gpkit.units("nmi"))
 
-
-TESTS = [TestHashVector, TestSmallScripts]
+    def test_magnitude_in(self):
+        ureg = gpkit.ureg
+        for quantity, units in [
+            (3 * ureg.ft, qty("m")),
+            (np.array([1, 2]) * ureg.km, "m"),
+            (5 * ureg.percent, None),
+            (ureg.Quantity(20, "degC"), qty("K")),  # affine, not a factor
+        ]:
+            for _ in range(2):  # the second conversion is cached
+                expected = quantity.to(getattr(units, "units", units) or "")
+                npt.assert_allclose(magnitude_in(quantity, units), expected.magnitude)
+        self.assertRaises(DimensionalityError, magnitude_in, 3 * ureg.ft, qty("s"))
+
+
+class TestImport(unittest.TestCase):
+    """TestCase for the cost of `import gpkit`"""
+
+    def test_import(self):
+        heavy = list(gpkit.LAZY_SUBMODULES) + ["scipy.sparse", "matplotlib"]
+        script = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import gpkit\n"
+            "print(time.perf_counter() - start)\n"
+            f"print([m for m in {heavy!r} if m in sys.modules or"
+            " 'gpkit.' + m in sys.modules])\n"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script], text=True)
+        seconds, imported = output.strip().split("\n")[-2:]
+        self.assertEqual(imported, "[]")  # these should only load when used
+        self.assertLess(float(seconds), 5)  # ~0.3s when this test was written
+        self.assertTrue(callable(gpkit.build))
+        # even if the build module is imported first
+        script = "import gpkit.build; print(callable(gpkit.build))"
+        output = subprocess.check_output([sys.executable, "-c", script], text=True)
+        self.assertEqual(output.strip().split("\n")[-1], "True")
+        self.assertIn("Breakdowns", dir(gpkit.breakdowns))
+
+
+TESTS = [TestHashVector, TestSmallScripts, TestImport]
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,13 +1,19 @@
 """Tests for SolutionArray class"""
 
+import pickle
+import threading
 import unittest
+from unittest import mock
 
 import numpy as np
 
 import gpkit
-from gpkit import Model, SignomialsEnabled, Variable, VectorVariable
+from gpkit import ConstraintSet, Model, SignomialsEnabled, Variable, VectorVariable
+from gpkit.breakdowns import Breakdowns, Transform, Tree, revalue
 from gpkit.small_classes import Quantity, Strings
+from gpkit.small_scripts import mag
 from gpkit.solution_array import var_table
+from gpkit.solution_ensemble import SolutionEnsemble
 from gpkit.varkey import VarKey
 
 
@@ -57,6 +63,11 @@ class TestSolutionArray(unittest.TestCase):
             0 * gpkit.ureg.m, np.max(np.abs(p_vals * gpkit.ureg.m - p_sol))
         )
         self.assertAlmostEqual(0 * gpkit.ureg.m, np.max(np.abs(p_sol - sol(p_max))))
+        area = sol(h * w)
+        self.assertEqual(area.shape, (n_sweep,))
+        for i in range(n_sweep):
+            subbed = (h * w).sub(sol.atindex(i)["variables"])
+            self.assertAlmostEqual(area[i], subbed.value)
 
     def test_table(self):
         x = Variable("x")
@@ -65,6 +76,98 @@ class TestSolutionArray(unittest.TestCase):
         tab = sol.table()
         self.assertTrue(isinstance(tab, Strings))
 
+    def test_lazy_modelstr(self):
+        x = Variable("x")
+        m = Model(x, [x >= 12])
+        sol = m.solve(verbosity=0)
+        self.assertIsNone(m.share_strings()._modelstr)  # nothing rendered yet
+        fingerprint, modelstr = m.fingerprint, str(m)
+        m.append(x >= 13)  # solutions still describe the model they solved
+        self.assertEqual(sol.modelstr, modelstr)
+        self.assertEqual(sol.modelfingerprint, fingerprint)
+        self.assertNotEqual(m.fingerprint, fingerprint)
+        self.assertIn("13", m.modelstr)
+        sol2 = pickle.loads(pickle.dumps(m.solve(verbosity=0)))
+        self.assertNotIn("modelstrings", sol2.__dict__)
+        self.assertEqual(sol2.modelstr, m.modelstr)
+        self.assertEqual(sol2.modelfingerprint, m.fingerprint)
+        # nested sets and costs render the string before they change
+        inner = ConstraintSet([x >= 12])
+        nested = Model(x, [inner])
+        sol = nested.solve(verbosity=0)
+        fingerprint, modelstr = nested.fingerprint, str(nested)
+        inner.append(x >= 14)
+        self.assertEqual(sol.modelfingerprint, fingerprint)  # taken at solve
+        self.assertNotEqual(nested.fingerprint, fingerprint)
+        self.assertEqual(sol.modelstr, modelstr)
+        sol, modelstr = nested.solve(verbosity=0), str(nested)
+        nested.cost = x**2
+        self.assertEqual(sol.modelstr, modelstr)
+        # while changes no set sees make the string unknown, not wrong
+        constraints = [x >= 12]
+        listed = Model(x, [constraints])
+        sol = listed.solve(verbosity=0)
+        constraints.append(x >= 14)
+        self.assertRaises(ValueError, getattr, sol, "modelstr")
+        y = Variable("x")  # same constraints, different cost
+        self.assertEqual(Model(y**2, [y >= 12, y >= 13]).fingerprint, m.fingerprint)
+
+    def test_breakdowns_memo(self):
+        x = Variable("x", "m")
+        y = Variable("y", "m")
+        z = Variable("z", 2, "m")
+        m = Model(x, [x >= 2 * y + z, y >= 3 * z, x >= z])
+        sol = m.solve(verbosity=0)
+        bds = sol.breakdowns
+        self.assertIs(bds, sol.breakdowns)  # found once per solution
+        tree, _ = bds.get_tree("cost")
+        self.assertTrue(bds.memo)
+        self.assertIs(bds.get_tree("cost")[0], tree)
+        self.assertIsNot(bds.get_tree("cost", permissivity=1)[0], tree)
+        self.assertNotIn("_breakdowns", pickle.loads(pickle.dumps(sol)).__dict__)
+
+    def test_sweep_breakdowns(self):
+        x = Variable("x", "m")
+        y = Variable("y", "m")
+        z = Variable("z", "m")
+        w = Variable("w", ("sweep", np.linspace(1, 30, 12)), "m")
+        u = Variable("u", 10, "ft")
+        m = Model(x, [x >= 2 * y + z + w, y >= 3 * z + u, z >= w / 4, x >= z])
+        sol = m.solve(verbosity=0)
+        bds = sol.breakdowns
+        self.assertLess(len(bds.groups), len(sol))  # not found for every point
+        shares = bds.contributions("cost")
+        for i in range(len(sol)):
+            tree, _ = Breakdowns(sol.atindex(i)).get_tree("cost")
+            self.assertEqual(str(bds.get_tree("cost", i)[0]), str(tree))
+            pointshares, trees = {}, [tree]
+            while trees:
+                key, value, branches = trees.pop()
+                if not isinstance(key, Transform):
+                    pointshares[key] = pointshares.get(key, 0) + value
+                trees.extend(branches)
+            for key, share in shares.items():
+                if key in pointshares:
+                    self.assertAlmostEqual(share[i], pointshares[key])
+                else:
+                    self.assertTrue(np.isnan(share[i]))
+        # points re-evaluated as crossing MIN_CRAWLED, even the first of a
+        # group (which was crawled), are each left for a later pass
+
+        def shrunk(tree):
+            return Tree(tree.key, tree.value * 0, [shrunk(b) for b in tree.branches])
+
+        found = []
+        with mock.patch(
+            "gpkit.breakdowns.revalue", lambda *args: shrunk(revalue(*args))
+        ):
+            worker = threading.Thread(
+                target=lambda: found.append(bds.contributions("cost")), daemon=True
+            )
+            worker.start()
+            worker.join(30)
+        self.assertTrue(found)
+
     def test_units_sub(self):
         # issue 809
         t = Variable("t", "N", "thrust")
@@ -78,6 +181,83 @@ class TestSolutionArray(unittest.TestCase):
             "1000N" in sol.table().replace(" ", "").replace("[", "").replace("]", "")
         )
 
+    def test_predict(self):
+        x = Variable("x", "m")
+        y = Variable("y")
+        z = Variable("z")
+        a = Variable("a", 2, "m")
+        b = Variable("b", 3)
+        c = VectorVariable(2, "c", [1.5, 1])
+        d = Variable("d", lambda v: v[b] ** 2)
+        m = Model(
+            x / (a * y) + z + 1 / z,
+            [x >= a * y + c[1] * z * a, y * z >= b, z + c[0] <= 5, x * y == d * a],
+        )
+        sol = m.solve(verbosity=0)
+        for subs in [
+            {a: 2.02},
+            {"b": 3.03},
+            {c: [1.52, 1.01]},
+            {a: 201 * gpkit.ureg.cm},
+        ]:
+            pred = sol.predict(subs)
+            self.assertEqual(pred["trust"], 1)
+            m.substitutions.update(subs)
+            resolved = m.solve(verbosity=0)
+            m.substitutions.update({a: 2, b: 3, c: [1.5, 1]})
+            for key in ["cost", x, y, z]:
+                if key == "cost":
+                    values = [pred[key], resolved[key], sol[key]]
+                else:
+                    values = [mag(s(key)) for s in (pred, resolved, sol)]
+                predicted, expected, before = values
+                # much closer than the unperturbed solution
+                self.assertLess(
+                    abs(predicted / expected - 1),
+                    max(abs(before / expected - 1) / 10, 1e-6),
+                )
+        self.assertAlmostEqual(sol.predict({b: 3.03})(d), 9.18, 2)
+        # trust is the fraction of the change before a loose constraint binds
+        m = Model(x, [x >= Variable("a", 2, "m"), x >= Variable("e", 1, "m")])
+        sol = m.solve(verbosity=0)
+        self.assertAlmostEqual(sol.predict({"e": 3})["trust"], np.log(2) / np.log(3))
+        self.assertAlmostEqual(sol.predict({"a": 0.5})["trust"], 0.5)
+        self.assertIsNone(pickle.loads(pickle.dumps(sol)).kkt)
+        # vector inequalities are compiled densely, without substitution maps
+        xv = VectorVariable(3, "x_v")
+        av = VectorVariable(3, "a_v", [1, 2, 3])
+        sol = Model(xv.prod(), [xv >= av]).solve(verbosity=0)
+        pred = sol.predict({av: [1.1, 2, 3.3]})
+        self.assertTrue(np.allclose(mag(pred(xv)), [1.1, 2, 3.3]))
+
+    def test_jacobian(self):
+        x = Variable("x", "m")
+        y = Variable("y")
+        a = Variable("a", 2, "m")
+        b = Variable("b", 3)
+        c = VectorVariable(2, "c", [1.5, 1])
+        d = Variable("d", lambda v: v[b] ** 2)
+        w = VectorVariable(2, "w")
+        m = Model(
+            x / (a * y) + y + w.prod(),
+            [x >= a * y + c[1] * a, x * y == d * a, w >= c, y >= 0.1 * b],
+        )
+        sol = m.solve(verbosity=0)
+        jac, constants = sol.kkt.jacobian()
+        self.assertEqual(jac.shape, (4, 4))
+        self.assertNotIn(d.key, constants)  # replaced by b, as in sensitivities
+        for var in [x, "y", w[1]]:
+            jacobian = sol.jacobian(var)
+            for const in [a, b, c[0], c[1]]:
+                value = sol["constants"][const]
+                m.substitutions.update({const: value * np.exp(1e-6)})
+                perturbed = m.solve(verbosity=0)
+                m.substitutions.update({const: value})
+                finitediff = np.log(mag(perturbed(var) / sol(var))) / 1e-6
+                self.assertAlmostEqual(jacobian[const], finitediff, 3)
+        self.assertAlmostEqual(sol.jacobian(w[1])[c[1]], 1)
+        self.assertRaises(KeyError, sol.jacobian, a)
+
     def test_key_options(self):
         # issue 993
         x = Variable("x")
@@ -120,7 +300,61 @@ class TestResultsTable(unittest.TestCase):
         self.assertAlmostEqual(sol("x") / 3.0, 1.0, 3)
 
 
-TESTS = [TestSolutionArray, TestResultsTable]
+class TestSolutionEnsemble(unittest.TestCase):
+    """TestCase for the SolutionEnsemble class"""
+
+    def test_deltas(self):
+        x = Variable("x")
+        y = Variable("y", 2)
+        v = VectorVariable(3, "v", [1, 2, 3])
+        m = Model(x, [x >= y * v.sum(), v >= 0.5])
+        se = SolutionEnsemble()
+        se.append(m.solve(verbosity=0))
+        m.substitutions[v] = [1, 5, 3]
+        se.append(m.solve(verbosity=0), verbosity=0)
+        del m.substitutions[v]
+        m.substitutions[y] = ("sweep", [1, 2, 3])
+        sweepsol = m.solve(verbosity=0)
+        se.append(sweepsol, verbosity=0)
+        vset, vfreed = (d for d in se.labels if d)
+        self.assertEqual(vset, ((v[1].key, 5.0),))
+        self.assertEqual(len(vfreed), 4)
+        self.assertEqual(vfreed[-1], (y.key, "sweep", (1.0, 3.0)))
+        # only differing values are stored, and only once per key
+        self.assertEqual(list(se.columns[("constants",)][v.key]), [vset])
+        self.assertEqual(list(se.columns[("variables",)][v.key]), [vset, vfreed])
+        for diff, sol in pickle.loads(pickle.dumps(se)).solutions.items():
+            if diff == vfreed:
+                self.assertTrue(np.allclose(sol["cost"], sweepsol["cost"]))
+                self.assertNotIn(v, sol["constants"])
+                self.assertEqual(sol["variables"][v].shape, (3, 3))
+            elif diff:
+                self.assertEqual(list(sol["constants"][v]), [1, 5, 3])
+                self.assertAlmostEqual(sol["cost"], 18, 5)
+        # rebuilt members are reused while in use, also by views of the
+        # ensemble, and are replaced when their difference is
+        view = se.filter("v")
+        rebuilt = se.solutions[vset]
+        self.assertIs(se.solutions[vset], rebuilt)
+        self.assertIs(view.solutions[vset], rebuilt)
+        self.assertIs(se.filter("v").solutions[vset], rebuilt)
+        m.substitutions[y] = 2
+        m.substitutions[v] = [1, 5, 3]
+        se.append(m.solve(verbosity=0), verbosity=0)
+        self.assertIsNot(se.solutions[vset], rebuilt)
+        self.assertIsNot(view.solutions[vset], rebuilt)
+        del rebuilt, sol
+        self.assertEqual(len(se._rebuilt), 0)  # pylint: disable=protected-access
+        self.assertEqual(list(se.filter("y").labels), [(), vfreed])
+        self.assertEqual(list(se.filter("v").labels), [(), vset, vfreed])
+        self.assertEqual(list(se.filter(["v", "freed"]).labels), [(), vfreed])
+        self.assertEqual(list(se.filter("set", "v").labels), [(), vset])
+        self.assertEqual(list(se.filter("v").filter("y").labels), [(), vfreed])
+        self.assertIs(se.filter("v").viewof, se)
+        self.assertRaises(ValueError, se.filter("v").append, sweepsol)
+
+
+TESTS = [TestSolutionArray, TestResultsTable, TestSolutionEnsemble]
 
 if __name__ == "__main__":  # pragma: no cover
     # pylint: disable=wrong-import-position
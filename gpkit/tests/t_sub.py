@@ -16,7 +16,10 @@ from gpkit import (
     Variable,
     VectorVariable,
 )
+from gpkit.constraints.prog_factories import evaluate_linked_sweep
 from gpkit.exceptions import UnboundedGP
+from gpkit.keydict import KeyDict
+from gpkit.nomials.map import SubstitutionPlan
 from gpkit.small_scripts import mag
 from gpkit.tests.helpers import run_tests
 from gpkit.units import DimensionalityError
@@ -261,6 +264,28 @@ class TestModelSubs(unittest.TestCase):
             [float(d) for d in (sol(t_day) + sol(t_night)) / gpkit.ureg.hours], 24
         )
 
+    def test_swept_linked(self):
+        x = Variable("x")
+        a = Variable("a", 2)
+        b = Variable("b", lambda c: c[a] ** 2 + 1)
+        d = Variable("d", lambda c: abs(c[a] - 3) + 1)
+        linked = {b.key: b.key.value, d.key: d.key.value}
+        swept, pointwise = evaluate_linked_sweep(
+            KeyDict({a.key: 2}), linked, {a.key: np.array([1.0, 2, 3])}
+        )
+        npt.assert_allclose(swept[b.key][0], [2, 5, 10])
+        npt.assert_allclose(swept[b.key][1][a.key], [2, 4, 6])
+        self.assertEqual(set(pointwise), {d.key})
+        m = Model(x, [x >= b, x >= d / 10, x >= a / 10])
+        m.substitutions.update({a: ("sweep", [1, 2, 3])})
+        sol = m.solve(verbosity=0)
+        npt.assert_allclose(mag(sol["cost"]), [2, 5, 10])
+        npt.assert_allclose(mag(sol(d)), [3, 2, 1])
+        # d(log x)/d(log a) = 2a^2/(a^2 + 1)
+        npt.assert_allclose(
+            sol["sensitivities"]["variables"][a], [1, 1.6, 1.8], rtol=1e-4
+        )
+
     def test_vector_init(self):
         N = 6
         Weight = 50000
@@ -451,6 +476,29 @@ class TestNomialMapSubs(unittest.TestCase):
 
         self.assertEqual(p.sub({z: -2}), 2)
 
+    def test_substitution_plan(self):
+        x = Variable("x")
+        y = Variable("y")
+        z = Variable("z")
+        p = 2 * x * y + 3 * x * z**2 + y / z + 4
+        keys = [y.key, z.key]
+        for vectorize_above in (SubstitutionPlan.vectorize_above, 0):
+            plan = SubstitutionPlan(p.hmap, keys, vectorize_above)
+            self.assertEqual(plan.dense_xs is not None, vectorize_above == 0)
+            for values in ([2, 0.5], [3, -2], [2, 1]):
+                subs = dict(zip(keys, values))
+                hmap = p.hmap.sub(subs, p.vks)
+                pmap = hmap.mmap(p.hmap)
+                planned_hmap, planned_pmap = plan.apply(values)
+                self.assertEqual(set(planned_hmap), set(hmap))
+                for exp, c in hmap.items():
+                    self.assertAlmostEqual(planned_hmap[exp], c)
+                order = [list(hmap).index(exp) for exp in planned_hmap]
+                for planned, i in zip(planned_pmap, order):
+                    self.assertEqual(set(planned), set(pmap[i]))
+                    for j, fraction in planned.items():
+                        self.assertAlmostEqual(fraction, pmap[i][j])
+
 
 TESTS = [TestNomialSubs, TestModelSubs, TestNomialMapSubs]
 
@@ -1,13 +1,20 @@
 """Tests for tools module"""
 
+import contextlib
+import io
+import os
+import tempfile
 import unittest
 
 import numpy as np
 from numpy import log
 
 from gpkit import Model, NomialArray, Variable, VectorVariable, parse_variables
+from gpkit.interactive.background import BackgroundSolver
+from gpkit.interactive.plot_sweep import map_as_completed, sweep_one
 from gpkit.small_scripts import mag
 from gpkit.tools.autosweep import BinarySweepTree
+from gpkit.tools.sweeps import LatinHypercube, PointTable, Sobol
 from gpkit.tools.tools import te_exp_minus1, te_secant, te_tangent
 
 
@@ -159,7 +166,127 @@ class TestTools(unittest.TestCase):
             _ = te_tangent(x, 16)
 
 
-TESTS = [TestTools]
+class TestBackgroundSolver(unittest.TestCase):
+    """TestCase for the BackgroundSolver used by interactive widgets"""
+
+    def test_latest_only(self):
+        x = Variable("x")
+        y = Variable("y", 1)
+        m = Model(x, [x >= y])
+        sols = []
+        solver = BackgroundSolver(m, sols.append, delay=0.2, verbosity=0)
+        for value in [2, 3, 4]:
+            solver.request({"y": value})
+        self.assertTrue(solver.wait(10))
+        self.assertEqual(len(sols), 1)  # only the latest was answered...
+        self.assertEqual(len(solver.cache), 1)  # ...or even solved
+        self.assertAlmostEqual(sols[0]["cost"], 4, 5)
+        solver.request({"y": 5})
+        solver.request({"y": 4})
+        self.assertTrue(solver.wait(10))
+        self.assertIs(sols[-1], sols[0])  # from the cache
+
+    def test_errors(self):
+        x = Variable("x")
+        y = Variable("y", 1)
+        m = Model(x, [x >= y])
+        results = []
+
+        def callback(result):
+            results.append(result)
+            if len(results) == 2:
+                raise ValueError("a display function failed")
+
+        solver = BackgroundSolver(m, callback, delay=0, verbosity=0)
+        solver.request({"y": "not a number"})
+        self.assertTrue(solver.wait(10))
+        self.assertIsInstance(results[-1], Exception)  # given, not raised
+        self.assertEqual(solver.cache, {})
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            solver.request({"y": 2})
+            self.assertTrue(solver.wait(10))
+        self.assertIn("a display function failed", stderr.getvalue())
+        solver.request({"y": 3})  # the worker is still answering
+        self.assertTrue(solver.wait(10))
+        self.assertAlmostEqual(results[-1]["cost"], 3, 5)
+
+
+class TestSweepWorkers(unittest.TestCase):
+    """TestCase for running the sweeps of sweep plots in worker processes"""
+
+    def test_workers(self):
+        x = Variable("x", 2)
+        y = Variable("y")
+        m = Model(y, [y >= x + 1 / x])
+        m.solve(verbosity=0)  # solved models must still be picklable
+        jobs = [
+            (m, x, (1, 3), 0.01, {"verbosity": 0}),
+            (m, x, [1, 2], 0, {"verbosity": 0}),
+        ]
+        serial = dict(map_as_completed(sweep_one, jobs))
+        pooled = dict(map_as_completed(sweep_one, jobs, workers=2))
+        self.assertEqual(set(pooled), {0, 1})
+        for i in (0, 1):
+            self.assertTrue(np.allclose(pooled[i](y), serial[i](y)))
+        self.assertEqual(m.substitutions[x], 2)
+
+
+class TestSweepDesigns(unittest.TestCase):
+    """TestCase for sweeps of points other than full grids"""
+
+    def setUp(self):
+        self.x = x = Variable("x")
+        self.a = a = Variable("a", 1)
+        self.b = b = Variable("b", 1)
+        self.m = Model(x, [x >= a * b])
+
+    def test_zipped(self):
+        a, b, m = self.a, self.b, self.m
+        m.substitutions.update({a: ("sweep", [1, 2, 3]), b: ("sweep", [4, 5, 6])})
+        self.assertEqual(len(m.solve(verbosity=0)), 9)
+        sol = m.solve(verbosity=0, sweepdesign="zip")
+        assert_logtol(sol["cost"], [4, 10, 18])
+        self.assertEqual(set(sol["sweepvariables"]), {a.key, b.key})
+        m.substitutions.update({b: ("sweep", [4, 5])})
+        with self.assertRaises(ValueError):
+            m.solve(verbosity=0, sweepdesign="zip")
+
+    def test_sampled(self):
+        a, b, m = self.a, self.b, self.m
+        m.substitutions.update({a: ("sweep", [1, 100]), b: ("sweep", [2, 2])})
+        for design in [LatinHypercube(8, seed=1), Sobol(8, seed=1)]:
+            sol = m.solve(verbosity=0, sweepdesign=design)
+            self.assertEqual(len(sol), 8)
+            loga = np.log(mag(sol(a)))
+            self.assertTrue((loga >= 0).all() and (loga <= np.log(100)).all())
+            # both put one point in each eighth of the range of log(a)
+            bins = np.floor(loga / np.log(100) * 8)
+            self.assertEqual(len(set(bins)), 8)
+            assert_logtol(sol(b), 2)
+            assert_logtol(sol["cost"], 2 * sol(a))
+        sol2 = m.solve(verbosity=0, sweepdesign=Sobol(8, seed=1))
+        assert_logtol(sol2(a), sol(a))  # seeded samples are repeatable
+
+    def test_point_table(self):
+        x, a, b, m = self.x, self.a, self.b, self.m
+        m.substitutions.update({a: ("sweep", [1, 2, 3])})
+        sol = m.solve(verbosity=0, sweepdesign=PointTable({"a": [2, 3], b: [5, 7]}))
+        assert_logtol(sol["cost"], [10, 21])
+        assert_logtol(sol["sweepvariables"]["b"], [5, 7])
+        points = np.array([(1, 2), (3, 4)], dtype=[("a", float), ("b", float)])
+        sol = m.solve(verbosity=0, sweepdesign=PointTable(points))
+        assert_logtol(sol["cost"], [2, 12])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "points.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("a, b\n1, 5\n2, 6\n3, 7\n")
+            sol = m.solve(verbosity=0, sweepdesign=PointTable(path))
+        assert_logtol(sol(x), [5, 12, 21])
+        with self.assertRaises(ValueError):
+            m.solve(verbosity=0, sweepdesign=PointTable({"c": [1]}))
+
+
+TESTS = [TestTools, TestBackgroundSolver, TestSweepWorkers, TestSweepDesigns]
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,5 +1,6 @@
 """Test VarKey, Variable, VectorVariable, and ArrayVariable classes"""
 
+import pickle
 import sys
 import unittest
 
@@ -250,6 +251,26 @@ class TestVectorVariable(unittest.TestCase):
             self.assertEqual(x[1, 0].value, x[1, 1].value)
             self.assertEqual(x[2, 0].value, x[2, 1].value)
 
+    def test_element_keys(self):
+        """Test that elements' keys match those made from a full descr"""
+        with gpkit.NamedVariables("Wing"):
+            x = VectorVariable((2, 3), "x", np.ones((2, 3)), "m", "spar")
+        self.assertEqual(len(gpkit.NamedVariables.namedvars), 0)
+        key = x[1, 2].key
+        slowkey = VarKey(**key.descr.copy())
+        self.assertEqual(key, slowkey)
+        self.assertEqual(hash(key), hash(slowkey))
+        self.assertEqual(key.eqstr, slowkey.eqstr)
+        self.assertEqual(key.keys, slowkey.keys)
+        self.assertEqual(
+            key.fullstr, slowkey.str_without({"hiddenlineage", "modelnums", "vec"})
+        )
+        self.assertEqual(str(key), "Wing.x[1,2]")
+        self.assertEqual(key.value, 1)
+        self.assertEqual(key.units, x.key.units)
+        self.assertEqual(pickle.loads(pickle.dumps(key)), key)
+        self.assertNotEqual(key, x[0, 2].key)
+
 
 class TestArrayVariable(unittest.TestCase):
     """TestCase for the ArrayVariable class"""
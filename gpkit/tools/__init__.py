@@ -1,4 +1,5 @@
 "Contains miscellaneous tools including fmincon comparison tool"
 
 from .autosweep import autosweep_1d
+from .sweeps import Grid, LatinHypercube, PointTable, Sobol, Zipped
 from .tools import te_exp_minus1
@@ -0,0 +1,200 @@
+"Designs choosing which points of a sweep are solved"
+
+import csv
+import os
+
+import numpy as np
+
+from ..nomials import parse_subs
+
+
+def sweep_points(sweep, varkeys, design=None):
+    """Returns the points that a sweep design solves
+
+    Arguments
+    ---------
+    sweep : dict
+        {varkey: values} of each swept variable, as from parse_subs
+    varkeys : KeySet
+        The varkeys of the model being swept
+    design : SweepDesign, "grid", "zip", or None (default, the same as "grid")
+        How points are chosen from the swept values
+
+    Returns
+    -------
+    dict of {varkey: array} giving each swept variable's value at each point
+    """
+    if design is None:
+        design = Grid()
+    elif isinstance(design, str):
+        if design not in DESIGNS:
+            raise ValueError(
+                f"unknown sweep design {design!r}; use one of {sorted(DESIGNS)}"
+                " or a SweepDesign."
+            )
+        design = DESIGNS[design]()
+    return design.points(sweep, varkeys)
+
+
+class SweepDesign:
+    "Chooses a sweep's points from the values swept for each variable"
+
+    def points(self, sweep, varkeys):
+        "Returns {varkey: array} of each swept variable's value at each point"
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not define how to choose points."
+        )
+
+    @staticmethod
+    def sorted_sweep(sweep):
+        "Returns sweep's varkeys and values, sorted by the eqstr of each key"
+        items = sorted(sweep.items(), key=lambda vkval: vkval[0].eqstr)
+        return [var for var, _ in items], [vals for _, vals in items]
+
+
+class Grid(SweepDesign):
+    "Solves every combination of the swept values (the default design)"
+
+    def points(self, sweep, varkeys):
+        sweepvars, sweepvals = self.sorted_sweep(sweep)
+        if not sweepvars:
+            return {}
+        if len(sweepvars) == 1:
+            sweep_grids = np.array(list(sweepvals))
+        else:
+            sweep_grids = np.meshgrid(*list(sweepvals))
+        n_passes = sweep_grids[0].size
+        return {
+            var: grid.reshape(n_passes) for (var, grid) in zip(sweepvars, sweep_grids)
+        }
+
+
+class Zipped(SweepDesign):
+    """Solves the swept values together, one point per index
+
+    That is, the i-th point has each variable at its i-th swept value, so
+    every swept variable needs the same number of values.
+    """
+
+    def points(self, sweep, varkeys):
+        sweep_vects = dict(zip(*self.sorted_sweep(sweep)))
+        sweep_vects = {var: np.ravel(vals) for var, vals in sweep_vects.items()}
+        lengths = {var: len(vals) for var, vals in sweep_vects.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(
+                "zipped sweeps need the same number of values for each"
+                f" variable, but got {lengths}."
+            )
+        return sweep_vects
+
+
+class Sampled(SweepDesign):
+    """Samples the box spanned by the swept values, uniformly in log space
+
+    Each swept variable ranges between the smallest and largest of its
+    swept values; only those bounds are used.
+
+    Arguments
+    ---------
+    n : int
+        Number of points to sample
+    seed : int, numpy Generator, or None (default)
+        Seeds the sampler, for repeatable samples
+    """
+
+    sampler = None  # name of the scipy.stats.qmc sampler
+
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.seed = seed
+
+    def unit_samples(self, dims):
+        "Returns an (n, dims) array of samples from the unit hypercube"
+        # imported here because scipy.stats is slow to import
+        # pylint: disable=import-outside-toplevel
+        from scipy.stats import qmc
+
+        return getattr(qmc, self.sampler)(dims, seed=self.seed).random(self.n)
+
+    def points(self, sweep, varkeys):
+        sweepvars, sweepvals = self.sorted_sweep(sweep)
+        if not sweepvars:
+            return {}
+        samples = self.unit_samples(len(sweepvars))
+        sweep_vects = {}
+        for var, vals, sample in zip(sweepvars, sweepvals, samples.T):
+            units = getattr(vals, "units", None)
+            vals = np.asarray(getattr(vals, "magnitude", vals), dtype=float)
+            if not (vals > 0).all():
+                raise ValueError(
+                    f"sampled sweeps need positive bounds, but {var} was"
+                    f" swept over {vals}."
+                )
+            loglb, logub = np.log(vals.min()), np.log(vals.max())
+            sweep_vects[var] = np.exp(loglb + sample * (logub - loglb))
+            if units is not None:
+                sweep_vects[var] = sweep_vects[var] * units
+        return sweep_vects
+
+
+class LatinHypercube(Sampled):
+    "Latin-hypercube sample of the log-space box spanned by the swept values"
+
+    sampler = "LatinHypercube"
+
+
+class Sobol(Sampled):
+    """Scrambled Sobol sample of the log-space box spanned by the swept values
+
+    Sobol sequences are most balanced when n is a power of two.
+    """
+
+    sampler = "Sobol"
+
+
+class PointTable(SweepDesign):
+    """Solves an explicit table of points
+
+    Variables in the table are swept over its columns (replacing any sweep
+    substitutions they had), while any other swept variables must have one
+    value per row, which is zipped with the table.
+
+    Arguments
+    ---------
+    table : dict, structured array, DataFrame, or path to a CSV file
+        Columns of values, keyed by variable or variable name. A CSV file
+        should have a header of variable names and then one row per point.
+        A vector variable's column may have a row per point of its values.
+    """
+
+    def __init__(self, table):
+        if isinstance(table, (str, os.PathLike)):
+            table = self.read_csv(table)
+        elif getattr(getattr(table, "dtype", None), "names", None):
+            table = {name: table[name] for name in table.dtype.names}
+        self.table = dict(table.items())
+
+    @staticmethod
+    def read_csv(path):
+        "Reads a CSV file's columns into {header: array}"
+        with open(path, newline="", encoding="utf-8") as f:
+            header, *rows = [row for row in csv.reader(f) if row]
+        columns = np.array(rows, dtype=float).reshape(len(rows), len(header))
+        return {name.strip(): column for name, column in zip(header, columns.T)}
+
+    def points(self, sweep, varkeys):
+        if not hasattr(varkeys, "keymap"):
+            raise ValueError("a PointTable needs its model's varkeys.")
+        varkeys.update_keymap()
+        for var in self.table:
+            if getattr(var, "key", var) not in varkeys.keymap:
+                raise ValueError(f"the point table's {var} is not in the model.")
+        _, table_sweep, _ = parse_subs(
+            varkeys, {var: ("sweep", vals) for var, vals in self.table.items()}
+        )
+        sweep = {var: vals for var, vals in sweep.items() if var not in table_sweep}
+        sweep.update(table_sweep)
+        return Zipped().points(sweep, varkeys)
+
+
+DESIGNS = {"grid": Grid, "zip": Zipped}
@@ -2,12 +2,25 @@
 
 import pint
 
-ureg = pint.UnitRegistry()
+
+def _unit_registry():
+    "Returns a UnitRegistry, loading pint's cache of its parsed definitions"
+    try:
+        return pint.UnitRegistry(cache_folder=":auto:")
+    except TypeError:  # older pint releases have no cache_folder argument
+        return pint.UnitRegistry()
+    except (OSError, ImportError):  # e.g. an unwritable cache directory
+        return pint.UnitRegistry()
+
+
+ureg = _unit_registry()
 ureg.define("USD = [money] = $")
 pint.set_application_registry(ureg)
 Quantity = ureg.Quantity
 DimensionalityError = pint.DimensionalityError
 QTY_CACHE = {}
+CONVERSION_CACHE = {}
+DIMLESS_UNIT = ureg.Unit("dimensionless")
 
 
 def qty(unit):
@@ -17,6 +30,45 @@ def qty(unit):
     return QTY_CACHE[unit]
 
 
+def unitkey(units):
+    """Returns a cheaply-hashed identifier of a Unit or unit Quantity.
+
+    Quantities hash by converting to base units, which is far too slow
+    for the conversion caches below.
+    """
+    return getattr(units, "_units", units)
+
+
+def _conversion(from_units, to_units):
+    "Returns the factor converting from_units to to_units, None if it's affine."
+    factor = Quantity(1.0, from_units).to(to_units).magnitude
+    if Quantity(0.0, from_units).to(to_units).magnitude:
+        return None  # e.g. degC to K, which can't be done by a factor
+    return factor
+
+
+def magnitude_in(quantity, units):
+    """Returns the magnitude of quantity in units (a unit Quantity, Unit,
+    or string, or None for dimensionless).
+
+    Conversion factors are computed once for each pair of units, so that
+    converting substitutions and results costs a single multiplication.
+    """
+    if units is None:
+        units = DIMLESS_UNIT
+    elif isinstance(units, str):
+        units = qty(units)
+    key = (unitkey(quantity), unitkey(units))
+    try:
+        factor = CONVERSION_CACHE[key]
+    except KeyError:
+        to_units = getattr(units, "units", units)
+        factor = CONVERSION_CACHE[key] = _conversion(quantity.units, to_units)
+    if factor is None:
+        return quantity.to(getattr(units, "units", units)).magnitude
+    return quantity.magnitude * factor
+
+
 class GPkitUnits:
     "Return Monomials instead of Quantitites"
 
@@ -38,7 +90,7 @@ class GPkitUnits:
         "Cached unit division. Requires Quantity inputs."
         if numerator.units is denominator.units:
             return 1
-        key = (id(numerator.units), id(denominator.units))
+        key = (unitkey(numerator.units), unitkey(denominator.units))
         try:
             return self.division_cache[key]
         except KeyError:
@@ -54,7 +106,7 @@ class GPkitUnits:
 
     def of_product(self, thing1, thing2):
         "Cached unit division. Requires united inputs."
-        key = (thing1.units, thing2.units)
+        key = (unitkey(thing1.units), unitkey(thing2.units))
         try:
             return self.multiplication_cache[key]
         except KeyError:
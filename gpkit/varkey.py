@@ -1,5 +1,7 @@
 """Defines the VarKey class"""
 
+from functools import cached_property
+
 from .repr_conventions import ReprMixin
 from .small_classes import Count
 from .units import qty
@@ -37,19 +39,59 @@ class VarKey(ReprMixin):  # pylint:disable=too-many-instance-attributes
             self.descr["unitrepr"] = unitrepr
 
         self.key = self
-        fullstr = self.str_without({"hiddenlineage", "modelnums", "vec"})
-        self.eqstr = fullstr + str(self.lineage) + self.unitrepr
-        self.hashvalue = hash(self.eqstr)
-        self.keys = set((self.name, fullstr))
-
         if "idx" in self.descr:
             if "veckey" not in self.descr:
                 vecdescr = self.descr.copy()
                 del vecdescr["idx"]
                 self.veckey = VarKey(**vecdescr)
-            else:
-                self.keys.add(self.veckey)
-                self.keys.add(self.str_without({"idx", "modelnums"}))
+            self.hashvalue = hash((self.veckey.hashvalue, self.idx))
+        else:
+            self.hashvalue = hash(self.eqstr)
+
+    @classmethod
+    def element(cls, descr):
+        """Returns the key of veckey[idx] for a descr containing both.
+
+        Unlike __init__, this renders no strings: the key's hash comes
+        from its veckey and idx, and its eqstr and keys are made on demand.
+        descr should already hold the vector's (shared) units and unitrepr.
+        """
+        key = cls.__new__(cls)
+        key.descr = descr
+        key.key = key
+        key.fromveckey = True
+        key.hashvalue = hash((descr["veckey"].hashvalue, descr["idx"]))
+        return key
+
+    @cached_property
+    def eqstr(self):
+        "String that identifies this key, with the same units and lineage."
+        return self.fullstr + str(self.lineage) + self.unitrepr
+
+    @cached_property
+    def fullstr(self):
+        "This key's string with all lineage, as used in eqstr and keys."
+        if self.fromveckey and self.idx:
+            return self.veckey.fullstr + f"[{','.join(map(str, self.idx))}]"
+        return self.str_without({"hiddenlineage", "modelnums", "vec"})
+
+    @cached_property
+    def idxlessstr(self):
+        "This key's string without its idx, which its elements share."
+        if self.fromveckey:
+            return self.veckey.idxlessstr
+        # NOTE: excluding hiddenlineage keeps this from depending on
+        #       whether a table has temporarily set necessarylineage
+        return self.str_without({"idx", "modelnums", "hiddenlineage"})
+
+    @cached_property
+    def keys(self):
+        "Alternative keys by which this can be looked up in a KeyDict."
+        keys = set((self.name, self.fullstr))
+        if "idx" in self.descr and "veckey" in self.descr:
+            keys.add(self.veckey)
+            keys.add(self.idxlessstr)
+        return keys
 
     def __getstate__(self):
         "Stores varkey as its metadata dictionary, removing functions"
@@ -126,6 +168,8 @@ class VarKey(ReprMixin):  # pylint:disable=too-many-instance-attributes
         return name
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not hasattr(other, "descr"):
             return False
         return self.eqstr == other.eqstr